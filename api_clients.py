@@ -0,0 +1,198 @@
+"""
+Process-wide API clients over pooled HTTP connections
+
+Every call used to build its own OpenAI, ChatOpenAI and ElevenLabs client,
+so each new session paid for DNS, TCP and TLS again. The registry builds
+one httpx client per provider for the whole process and hands it to every
+SDK client, so connections are kept alive and reused across turns and
+sessions.
+
+Each provider's pool is capped at its API_CONCURRENCY entry. Every
+in-flight request holds one connection, so the cap also limits requests
+in flight: the rest wait up to API_POOL_TIMEOUT for a connection to come
+free. The sync and async pools are separate, so a provider used both ways
+(OpenAI, through ChatOpenAI) can have up to twice its cap in flight.
+
+Timeouts and retries follow one policy from config.py for all providers,
+and retries happen in exactly one layer. The OpenAI SDK retries every
+request itself, with backoff and on 429/5xx too, so its transports do not.
+ElevenLabs does not retry the streaming speech endpoints, so its transport
+retries failed connections. httpx and the SDKs are imported when a client
+is first built.
+"""
+
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional
+
+from config import (
+    API_CONCURRENCY, API_CONNECT_TIMEOUT, API_KEEPALIVE_EXPIRY, API_MAX_RETRIES, API_POOL_TIMEOUT, API_TIMEOUT,
+)
+from metrics import metrics
+
+if TYPE_CHECKING:
+    import httpx
+
+OPENAI = "openai"
+ELEVENLABS = "elevenlabs"
+
+# Providers whose SDK applies max_retries to every request
+SDK_RETRIES = {OPENAI}
+
+
+class ProviderPolicy(NamedTuple):
+    concurrency: int
+    timeout: float = API_TIMEOUT
+    connect_timeout: float = API_CONNECT_TIMEOUT
+    pool_timeout: float = API_POOL_TIMEOUT
+    max_retries: int = API_MAX_RETRIES
+    keepalive_expiry: float = API_KEEPALIVE_EXPIRY
+    base_url: Optional[str] = None  # None for the SDK's default endpoint
+
+    def httpx_timeout(self) -> "httpx.Timeout":
+        import httpx
+
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=self.pool_timeout)
+
+    def httpx_limits(self) -> "httpx.Limits":
+        import httpx
+
+        return httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency,
+                            keepalive_expiry=self.keepalive_expiry)
+
+
+DEFAULT_POLICIES = {provider: ProviderPolicy(concurrency) for provider, concurrency in API_CONCURRENCY.items()}
+
+
+class ClientRegistry:
+    """Builds each client once and hands the same instance to every caller"""
+
+    def __init__(self, policies: Optional[Dict[str, ProviderPolicy]] = None):
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self._clients: Dict[tuple, object] = {}
+        self._lock = threading.RLock()  # SDK clients build their HTTP client under the lock
+
+    def _get(self, key, build):
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = build()
+                    self._clients[key] = client
+                    metrics.increment(f"api.{key[0]}.clients_built")
+        return client
+
+    # Pooled transports
+
+    def _transport_retries(self, provider: str) -> int:
+        return 0 if provider in SDK_RETRIES else self.policies[provider].max_retries
+
+    def http_client(self, provider: str) -> "httpx.Client":
+        def build():
+            import httpx
+
+            policy = self.policies[provider]
+            return httpx.Client(
+                timeout=policy.httpx_timeout(), limits=policy.httpx_limits(),
+                transport=httpx.HTTPTransport(limits=policy.httpx_limits(),
+                                              retries=self._transport_retries(provider)),
+                event_hooks={"request": [lambda request: metrics.increment(f"api.{provider}.requests")]},
+            )
+        return self._get((provider, "http"), build)
+
+    def async_http_client(self, provider: str) -> "httpx.AsyncClient":
+        """Pooled async client; bound to the event loop of its first request"""
+        def build():
+            import httpx
+
+            policy = self.policies[provider]
+
+            async def count(request):
+                metrics.increment(f"api.{provider}.requests")
+
+            return httpx.AsyncClient(
+                timeout=policy.httpx_timeout(), limits=policy.httpx_limits(),
+                transport=httpx.AsyncHTTPTransport(limits=policy.httpx_limits(),
+                                                   retries=self._transport_retries(provider)),
+                event_hooks={"request": [count]},
+            )
+        return self._get((provider, "async_http"), build)
+
+    # SDK clients
+
+    def openai(self):
+        import openai
+
+        policy = self.policies[OPENAI]
+        return self._get((OPENAI, "sdk"), lambda: openai.OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), base_url=policy.base_url,
+            max_retries=policy.max_retries, timeout=policy.httpx_timeout(),
+            http_client=self.http_client(OPENAI),
+        ))
+
+    def chat_model(self, model: str = "gpt-4o"):
+        from langchain_openai import ChatOpenAI
+
+        policy = self.policies[OPENAI]
+        return self._get((OPENAI, "chat", model), lambda: ChatOpenAI(
+            model=model, base_url=policy.base_url,
+            max_retries=policy.max_retries, timeout=policy.httpx_timeout(),
+            http_client=self.http_client(OPENAI), http_async_client=self.async_http_client(OPENAI),
+        ))
+
+    def elevenlabs(self):
+        from elevenlabs.client import ElevenLabs
+
+        policy = self.policies[ELEVENLABS]
+        options = {"base_url": policy.base_url} if policy.base_url else {}
+        return self._get((ELEVENLABS, "sdk"), lambda: ElevenLabs(
+            api_key=os.getenv("ELEVENLABS_API_KEY"), timeout=policy.timeout,
+            httpx_client=self.http_client(ELEVENLABS), **options,
+        ))
+
+    def _take_clients(self) -> Dict[tuple, object]:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        return clients
+
+    def close(self):
+        """Close every pooled connection; clients are rebuilt on next use.
+
+        Async clients are closed on a new event loop, which fails if they hold
+        connections opened on another loop; code running on that loop should
+        await `aclose` instead, as the call server does when it shuts down.
+        """
+        clients = self._take_clients()
+        for key, client in clients.items():
+            if key[1] == "http":
+                client.close()
+        pending = [client for key, client in clients.items() if key[1] == "async_http"]
+        if pending:
+            async def close_all():
+                for client in pending:
+                    await client.aclose()
+            asyncio.run(close_all())
+
+    async def aclose(self):
+        """Close every pooled connection from the event loop that used the async clients"""
+        for key, client in self._take_clients().items():
+            if key[1] == "http":
+                client.close()
+            elif key[1] == "async_http":
+                await client.aclose()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Return the registry shared by every call in the process"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
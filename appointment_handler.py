@@ -4,15 +4,23 @@ Enhanced appointment handling logic for the front desk assistant
 
 from typing import List, Optional, Dict, Any
 
+from availability import SlotUnavailable, format_date, get_availability, parse_clock
+from config import SLOTS_OFFERED
+from entity_extractor import TIME, first_entity
+
+# Fixed replies (pre-rendered into the TTS phrase cache)
+SCHEDULE_PROMPT = "I'd be happy to help you schedule an appointment. What day would work best for you? We're open Monday through Friday."
+CLARIFY_PROMPT = "I'm not sure I understood. Could you please clarify what you need help with?"
+DAY_NEEDED_PROMPT = "I need to know which day you'd like to book. What day works best for you?"
+WEEKDAYS_ONLY_PROMPT = "I'm sorry, we're only open Monday through Friday. Which day would work best for you?"
+
+STATIC_RESPONSES = [SCHEDULE_PROMPT, CLARIFY_PROMPT, DAY_NEEDED_PROMPT, WEEKDAYS_ONLY_PROMPT]
+
 class AppointmentHandler:
-    def __init__(self):
-        self.available_slots = {
-            "monday": ["9:00 AM", "10:30 AM", "2:00 PM", "3:30 PM"],
-            "tuesday": ["9:15 AM", "10:00 AM", "1:15 PM", "3:30 PM"],
-            "wednesday": ["8:30 AM", "11:00 AM", "2:30 PM", "4:00 PM"],
-            "thursday": ["9:00 AM", "10:15 AM", "1:00 PM", "3:45 PM"],
-            "friday": ["8:45 AM", "10:30 AM", "2:15 PM", "4:30 PM"]
-        }
+    def __init__(self, availability=None):
+        # Shared calendar; booking a slot takes it away from every other caller
+        self.availability = availability or get_availability()
+        self.booked_slot = None
         self.conversation_state = {}
     
     def process_appointment_request(self, user_input: str, conversation_history: list) -> str:
@@ -29,9 +37,9 @@ class AppointmentHandler:
         
         # Initial appointment request
         if "appointment" in user_input_lower or "book" in user_input_lower or "schedule" in user_input_lower:
-            return "I'd be happy to help you schedule an appointment. What day would work best for you? We're open Monday through Friday."
+            return SCHEDULE_PROMPT
         
-        return "I'm not sure I understood. Could you please clarify what you need help with?"
+        return CLARIFY_PROMPT
     
     def _is_time_selection(self, user_input: str) -> bool:
         """Check if user input contains time selection"""
@@ -48,60 +56,54 @@ class AppointmentHandler:
         # Extract the selected day from conversation history
         selected_day = self._extract_day_from_history(conversation_history)
         if not selected_day:
-            return "I need to know which day you'd like to book. What day works best for you?"
+            return DAY_NEEDED_PROMPT
         
         # Parse the time from user input
         selected_time = self._parse_time_input(user_input)
-        available_slots = self.available_slots.get(selected_day, [])
+        selected_date = self.availability.first_open_date(selected_day)
         
         # Find matching time slot
-        matching_slot = self._find_matching_time_slot(selected_time, available_slots)
+        matching_slot = self._find_matching_time_slot(selected_date, selected_time) if selected_date else None
         
         if matching_slot:
-            return f"Perfect! I'll book your appointment for {selected_day.title()} at {matching_slot}. May I ask what brings you in today?"
-        else:
-            available_times = ", ".join(available_slots)
-            return f"I don't have {selected_time} available on {selected_day.title()}. The available times are: {available_times}. Which would you prefer?"
+            try:
+                self.availability.book(matching_slot)
+                if self.booked_slot and self.booked_slot != matching_slot:
+                    self.availability.release(self.booked_slot)  # the caller changed their mind
+                self.booked_slot = matching_slot
+                return f"Perfect! I'll book your appointment for {matching_slot.describe()}. May I ask what brings you in today?"
+            except SlotUnavailable:
+                pass  # Another caller took it a moment ago
+        
+        available_times = self._offered_times(selected_date)
+        return f"I don't have {selected_time} available on {selected_day.title()}. The available times are: {available_times}. Which would you prefer?"
     
     def _handle_day_selection(self, user_input: str) -> str:
         """Handle day selection"""
         days = ["monday", "tuesday", "wednesday", "thursday", "friday"]
         selected_day = next((day for day in days if day in user_input), None)
+        selected_date = self.availability.first_open_date(selected_day) if selected_day else None
         
-        if selected_day and selected_day in self.available_slots:
-            available_times = ", ".join(self.available_slots[selected_day])
-            return f"For {selected_day.title()}, I have these times available: {available_times}. Which time works best for you?"
+        if selected_date:
+            available_times = self._offered_times(selected_date)
+            return f"For {format_date(selected_date)}, I have these times available: {available_times}. Which time works best for you?"
         else:
-            return "I'm sorry, we're only open Monday through Friday. Which day would work best for you?"
+            return WEEKDAYS_ONLY_PROMPT
+    
+    def _offered_times(self, selected_date) -> str:
+        slots = self.availability.open_slots(selected_date, limit=SLOTS_OFFERED) if selected_date else []
+        return ", ".join(slot.time for slot in slots)
     
     def _parse_time_input(self, user_input: str) -> str:
         """Parse time from user input"""
-        # Handle common time formats
-        if "10" in user_input and ("am" in user_input or "a.m" in user_input or "morning" in user_input):
-            return "10:00 AM"
-        elif "9:15" in user_input or "9 15" in user_input or "nine fifteen" in user_input:
-            return "9:15 AM"
-        elif "1:15" in user_input or "1 15" in user_input or "one fifteen" in user_input:
-            return "1:15 PM"
-        elif "3:30" in user_input or "3 30" in user_input or "three thirty" in user_input:
-            return "3:30 PM"
-        
-        return user_input  # Return as-is if no pattern matched
+        # "nine fifteen", "1 15 pm" and the like become "9:15 AM", "1:15 PM"
+        return first_entity(user_input, TIME) or user_input  # Return as-is if no time was found
     
-    def _find_matching_time_slot(self, selected_time: str, available_slots: list) -> Optional[str]:
-        """Find the best matching time slot"""
-        selected_time_lower = selected_time.lower()
-        
-        for slot in available_slots:
-            slot_lower = slot.lower()
-            # Exact match
-            if selected_time_lower == slot_lower:
-                return slot
-            # Partial match (e.g., "10" matches "10:00 AM")
-            if selected_time_lower in slot_lower or slot_lower in selected_time_lower:
-                return slot
-        
-        return None
+    def _find_matching_time_slot(self, selected_date, selected_time: str):
+        """Find the best matching open slot on that date"""
+        # Exact time, or a slot in the same hour ("10 am" -> "10:30 AM")
+        minutes = parse_clock(selected_time)
+        return self.availability.match(selected_date, minutes) if minutes is not None else None
     
     def _extract_day_from_history(self, conversation_history: list) -> Optional[str]:
         """Extract the selected day from conversation history"""
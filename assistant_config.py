@@ -18,15 +18,7 @@ CLINIC_INFO = {
     "services": ["Primary Care", "Pediatrics", "Vaccinations", "Annual Check-ups", "Lab Tests"]
 }
 
-# Available appointment slots
-APPOINTMENT_SLOTS = {
-    "Monday": ["9:00 AM", "10:30 AM", "1:00 PM", "2:30 PM", "4:00 PM"],
-    "Tuesday": ["8:30 AM", "10:00 AM", "11:30 AM", "2:00 PM", "3:30 PM"],
-    "Wednesday": ["9:00 AM", "10:30 AM", "1:00 PM", "2:30 PM", "4:00 PM"],
-    "Thursday": ["8:30 AM", "10:00 AM", "11:30 AM", "2:00 PM", "3:30 PM"],
-    "Friday": ["9:00 AM", "10:30 AM", "1:00 PM", "2:30 PM", "4:00 PM"],
-    "Saturday": ["9:30 AM", "11:00 AM", "12:30 PM"]
-}
+# Appointment slots come from the calendar in availability.py
 
 # Accepted insurance providers
 INSURANCE_PROVIDERS = {
@@ -0,0 +1,201 @@
+"""
+Streaming audio playback
+
+Synthesized audio is decoded chunk by chunk and pushed into a ring buffer
+that feeds an `sd.OutputStream`, so playback starts as soon as the first
+chunk arrives instead of after the whole utterance has been generated.
+"""
+
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+
+class PCM16Decoder:
+    """Incremental decoder for raw little-endian 16-bit mono PCM"""
+
+    def __init__(self):
+        self._carry = b""
+
+    def decode(self, chunk: bytes) -> np.ndarray:
+        data = self._carry + chunk if self._carry else chunk
+        usable = len(data) - (len(data) % 2)
+        # Network chunks can split a sample in half; keep the odd byte for next time
+        self._carry = data[usable:]
+        return np.frombuffer(data[:usable], dtype='<i2').astype(np.float32) / 32768.0
+
+
+class AudioRingBuffer:
+    """Fixed-size float32 ring buffer between a producer thread and the audio callback.
+
+    `write` blocks while the buffer is full (backpressure on the producer);
+    `read_into` never blocks and pads with silence, as the audio callback must.
+    """
+
+    def __init__(self, capacity: int):
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._capacity = capacity
+        self._read_pos = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def available(self) -> int:
+        return self._size
+
+    @property
+    def finished(self) -> bool:
+        """True once the producer has closed the buffer and it has been drained"""
+        return self._closed and self._size == 0
+
+    def write(self, samples: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """Append samples, waiting for room as needed; returns False on timeout"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        offset = 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while offset < len(samples):
+                while self._size == self._capacity:
+                    if self._closed:
+                        return False
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+
+                if self._closed:
+                    return False
+                count = min(len(samples) - offset, self._capacity - self._size)
+                write_pos = (self._read_pos + self._size) % self._capacity
+                first = min(count, self._capacity - write_pos)
+                self._buffer[write_pos:write_pos + first] = samples[offset:offset + first]
+                if count > first:
+                    self._buffer[:count - first] = samples[offset + first:offset + count]
+
+                self._size += count
+                offset += count
+                self._cond.notify_all()
+
+        return True
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Fill `out` with buffered samples, zero-padding the rest; returns samples copied"""
+        with self._cond:
+            count = min(len(out), self._size)
+            first = min(count, self._capacity - self._read_pos)
+            out[:first] = self._buffer[self._read_pos:self._read_pos + first]
+            if count > first:
+                out[first:count] = self._buffer[:count - first]
+            out[count:] = 0.0
+
+            self._read_pos = (self._read_pos + count) % self._capacity
+            self._size -= count
+            self._cond.notify_all()
+            return count
+
+    def close(self):
+        """Mark the end of the stream"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _default_output_stream(**kwargs):
+    import sounddevice as sd
+    return sd.OutputStream(**kwargs)
+
+
+class StreamingPlayer:
+    """Plays audio through an output stream as it is produced.
+
+    Use as a context manager: `write` samples while they are being
+    generated, and leaving the block waits for the buffer to drain.
+    """
+
+    def __init__(self, sample_rate: int, device=None, buffer_seconds: float = 2.0,
+                 blocksize: int = 1024,
+                 stream_factory: Callable[..., object] = _default_output_stream):
+        self.sample_rate = sample_rate
+        self.device = device
+        self.blocksize = blocksize
+        self.buffer_samples = int(buffer_seconds * sample_rate)
+        self.stream_factory = stream_factory
+        self.first_audio_at = None
+        self._ring = None
+        self._stream = None
+        self._drained = threading.Event()
+
+    def start(self):
+        self.first_audio_at = None
+        self._drained.clear()
+        self._ring = AudioRingBuffer(self.buffer_samples)
+        self._stream = self.stream_factory(
+            samplerate=self.sample_rate,
+            device=self.device,
+            channels=1,
+            dtype='float32',
+            blocksize=self.blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status:
+            print(f"Audio status: {status}")
+        copied = self._ring.read_into(outdata[:, 0])
+        if copied and self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+        if self._ring.finished:
+            self._drained.set()
+
+    def write(self, samples: np.ndarray):
+        """Queue samples for playback, blocking while the ring buffer is full"""
+        self._ring.write(samples)
+
+    def finish(self, timeout: Optional[float] = None):
+        """Wait until everything written so far has been played, then close the stream"""
+        self._ring.close()
+        if timeout is None:
+            # Never hang the call if the device stops pulling audio
+            timeout = self.buffer_samples / self.sample_rate + 5.0
+        self._drained.wait(timeout)
+        self._close_stream()
+
+    def abort(self):
+        """Stop immediately, discarding anything still buffered"""
+        if self._ring is not None:
+            self._ring.close()
+        self._close_stream()
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish()
+        else:
+            self.abort()
+        return False
+
+    def play_chunks(self, chunks: Iterable[bytes], decoder: Optional[PCM16Decoder] = None,
+                    on_audio: Optional[Callable[[np.ndarray], None]] = None):
+        """Decode and play byte chunks as a generator yields them"""
+        decoder = decoder or PCM16Decoder()
+        with self:
+            for chunk in chunks:
+                samples = decoder.decode(chunk)
+                if samples.size:
+                    self.write(samples)
+                    if on_audio is not None:
+                        on_audio(samples)
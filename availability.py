@@ -0,0 +1,395 @@
+"""
+Calendar-backed appointment availability
+
+Free time is tracked per doctor per real date as a bitmap: bit i of a
+day's mask is the i-th appointment slot after opening time. Masks are
+built on first use from each doctor's `available_days` in DOCTORS and
+Config.BUSINESS_HOURS, and a clinic-wide mask per date (any doctor free)
+sits on top. A booking clears one bit and recomputes only that date's
+clinic mask, so "next N open slots" stays a walk over a few integers
+however many bookings have been made.
+
+With a BookingStore attached, the bitmaps are a cache over the store:
+each date is loaded from it on first use, `book` reserves the slot there
+before clearing the bit, and `confirm` turns that hold into a booking.
+"""
+
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from clinic_data import DOCTORS
+from config import Config, AVAILABILITY_HORIZON_DAYS
+from entity_extractor import TIME, first_entity
+
+if TYPE_CHECKING:
+    from booking_store import Hold
+
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+_CLOCK = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*([ap])\.?m\.?\s*$', re.IGNORECASE)
+_HOURS = re.compile(r'^(\d{1,2}):(\d{2})$')
+
+
+def parse_clock(text: str) -> Optional[int]:
+    """Minutes since midnight for a time like '9:15 AM' or 'nine fifteen'"""
+    match = _CLOCK.match(text) or _CLOCK.match(first_entity(text, TIME) or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3).lower()
+    return (hour % 12 + (12 if meridiem == 'p' else 0)) * 60 + minute
+
+
+def format_clock(minutes: int) -> str:
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def format_date(day: date) -> str:
+    return f"{day:%A}, {day:%B} {day.day}"
+
+
+class Slot(NamedTuple):
+    doctor: str
+    date: date
+    minutes: int
+
+    @property
+    def time(self) -> str:
+        return format_clock(self.minutes)
+
+    @property
+    def start(self) -> datetime:
+        return datetime.combine(self.date, datetime.min.time()) + timedelta(minutes=self.minutes)
+
+    def describe(self) -> str:
+        return f"{format_date(self.date)} at {self.time}"
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+class HoldExpired(SlotUnavailable):
+    """A held slot was not confirmed in time"""
+
+
+def _lowest_bit(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class AvailabilityEngine:
+    """Free/busy per doctor on real dates, `slot_minutes` apart within business hours.
+
+    Dates run from today to `horizon_days` ahead; slots that have already
+    started today are never offered. `clock` returns the current datetime.
+    Without a `store`, bookings only live as long as the engine.
+    """
+
+    def __init__(self, doctors=DOCTORS, business_hours=Config.BUSINESS_HOURS,
+                 slot_minutes=Config.MIN_APPOINTMENT_DURATION,
+                 horizon_days=AVAILABILITY_HORIZON_DAYS, clock=datetime.now, store=None):
+        self.doctors = list(doctors)
+        self.store = store
+        self.slot_minutes = slot_minutes
+        self.horizon_days = horizon_days
+        self.clock = clock
+
+        # weekday -> (opening minute, number of slots)
+        self._grid: Dict[int, Tuple[int, int]] = {}
+        for day, hours in business_hours.items():
+            opens, closes = (self._parse_hours(hours[key]) for key in ("start", "end"))
+            self._grid[WEEKDAY_NAMES.index(day.lower())] = (opens, (closes - opens) // slot_minutes)
+
+        self._doctor_days = {
+            doctor: {WEEKDAY_NAMES.index(day.lower()) for day in info["available_days"]}
+            for doctor, info in doctors.items()
+        }
+        self._free: Dict[Tuple[str, date], int] = {}
+        self._any: Dict[date, int] = {}
+        # No date before this one has a free slot left for anyone
+        self._unfilled_from: Optional[date] = None
+        # Store holds and bookings made through this engine, by slot
+        self._holds: Dict[Slot, "Hold"] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_hours(text):
+        hour, minute = _HOURS.match(text).groups()
+        return int(hour) * 60 + int(minute)
+
+    # Bitmaps
+
+    def _doctor_mask(self, doctor: str, day: date) -> int:
+        mask = self._free.get((doctor, day))
+        if mask is None:
+            self._load(day)
+            mask = self._free[(doctor, day)]
+        return mask
+
+    def _load(self, day: date):
+        """Build every doctor's mask for a date, minus what the store already has"""
+        weekday = day.weekday()
+        opens, count = self._grid.get(weekday, (0, 0))
+        taken = self.store.taken(day) if self.store and count else ()
+        for doctor in self.doctors:
+            mask = (1 << count) - 1 if weekday in self._doctor_days[doctor] else 0
+            self._free[(doctor, day)] = mask
+        for doctor, minutes in taken:
+            bit = self._index(day, minutes)
+            if bit is not None and (doctor, day) in self._free:
+                self._free[(doctor, day)] &= ~(1 << bit)
+
+    def _clinic_mask(self, day: date) -> int:
+        mask = self._any.get(day)
+        if mask is None:
+            mask = 0
+            for doctor in self.doctors:
+                mask |= self._doctor_mask(doctor, day)
+            self._any[day] = mask
+        return mask
+
+    def _open_mask(self, day: date, doctor: Optional[str] = None, now: Optional[datetime] = None) -> int:
+        """Free slots on a date, minus any that have already started"""
+        if day.weekday() not in self._grid:
+            return 0
+        mask = self._doctor_mask(doctor, day) if doctor else self._clinic_mask(day)
+        now = now or self.clock()
+        if day < now.date():
+            return 0
+        if day == now.date() and mask:
+            opens = self._grid[day.weekday()][0]
+            elapsed = now.hour * 60 + now.minute - opens
+            if elapsed >= 0:
+                mask &= ~((1 << (elapsed // self.slot_minutes + 1)) - 1)
+        return mask
+
+    def _index(self, day: date, minutes: int) -> Optional[int]:
+        opens, count = self._grid.get(day.weekday(), (0, 0))
+        offset = minutes - opens
+        if offset < 0 or offset % self.slot_minutes or offset // self.slot_minutes >= count:
+            return None
+        return offset // self.slot_minutes
+
+    def _slot(self, day: date, bit: int, doctor: Optional[str] = None) -> Slot:
+        minutes = self._grid[day.weekday()][0] + bit * self.slot_minutes
+        if doctor is None:
+            doctor = next(name for name in self.doctors if self._doctor_mask(name, day) >> bit & 1)
+        return Slot(doctor, day, minutes)
+
+    # Queries
+
+    def dates(self, weekday: Optional[str] = None, since: Optional[date] = None) -> Iterator[date]:
+        """Dates inside the booking horizon, optionally only one weekday"""
+        today = self.clock().date()
+        first = max(since, today) if since else today
+        for offset in range((first - today).days, self.horizon_days + 1):
+            day = today + timedelta(days=offset)
+            if weekday is None or WEEKDAY_NAMES[day.weekday()] == weekday.lower():
+                yield day
+
+    def _first_unfilled(self, today: date) -> date:
+        """Earliest date from today with a free slot; fully booked dates are skipped for good"""
+        day = max(self._unfilled_from or today, today)
+        last = today + timedelta(days=self.horizon_days)
+        while day <= last and not self._clinic_mask(day):
+            day += timedelta(days=1)
+        self._unfilled_from = day
+        return day
+
+    def first_open_date(self, weekday: str, doctor: Optional[str] = None) -> Optional[date]:
+        return next((day for day in self.dates(weekday) if self._open_mask(day, doctor)), None)
+
+    def open_slots(self, day: date, doctor: Optional[str] = None, limit: Optional[int] = None,
+                   now: Optional[datetime] = None) -> List[Slot]:
+        slots = []
+        for bit in _bits(self._open_mask(day, doctor, now)):
+            if limit is not None and len(slots) >= limit:
+                break
+            slots.append(self._slot(day, bit, doctor))
+        return slots
+
+    def next_open_slots(self, n: int, doctor: Optional[str] = None, weekday: Optional[str] = None) -> List[Slot]:
+        """The n earliest open slots from now on"""
+        now = self.clock()
+        since = self._first_unfilled(now.date())
+        slots = []
+        for day in self.dates(weekday, since):
+            slots.extend(self.open_slots(day, doctor, n - len(slots), now))
+            if len(slots) >= n:
+                break
+        return slots
+
+    def free_intervals(self, doctor: str, day: date) -> List[Tuple[int, int]]:
+        """Free time as (start, end) minute-of-day intervals"""
+        intervals = []
+        for bit in _bits(self._open_mask(day, doctor)):
+            start = self._grid[day.weekday()][0] + bit * self.slot_minutes
+            if intervals and intervals[-1][1] == start:
+                intervals[-1] = (intervals[-1][0], start + self.slot_minutes)
+            else:
+                intervals.append((start, start + self.slot_minutes))
+        return intervals
+
+    def is_free(self, slot: Slot) -> bool:
+        bit = self._index(slot.date, slot.minutes)
+        return bit is not None and bool(self._open_mask(slot.date, slot.doctor) >> bit & 1)
+
+    def first_after(self, day: date, minutes: int, doctor: Optional[str] = None) -> Optional[Slot]:
+        """Earliest open slot on `day` starting at or after `minutes`"""
+        opens = self._grid.get(day.weekday(), (0, 0))[0]
+        skip = max(0, -(-(minutes - opens) // self.slot_minutes))
+        mask = self._open_mask(day, doctor) >> skip
+        return self._slot(day, skip + _lowest_bit(mask), doctor) if mask else None
+
+    def nearest(self, day: date, minutes: int, doctor: Optional[str] = None) -> Optional[Slot]:
+        """Closest open slot on `day` either side of `minutes`; the earlier one wins a tie"""
+        after = self.first_after(day, minutes, doctor)
+        opens = self._grid.get(day.weekday(), (0, 0))[0]
+        below = max(0, -(-(minutes - opens) // self.slot_minutes))
+        earlier_mask = self._open_mask(day, doctor) & ((1 << below) - 1)
+        before = self._slot(day, earlier_mask.bit_length() - 1, doctor) if earlier_mask else None
+        if before is None or (after is not None and after.minutes - minutes < minutes - before.minutes):
+            return after
+        return before
+
+    def match(self, day: date, minutes: int, doctor: Optional[str] = None) -> Optional[Slot]:
+        """The open slot a caller means: the exact time, else one in the same hour"""
+        bit = self._index(day, minutes)
+        if bit is not None and self._open_mask(day, doctor) >> bit & 1:
+            return self._slot(day, bit, doctor)
+        hour_start = minutes - minutes % 60
+        slot = self.first_after(day, hour_start, doctor)
+        return slot if slot is not None and slot.minutes < hour_start + 60 else None
+
+    def find(self, weekday: str, minutes: int, doctor: Optional[str] = None) -> Optional[Slot]:
+        """Earliest date on that weekday where exactly this time is open"""
+        for day in self.dates(weekday):
+            bit = self._index(day, minutes)
+            if bit is None:
+                return None
+            if self._open_mask(day, doctor) >> bit & 1:
+                return self._slot(day, bit, doctor)
+        return None
+
+    # Bookings
+
+    def book(self, slot: Slot) -> Slot:
+        """Take a slot off the calendar; raises SlotUnavailable if it is gone.
+
+        With a store the slot is only held until `confirm` is called.
+        """
+        with self._lock:
+            if self.store:
+                for lapsed in self.store.expire_holds():
+                    self._holds.pop(lapsed, None)
+                    self._set_free(lapsed)
+            bit = self._index(slot.date, slot.minutes)
+            if bit is None or not self._open_mask(slot.date, slot.doctor) >> bit & 1:
+                raise SlotUnavailable(f"Dr. {slot.doctor} is not free {slot.describe()}")
+            self._free[(slot.doctor, slot.date)] &= ~(1 << bit)
+            self._refresh(slot.date)
+            if self.store:
+                # Another process may have taken it since this date was loaded;
+                # either way the bit stays clear
+                self._holds[slot] = self.store.reserve(slot)
+        return slot
+
+    def confirm(self, slot: Slot, patient_name: Optional[str] = None, phone: Optional[str] = None,
+                reason: Optional[str] = None) -> Optional[int]:
+        """Make a booked slot final; returns the store's booking id.
+
+        A lapsed hold is renewed if nobody else has taken the slot since;
+        otherwise HoldExpired is raised.
+        """
+        if not self.store:
+            return None
+        with self._lock:
+            hold = self._holds.get(slot)
+            if hold is not None:
+                try:
+                    return self.store.confirm(hold, patient_name, phone, reason)
+                except HoldExpired:
+                    del self._holds[slot]
+                    self.store.cancel(hold.id)
+
+            try:
+                hold = self.store.reserve(slot)
+            except SlotUnavailable:
+                raise HoldExpired(f"The hold on {slot.describe()} lapsed and the slot was taken") from None
+            finally:
+                bit = self._index(slot.date, slot.minutes)
+                self._free[(slot.doctor, slot.date)] = self._doctor_mask(slot.doctor, slot.date) & ~(1 << bit)
+                self._refresh(slot.date)
+            self._holds[slot] = hold
+            return self.store.confirm(hold, patient_name, phone, reason)
+
+    def hold_for(self, slot: Slot) -> Optional["Hold"]:
+        """The store hold this engine has on a slot, if any"""
+        return self._holds.get(slot)
+
+    def adopt(self, hold: "Hold"):
+        """Take over a hold made by another process, e.g. for a resumed call"""
+        with self._lock:
+            self._holds[hold.slot] = hold
+            bit = self._index(hold.slot.date, hold.slot.minutes)
+            if bit is not None and (hold.slot.doctor, hold.slot.date) in self._free:
+                self._free[(hold.slot.doctor, hold.slot.date)] &= ~(1 << bit)
+                self._refresh(hold.slot.date)
+
+    def release(self, slot: Slot):
+        """Put a booked slot back on the calendar"""
+        with self._lock:
+            hold = self._holds.pop(slot, None)
+            if hold is not None:
+                self.store.cancel(hold.id)
+            self._set_free(slot)
+
+    def _set_free(self, slot: Slot):
+        bit = self._index(slot.date, slot.minutes)
+        if bit is not None and slot.date.weekday() in self._doctor_days.get(slot.doctor, ()):
+            self._free[(slot.doctor, slot.date)] = self._doctor_mask(slot.doctor, slot.date) | 1 << bit
+            self._refresh(slot.date)
+            if self._unfilled_from and slot.date < self._unfilled_from:
+                self._unfilled_from = slot.date
+
+    def _refresh(self, day: date):
+        # Only this date's clinic mask changes; every other date stays cached
+        self._any.pop(day, None)
+        self._clinic_mask(day)
+
+    def describe_schedule(self) -> str:
+        """One line per doctor for prompts"""
+        lines = []
+        for doctor, days in self._doctor_days.items():
+            hours = [(weekday, self._grid[weekday]) for weekday in sorted(days) if weekday in self._grid]
+            if not hours:
+                continue
+            names = ", ".join(WEEKDAY_NAMES[weekday].title() for weekday, _ in hours)
+            opens, count = hours[0][1]
+            lines.append(f"- Dr. {doctor}: {names}, {format_clock(opens)} to "
+                         f"{format_clock(opens + count * self.slot_minutes)}, every {self.slot_minutes} minutes")
+        return "\n".join(lines)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_availability() -> AvailabilityEngine:
+    """Return the calendar shared by every call in the process"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from booking_store import get_booking_store
+                _engine = AvailabilityEngine(store=get_booking_store())
+    return _engine
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+"Next N open slots" latency as the calendar fills up
+
+Books a growing share of the calendar and times `next_open_slots` on the
+bitmap engine against a naive scan that checks every (date, time, doctor)
+against a set of booked slots.
+
+    python benchmarks/bench_availability.py [queries]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from availability import AvailabilityEngine, Slot
+
+N = 4
+
+
+def naive_next_open_slots(engine, booked, n):
+    """Every candidate slot checked one by one against the booked set"""
+    now = engine.clock()
+    slots = []
+    for offset in range(engine.horizon_days + 1):
+        day = now.date() + timedelta(days=offset)
+        opens, count = engine._grid.get(day.weekday(), (0, 0))
+        for i in range(count):
+            minutes = opens + i * engine.slot_minutes
+            if offset == 0 and minutes <= now.hour * 60 + now.minute:
+                continue
+            for doctor in engine.doctors:
+                if day.weekday() in engine._doctor_days[doctor] and Slot(doctor, day, minutes) not in booked:
+                    slots.append(Slot(doctor, day, minutes))
+                    break
+            if len(slots) >= n:
+                return slots
+    return slots
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    random.seed(0)
+    engine = AvailabilityEngine()
+    booked = set()
+
+    print(f"{'booked':>8} {'bitmap µs':>10} {'naive µs':>10}")
+    for target in (0, 500, 1000, 1500):
+        while len(booked) < target:
+            slot = engine.next_open_slots(1)[0] if random.random() < 0.7 else None
+            if slot is None:
+                open_slots = engine.next_open_slots(40)
+                slot = random.choice(open_slots)
+            booked.add(engine.book(slot))
+
+        assert engine.next_open_slots(N) == naive_next_open_slots(engine, booked, N)
+        started = time.perf_counter()
+        for _ in range(queries):
+            engine.next_open_slots(N)
+        bitmap = (time.perf_counter() - started) / queries * 1e6
+
+        started = time.perf_counter()
+        for _ in range(queries):
+            naive_next_open_slots(engine, booked, N)
+        naive = (time.perf_counter() - started) / queries * 1e6
+        print(f"{len(booked):>8} {bitmap:>10.1f} {naive:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Per-turn latency of ConversationHandler: one structured call vs separate calls
+
+Runs a short booking conversation against a stubbed LLM with a fixed
+round-trip latency and reports turn time and LLM calls for each mode.
+
+    python benchmarks/bench_conversation_turn.py [latency_ms]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from availability import AvailabilityEngine
+from conversation_handler import ConversationHandler
+from fake_llm import ScriptedChatModel
+from metrics import metrics
+
+TURNS = [
+    "Hi, I'd like to book an appointment",
+    "My name is Jane Doe",
+    "It's for a checkup on Monday at 10:00 AM",
+    "Thank you, goodbye",
+]
+
+
+def bench(single_call, latency, conversations=5):
+    metrics.reset()
+    llm = ScriptedChatModel(latency=latency)
+    for _ in range(conversations):
+        # An in-memory calendar, so simulated bookings never reach the real booking store
+        handler = ConversationHandler(llm=llm, single_call=single_call, availability=AvailabilityEngine())
+        for text in TURNS:
+            handler.process_user_input(text)
+
+    mode = "single_call" if single_call else "multi_call"
+    turn = metrics.snapshot()["timings"][f"conversation.turn_time.{mode}"]
+    print(f"{mode:<12} | p50 {turn['p50'] * 1000:7.1f} ms | p95 {turn['p95'] * 1000:7.1f} ms | "
+          f"{llm.calls / turn['count']:.2f} LLM calls per turn")
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.3
+    print(f"Stubbed LLM round-trip: {latency * 1000:.0f} ms")
+    bench(single_call=False, latency=latency)
+    bench(single_call=True, latency=latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Entity extraction throughput: the old per-pattern normalizers vs one tokenizer pass
+
+The old path is what every transcript went through before: the voice
+handler's time clean-up (regex substitutions plus number-word replaces),
+then the assistant's speech-error fixes and separate day, time and phone
+extractors. The new path is `normalize_times` plus the extractor, with
+its memo cleared for every transcript so each one is really scanned.
+
+    python benchmarks/bench_entity_extractor.py [repeats]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from entity_extractor import DAY, PHONE, TIME, extract_entities, first_entity, normalize_times
+
+TRANSCRIPTS = [
+    "Hi, I'd like to book an appointment for next week",
+    "Monday works for me",
+    "How about one fifteen pm on Tuesday",
+    "Ten thirty in the morning please",
+    "11 a.m. if you have it",
+    "I've had a sore throat and a fever for about three days",
+    "My name is Jane Doe and my number is 407 555 0123",
+    "Can I see Dr. Smith instead, maybe Thursday at 3:30?",
+    "No that's all, thank you so much, goodbye",
+]
+
+_CORRECTIONS = {
+    'turn am': '10:00 AM', 'turn AM': '10:00 AM', '10 am': '10:00 AM', '10am': '10:00 AM',
+    '9.15': '9:15 AM', '9:15': '9:15 AM', '1.15': '1:15 PM', '1:15': '1:15 PM',
+    '3.30': '3:30 PM', '3:30': '3:30 PM', 'nine fifteen': '9:15 AM', 'ten am': '10:00 AM',
+    'one fifteen': '1:15 PM', 'three thirty': '3:30 PM'
+}
+
+
+def legacy_improve_time_recognition(text):
+    text = text.lower().strip()
+    text = re.sub(r'(\d{1,2})[\s\.-](\d{2})(:00)?\s*(am|pm)', r'\1:\2 \4', text, flags=re.IGNORECASE)
+    text = re.sub(r'(\d{1,2}:\d{2})(:00)+', r'\1', text)
+    text = re.sub(r'(\d{1,2})\s*(a\.m\.|am|a\.m|p\.m\.|pm|p\.m)', r'\1:00 \2', text, flags=re.IGNORECASE)
+    text = re.sub(r'^(\d{1})(\d{2})\s*(am|pm)', r'\1:\2 \3', text, flags=re.IGNORECASE)
+    text = re.sub(r'^(\d{2})(\d{2})\s*(am|pm)', r'\1:\2 \3', text, flags=re.IGNORECASE)
+    number_words = {
+        'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5', 'six': '6',
+        'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10', 'eleven': '11', 'twelve': '12'
+    }
+    for word, num in number_words.items():
+        text = text.replace(f'{word} fifteen', f'{num}:15')
+        text = text.replace(f'{word} thirty', f'{num}:30')
+        text = text.replace(f'{word} forty five', f'{num}:45')
+        text = text.replace(f'{word} forty-five', f'{num}:45')
+    text = re.sub(r':+', ':', text)
+    text = text.strip(' :')
+    text = re.sub(r'(\d{1,2}:\d{2}):00', r'\1', text)
+    return re.sub(r'\b(am|pm)\b', lambda m: m.group(1).upper(), text, flags=re.IGNORECASE)
+
+
+def legacy_fix_speech_errors(text):
+    text = text.strip()
+    text_lower = text.lower()
+    for error, fix in _CORRECTIONS.items():
+        if error in text_lower:
+            return text.replace(error, fix)
+    return text
+
+
+def legacy_extract_time(text):
+    text = legacy_fix_speech_errors(text).lower().replace('.', ':')
+    for pattern in [r'(\d{1,2}):(\d{2})\s*(am|pm)', r'(\d{1,2})\s*(am|pm)', r'(\d{1,2}):(\d{2})']:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(0)
+    match = re.search(r'(\d{1,2})(?:\s*)(a\.m\.|am|a\.m|p\.m\.|pm|p\.m)', text)
+    return match.group(0) if match else None
+
+
+def legacy_pipeline(text):
+    text = legacy_improve_time_recognition(text)
+    cleaned = legacy_fix_speech_errors(text)
+    lowered = cleaned.lower()
+    day = next((d for d in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
+                if d in lowered or d[:3] in lowered), None)
+    digits = re.findall(r'\d', re.sub(r'[^\d\s]', '', cleaned))
+    return day, legacy_extract_time(cleaned), digits[:10] if len(digits) >= 10 else None
+
+
+def pipeline(text):
+    cleaned = normalize_times(text.strip())
+    return first_entity(cleaned, DAY), first_entity(cleaned, TIME), first_entity(cleaned, PHONE)
+
+
+def bench(name, run, corpus, clear=None):
+    started = time.perf_counter()
+    for text in corpus:
+        if clear:
+            clear()
+        run(text)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<16} | {elapsed / len(corpus) * 1e6:7.2f} us per transcript | {len(corpus) / elapsed:9.0f} /s")
+    return elapsed
+
+
+def clear_memo():
+    extract_entities.cache_clear()
+    normalize_times.cache_clear()
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    corpus = [text for _ in range(repeats) for text in TRANSCRIPTS]
+
+    legacy = bench("per-pattern", legacy_pipeline, corpus)
+    single = bench("single pass", pipeline, corpus, clear_memo)
+    print(f"Single pass: {legacy / single:.1f}x the throughput")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Intent detection throughput: per-keyword substring scans vs one compiled pass
+
+Classifies a corpus of caller transcripts with the old approach (one
+`phrase in text` scan per goodbye phrase and keyword) and with the
+compiled matcher, both once per transcript and three times per turn - the
+router, the assistant and the main loop each classify the same turn.
+
+    python benchmarks/bench_intent_matcher.py [repeats]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from intent_matcher import GOODBYE_PHRASES, INTENT_KEYWORDS, _classify, classify
+
+TRANSCRIPTS = [
+    "Hi, I'd like to book an appointment for next week",
+    "Do you take Blue Cross Blue Shield or Aetna?",
+    "What time do you open on Monday?",
+    "Where is the clinic located, what's the address?",
+    "How much does a regular checkup cost without insurance?",
+    "Monday works for me",
+    "Ten thirty in the morning please",
+    "I've had a sore throat and a fever for about three days",
+    "My name is Jane Doe and my number is 407 555 0123",
+    "Can I see Dr. Smith instead of Dr. Johnson?",
+    "No that's all, thank you so much, goodbye",
+    "I'm not sure, I think I need to check with my husband first and call back later",
+]
+
+
+def legacy_detect_intent(text):
+    """detect_intent before the compiled matcher: stops at the first hit"""
+    text = text.lower()
+    if any(phrase in text for phrase in GOODBYE_PHRASES):
+        return 'goodbye'
+    for intent, words in INTENT_KEYWORDS.items():
+        if any(word in text for word in words):
+            return intent
+    return 'general'
+
+
+def legacy_matched_intents(text):
+    """Every matched intent with substring scans - what the router needs"""
+    text = text.lower()
+    intents = ['goodbye'] if any(phrase in text for phrase in GOODBYE_PHRASES) else []
+    intents += [intent for intent, words in INTENT_KEYWORDS.items() if any(word in text for word in words)]
+    return intents
+
+
+def bench(name, detect, corpus, clear=None):
+    started = time.perf_counter()
+    for text in corpus:
+        if clear:
+            clear()
+        detect(text)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<18} | {elapsed / len(corpus) * 1e6:6.2f} us per turn | {len(corpus) / elapsed:10.0f} turns/s")
+    return elapsed
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    # Vary the text so the memo does not hide the scan cost
+    corpus = [f"{text} ({index})" for index in range(repeats) for text in TRANSCRIPTS]
+
+    first_hit = bench("substring, first", legacy_detect_intent, corpus)
+    bench("substring, all", legacy_matched_intents, corpus)
+    bench("compiled, cold", classify, corpus, _classify.cache_clear)
+
+    # A routed turn is classified by the router, then by detect_intent, then
+    # by the main loop: three scans before, one scan and two memo hits now
+    per_turn_before = bench("substring, 3x/turn", lambda text: (
+        legacy_matched_intents(text), legacy_detect_intent(text), legacy_detect_intent(text)), corpus)
+    per_turn_after = bench("compiled, 3x/turn", lambda text: [classify(text) for _ in range(3)],
+                           corpus, _classify.cache_clear)
+    print(f"Per routed turn: {per_turn_before / per_turn_after:.1f}x faster "
+          f"({first_hit / len(corpus) * 1e6:.2f} us for a single first-hit scan)")
+
+if __name__ == "__main__":
+    main()
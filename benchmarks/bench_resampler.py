@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: streaming polyphase resampler vs scipy.signal.resample
+
+The old call-recording path ran an FFT resample over every whole
+ElevenLabs clip. This compares it with the polyphase resampler fed in
+playback-sized chunks.
+
+    python benchmarks/bench_resampler.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from resampler import PolyphaseResampler, design_filter
+
+
+def _best_of(fn, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(src_rate, dst_rate, seconds, chunk=2048):
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal(int(src_rate * seconds))).astype(np.float32)
+
+    def fft_resample():
+        from scipy import signal
+        signal.resample(audio, int(len(audio) * dst_rate / src_rate))
+
+    def polyphase_stream():
+        resampler = PolyphaseResampler(src_rate, dst_rate)
+        for start in range(0, len(audio), chunk):
+            resampler.process(audio[start:start + chunk])
+        resampler.flush()
+
+    design_filter(src_rate, dst_rate)  # filter design is a one-off per process
+    fft = _best_of(fft_resample)
+    poly = _best_of(polyphase_stream)
+    print(f"{src_rate:>6} -> {dst_rate:<6} {seconds:>5.1f}s clip | "
+          f"scipy.signal.resample {fft * 1000:8.2f} ms | "
+          f"polyphase (chunked) {poly * 1000:8.2f} ms | "
+          f"peak extra buffer {chunk} vs {len(audio)} samples")
+
+
+def main():
+    for src_rate, dst_rate in [(22050, 44100), (22050, 16000), (44100, 16000)]:
+        for seconds in (3.0, 7.3, 20.0):
+            bench(src_rate, dst_rate, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Load test: many simulated callers on one event loop
+
+Each caller runs a full booking conversation through call_session.run_call
+against a stubbed LLM with a fixed round-trip latency. Speaking and
+listening are simulated with asyncio sleeps, so the run measures how well
+one process overlaps calls rather than audio hardware.
+
+    python benchmarks/load_test_calls.py --callers 50 --latency-ms 300
+    python benchmarks/load_test_calls.py --router   # rules first, LLM fallback
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from availability import AvailabilityEngine
+from call_session import run_call
+from conversation_handler import ConversationHandler
+from fake_llm import ScriptedChatModel
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+from hybrid_router import HybridRouter
+from metrics import metrics
+
+SCRIPT = [
+    "Hi, I'd like to book an appointment",
+    "My name is Jane Doe",
+    "It's for a checkup on Monday at 10:00 AM",
+    "Thank you, goodbye",
+]
+
+
+class SimulatedCaller:
+    """Answers with the next scripted line after a short speaking delay"""
+
+    def __init__(self, script, speaking_time):
+        self.lines = iter(script)
+        self.speaking_time = speaking_time
+
+    async def listen(self, duration):
+        await asyncio.sleep(self.speaking_time)
+        return next(self.lines, "goodbye")
+
+    async def speak(self, text):
+        await asyncio.sleep(0)
+
+
+async def run(callers, latency, speaking_time, single_call, router=False):
+    llm = ScriptedChatModel(latency=latency)
+    # An in-memory calendar, so simulated bookings never reach the real booking store
+    availability = AvailabilityEngine(horizon_days=3650)  # room for every simulated booking
+
+    async def call():
+        handler = ConversationHandler(llm=llm, single_call=single_call, availability=availability)
+        if router:
+            handler = HybridRouter(SimpleEnhancedAssistant(availability), llm_handler=handler)
+        await run_call(handler, SimulatedCaller(SCRIPT, speaking_time), pause=0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(callers)))
+    return time.perf_counter() - started, llm.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="stubbed LLM round-trip")
+    parser.add_argument("--speaking-ms", type=float, default=50.0, help="simulated caller speaking time per turn")
+    parser.add_argument("--multi-call", action="store_true", help="use separate intent/extraction/reply calls")
+    parser.add_argument("--router", action="store_true", help="answer routine turns with rules before the LLM")
+    args = parser.parse_args()
+
+    metrics.reset()
+    elapsed, llm_calls = asyncio.run(
+        run(args.callers, args.latency_ms / 1000, args.speaking_ms / 1000, not args.multi_call, args.router)
+    )
+
+    timings = metrics.snapshot()["timings"]
+    mode = "multi_call" if args.multi_call else "single_call"
+    if args.router:
+        routes = {route: timings[f"router.turn_time.{route}"] for route in ("rules", "llm")
+                  if f"router.turn_time.{route}" in timings}
+        total = sum(stats["count"] for stats in routes.values())
+        print(f"{args.callers} concurrent callers, {total} turns, {llm_calls} LLM calls in {elapsed:.2f} s")
+        for route, stats in routes.items():
+            print(f"Route {route}: {stats['count']} turns | p50 {stats['p50'] * 1000:.2f} ms | "
+                  f"p95 {stats['p95'] * 1000:.2f} ms")
+        print(f"Throughput: {total / elapsed:.1f} turns/s")
+        return
+
+    turns = timings[f"conversation.turn_time.{mode}"]
+    print(f"{args.callers} concurrent callers, {turns['count']} turns, {llm_calls} LLM calls "
+          f"in {elapsed:.2f} s")
+    print(f"Turn latency: p50 {turns['p50'] * 1000:.1f} ms | "
+          f"p95 {turns['p95'] * 1000:.1f} ms | "
+          f"max {turns['max'] * 1000:.1f} ms")
+    print(f"Throughput: {turns['count'] / elapsed:.1f} turns/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Load test: simulated WebSocket callers against the call server on localhost
+
+Starts call_server in this process with a stubbed LLM, then connects many
+clients at once. Each client runs a booking conversation over its own
+WebSocket, timing every turn from sending the text to the end of the
+reply. Clients beyond --max-sessions are turned away as busy.
+
+    python benchmarks/load_test_server.py --clients 200 --latency-ms 300
+    python benchmarks/load_test_server.py --clients 120 --max-sessions 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import uvicorn
+import websockets
+
+from availability import AvailabilityEngine
+from call_server import create_app
+from conversation_handler import ConversationHandler
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+from fake_llm import ScriptedChatModel
+from hybrid_router import HybridRouter
+from metrics import percentile
+
+SCRIPT = [
+    "Hi, I'd like to book an appointment",
+    "My name is Jane Doe",
+    "It's for a checkup on Monday at 10:00 AM",
+    "Thank you, goodbye",
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(latency, max_sessions, router):
+    llm = ScriptedChatModel(latency=latency)
+    availability = AvailabilityEngine(horizon_days=3650)  # room for every simulated booking
+
+    def handler():
+        conversation = ConversationHandler(llm=llm, availability=availability)
+        if router:
+            return HybridRouter(SimpleEnhancedAssistant(availability), llm_handler=conversation)
+        return conversation
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(handler_factory=handler, max_sessions=max_sessions),
+        host="127.0.0.1", port=port, log_level="warning", ws_max_queue=32,
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port, llm
+
+
+async def caller(url, speaking_time, turn_times):
+    async with websockets.connect(url, max_size=None) as ws:
+
+        async def reply():
+            while True:
+                message = json.loads(await ws.recv())
+                if message["type"] in ("turn_end", "end"):
+                    return message["type"]
+                if message["type"] == "busy":
+                    return "busy"
+
+        if await reply() == "busy":
+            return False
+        for text in SCRIPT:
+            await asyncio.sleep(speaking_time)
+            started = time.perf_counter()
+            await ws.send(json.dumps({"type": "text", "text": text}))
+            if await reply() == "end":
+                break
+            turn_times.append(time.perf_counter() - started)
+        return True
+
+
+async def run(port, clients, speaking_time):
+    turn_times = []
+    url = f"ws://127.0.0.1:{port}/call"
+    started = time.perf_counter()
+    answered = await asyncio.gather(*(caller(url, speaking_time, turn_times) for _ in range(clients)))
+    return time.perf_counter() - started, sum(answered), turn_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="stubbed LLM round-trip")
+    parser.add_argument("--speaking-ms", type=float, default=50.0, help="simulated caller speaking time per turn")
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--router", action="store_true", help="answer routine turns with rules before the LLM")
+    args = parser.parse_args()
+
+    server, port, llm = start_server(args.latency_ms / 1000, args.max_sessions, args.router)
+    try:
+        elapsed, answered, turn_times = asyncio.run(run(port, args.clients, args.speaking_ms / 1000))
+    finally:
+        server.should_exit = True
+
+    print(f"{args.clients} clients, {answered} answered, {args.clients - answered} busy, "
+          f"{len(turn_times)} turns, {llm.calls} LLM calls in {elapsed:.2f} s")
+    if turn_times:
+        print(f"Turn latency: p50 {percentile(turn_times, 50) * 1000:.1f} ms | "
+              f"p95 {percentile(turn_times, 95) * 1000:.1f} ms | "
+              f"max {max(turn_times) * 1000:.1f} ms")
+        print(f"Throughput: {len(turn_times) / elapsed:.1f} turns/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Transactional appointment store
+
+Bookings live in one SQLite database in WAL mode, so readers never block
+the writer and several processes can take calls against the same file. A
+UNIQUE (doctor, date, minutes) constraint makes the database the final
+word on who owns a slot: two callers racing for Monday 10:30 AM both try
+the INSERT and exactly one of them wins.
+
+Booking is two steps. `reserve` puts a hold on the slot as soon as the
+caller picks a time; `confirm` turns the hold into a booking once the
+name and phone number are in. A hold that is not confirmed within
+`hold_seconds` lapses and the slot can be reserved by someone else.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Callable, List, NamedTuple, Optional, Set, Tuple
+
+from availability import HoldExpired, Slot, SlotUnavailable
+from config import BOOKINGS_DB, BOOKING_HOLD_SECONDS
+from metrics import metrics
+
+HELD = "held"
+CONFIRMED = "confirmed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,  -- never reused, so a stale hold id cannot match a newer row
+    doctor TEXT NOT NULL,
+    date TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    hold_expires REAL,
+    patient_name TEXT,
+    phone TEXT,
+    reason TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (doctor, date, minutes)
+)
+"""
+
+
+class Hold(NamedTuple):
+    id: int
+    slot: Slot
+    expires_at: float
+
+
+class BookingStore:
+    """SQLite-backed slot ownership; safe to share between threads and processes.
+
+    Each thread gets its own connection. `clock` returns the current time
+    in seconds and decides when holds lapse.
+    """
+
+    def __init__(self, path: str = BOOKINGS_DB, hold_seconds: float = BOOKING_HOLD_SECONDS,
+                 clock: Callable[[], float] = time.time, busy_timeout: float = 5.0):
+        self.path = path
+        self.hold_seconds = hold_seconds
+        self.clock = clock
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as db:
+            db.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    # Slot ownership
+
+    def reserve(self, slot: Slot, hold_seconds: Optional[float] = None) -> Hold:
+        """Hold a slot for one caller; raises SlotUnavailable if someone else has it"""
+        now = self.clock()
+        expires_at = now + (self.hold_seconds if hold_seconds is None else hold_seconds)
+        with metrics.timer("bookings.reserve_time"), self._transaction() as db:
+            # A lapsed hold on this slot no longer counts
+            db.execute("DELETE FROM bookings WHERE doctor = ? AND date = ? AND minutes = ? "
+                       "AND status = ? AND hold_expires <= ?",
+                       (slot.doctor, slot.date.isoformat(), slot.minutes, HELD, now))
+            try:
+                cursor = db.execute(
+                    "INSERT INTO bookings (doctor, date, minutes, status, hold_expires, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (slot.doctor, slot.date.isoformat(), slot.minutes, HELD, expires_at, now))
+            except sqlite3.IntegrityError:
+                metrics.increment("bookings.conflicts")
+                raise SlotUnavailable(f"Dr. {slot.doctor} is already booked {slot.describe()}") from None
+        metrics.increment("bookings.holds")
+        return Hold(cursor.lastrowid, slot, expires_at)
+
+    def confirm(self, hold: Hold, patient_name: Optional[str] = None, phone: Optional[str] = None,
+                reason: Optional[str] = None) -> int:
+        """Turn a live hold into a booking; raises HoldExpired if it lapsed first.
+
+        Confirming again only updates the patient details.
+        """
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE bookings SET status = ?, hold_expires = NULL, patient_name = ?, phone = ?, reason = ? "
+                "WHERE id = ? AND (status = ? OR hold_expires > ?)",
+                (CONFIRMED, patient_name, phone, reason, hold.id, CONFIRMED, self.clock()))
+            if cursor.rowcount != 1:
+                raise HoldExpired(f"The hold on {hold.slot.describe()} has lapsed")
+        metrics.increment("bookings.confirmed")
+        return hold.id
+
+    def cancel(self, booking_id: int):
+        """Drop a hold or a booking"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM bookings WHERE id = ?", (booking_id,))
+
+    def expire_holds(self) -> List[Slot]:
+        """Delete every lapsed hold and return the slots they freed"""
+        with self._transaction() as db:
+            rows = db.execute("DELETE FROM bookings WHERE status = ? AND hold_expires <= ? "
+                              "RETURNING doctor, date, minutes", (HELD, self.clock())).fetchall()
+        return [Slot(doctor, date.fromisoformat(day), minutes) for doctor, day, minutes in rows]
+
+    # Queries
+
+    def taken(self, day: date) -> Set[Tuple[str, int]]:
+        """(doctor, minutes) of every booking and live hold on a date"""
+        rows = self._connection().execute(
+            "SELECT doctor, minutes FROM bookings WHERE date = ? AND (status = ? OR hold_expires > ?)",
+            (day.isoformat(), CONFIRMED, self.clock()))
+        return set(rows)
+
+    def bookings(self, day: Optional[date] = None) -> List[dict]:
+        """Confirmed bookings, optionally on one date, in time order"""
+        query = ("SELECT id, doctor, date, minutes, patient_name, phone, reason FROM bookings "
+                 "WHERE status = ?")
+        params = [CONFIRMED]
+        if day is not None:
+            query += " AND date = ?"
+            params.append(day.isoformat())
+        cursor = self._connection().execute(query + " ORDER BY date, minutes, doctor", params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def close(self):
+        """Close this thread's connection"""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error.
+
+    IMMEDIATE takes the write lock up front, so two writers queue on the
+    busy timeout instead of one failing halfway through with SQLITE_BUSY.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_booking_store() -> BookingStore:
+    """Return the store shared by every call in the process"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BookingStore()
+    return _store
@@ -0,0 +1,157 @@
+"""
+Streaming call recorder
+
+Caller and assistant audio are kept on separate int16 tracks and appended
+to open WAV files as each caller turn or TTS chunk arrives, so memory use
+stays flat however long the call runs. Tracks share one timeline: while
+one side is talking the other track gets silence. Files are written under
+`.partial.wav` names and renamed once the call ends, which is O(1)
+regardless of the call length.
+
+Layouts:
+    "stereo" - one file, caller on the left channel, assistant on the right
+    "split"  - two mono files, `..._caller.wav` and `..._assistant.wav`
+"""
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+from config import CALL_RECORDINGS_DIR, CALL_RECORDING_LAYOUT
+from metrics import metrics
+
+if TYPE_CHECKING:
+    import soundfile as sf
+
+CALLER = "caller"
+ASSISTANT = "assistant"
+TRACKS = (CALLER, ASSISTANT)
+LAYOUTS = ("stereo", "split")
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    """Return mono int16 samples, without copying audio that already is"""
+    audio = np.asarray(audio)
+
+    if audio.ndim > 1:
+        if audio.shape[1] == 1:
+            audio = audio[:, 0]
+        elif audio.dtype == np.int16:
+            # Average in int32 so the result stays on the int16 scale
+            audio = audio.sum(axis=1, dtype=np.int32) // audio.shape[1]
+        else:
+            audio = audio.mean(axis=1, dtype=np.float32)
+
+    if audio.dtype == np.int16:
+        return audio
+    if np.issubdtype(audio.dtype, np.integer):
+        return np.clip(audio, -32768, 32767).astype(np.int16)
+
+    # Float audio is in [-1, 1]; scale in place on a single float32 copy
+    scaled = np.clip(audio, -1.0, 1.0, dtype=np.float32)
+    scaled *= 32767
+    return scaled.astype(np.int16)
+
+
+class CallRecorder:
+    def __init__(self, sample_rate: int, directory: str = CALL_RECORDINGS_DIR,
+                 layout: str = CALL_RECORDING_LAYOUT):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown call recording layout: {layout}")
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.layout = layout
+        self.started_at = None
+        self.frames_written = 0
+        self._files: Dict[str, "sf.SoundFile"] = {}
+        self._suffixes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._files)
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio written so far"""
+        return self.frames_written / self.sample_rate
+
+    def _path(self, label: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"complete_call_{int(self.started_at)}{label}{suffix}")
+
+    def _open(self, name: str, suffix: str, channels: int):
+        import soundfile as sf
+
+        self._suffixes[name] = suffix
+        self._files[name] = sf.SoundFile(self._path("", f"{suffix}.partial.wav"), mode="w",
+                                         samplerate=self.sample_rate, channels=channels, subtype="PCM_16")
+
+    def start(self):
+        """Open new recording files; does nothing if a recording is already open"""
+        with self._lock:
+            if self._files:
+                return
+            self.started_at = time.time()
+            self.frames_written = 0
+            self._suffixes = {}
+            if self.layout == "stereo":
+                self._open("stereo", "", channels=len(TRACKS))
+            else:
+                for track in TRACKS:
+                    self._open(track, f"_{track}", channels=1)
+
+    def write(self, audio: Optional[np.ndarray], track: str = CALLER):
+        """Append a segment to one track; the other track is padded with silence"""
+        if track not in TRACKS:
+            raise ValueError(f"Unknown call recording track: {track}")
+        if audio is None:
+            return
+        samples = to_int16(audio)
+        if not samples.size:
+            return
+
+        with self._lock:
+            if not self._files:
+                return
+
+            if self.layout == "stereo":
+                frames = np.zeros((len(samples), len(TRACKS)), dtype=np.int16)
+                frames[:, TRACKS.index(track)] = samples
+                self._files["stereo"].write(frames)
+            else:
+                silence = np.zeros(len(samples), dtype=np.int16)
+                for name, file in self._files.items():
+                    file.write(samples if name == track else silence)
+
+            self.frames_written += len(samples)
+
+    def stop(self) -> Optional[str]:
+        """Close and rename the recording.
+
+        Returns the final path (the caller track's path for the split
+        layout), or None if nothing was recorded.
+        """
+        with self._lock:
+            if not self._files:
+                return None
+            for file in self._files.values():
+                file.close()
+            self._files = {}
+
+            if not self.frames_written:
+                for suffix in self._suffixes.values():
+                    os.remove(self._path("", f"{suffix}.partial.wav"))
+                return None
+
+            call_duration = int(time.time() - self.started_at)
+            final_paths = {}
+            for name, suffix in self._suffixes.items():
+                final_paths[name] = self._path(f"_{call_duration}s", f"{suffix}.wav")
+                os.replace(self._path("", f"{suffix}.partial.wav"), final_paths[name])
+
+            metrics.observe("call_recording.audio_seconds", self.duration)
+            return final_paths.get("stereo") or final_paths[CALLER]
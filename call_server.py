@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+WebSocket front end: one call per connection
+
+Each connection to /call gets its own conversation state (the HybridRouter
+and its rule engine, or a ConversationHandler) and is driven by the same
+`run_call` turn loop as the local CLI. The API clients and their
+connection pools, the calendar, the booking store and the TTS phrase
+cache are process-wide and shared by every call.
+
+Client to server:
+    {"type": "text", "text": "..."}   one caller turn as text
+    binary frames                      int16 mono PCM at ?sample_rate= (default 16000);
+                                       the turn ends on trailing silence or on
+    {"type": "end_of_turn"}
+    {"type": "hangup"}
+Frames that are not JSON objects or whole int16 samples are ignored.
+
+Server to client:
+    {"type": "session", "id": "...", "resumed": false}
+                                       sent first; reconnect with ?session=<id> to resume
+                                       the call from its last checkpoint, on any worker
+    {"type": "reply", "text": "..."}  one sentence of the assistant's reply, followed by
+                                       its PCM audio as a binary frame when SERVER_SEND_AUDIO is on
+    {"type": "turn_end"}              the reply to the caller's turn is complete
+    {"type": "end"}                   the call is over
+    {"type": "busy"}                  the server is at SERVER_MAX_SESSIONS; the socket closes with 1013
+
+Replies go through a bounded per-call send queue: a client that stops
+reading stalls only its own call, and is dropped after SERVER_SEND_TIMEOUT.
+Caller turns wait in a bounded queue too; once it is full the socket is
+not read until the assistant catches up.
+
+    python call_server.py   # or: uvicorn call_server:app
+"""
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+import numpy as np
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+from api_clients import get_client_registry
+from call_session import run_call
+from config import (
+    ELEVENLABS_MODEL_ID, ELEVENLABS_OUTPUT_FORMAT, ELEVENLABS_VOICE_ID, HYBRID_ROUTER_ENABLED,
+    LISTENING_WINDOW, SERVER_HOST, SERVER_INBOUND_QUEUE, SERVER_MAX_SESSIONS, SERVER_PORT,
+    SERVER_SEND_AUDIO, SERVER_SEND_QUEUE, SERVER_SEND_TIMEOUT, SESSION_CHECKPOINTS,
+)
+from metrics import metrics
+from session_state import SessionStore
+from streaming_stt import WHISPER_SAMPLE_RATE, StreamingTranscriber
+from tts_pipeline import split_sentences
+from voice_activity import EnergyEndpointer
+
+BUSY_CLOSE_CODE = 1013  # "try again later"
+
+_HANGUP = object()
+
+
+class CallEnded(Exception):
+    """The caller hung up or stopped reading"""
+
+
+def default_handler():
+    from conversation_handler import ConversationHandler
+    from hybrid_router import HybridRouter
+
+    return HybridRouter() if HYBRID_ROUTER_ENABLED else ConversationHandler()
+
+
+def default_recognizer():
+    from streaming_stt import WhisperAPIRecognizer
+
+    return WhisperAPIRecognizer(get_client_registry().openai(), model="whisper-1")
+
+
+def elevenlabs_synthesizer() -> Callable[[str], bytes]:
+    """PCM for one sentence, from the shared phrase cache or ElevenLabs"""
+    from enhanced_ai_assistant import STATIC_RESPONSES
+    from tts_cache import get_phrase_cache
+
+    client = get_client_registry().elevenlabs()
+    cache = get_phrase_cache()
+    cache.persist(STATIC_RESPONSES)
+
+    def synthesize(sentence):
+        return b"".join(cache.stream_or_render(
+            ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, sentence,
+            lambda: client.text_to_speech.stream(
+                voice_id=ELEVENLABS_VOICE_ID, text=sentence,
+                model_id=ELEVENLABS_MODEL_ID, output_format=ELEVENLABS_OUTPUT_FORMAT,
+            ),
+            ELEVENLABS_OUTPUT_FORMAT,
+        ))
+
+    return synthesize
+
+
+class WebSocketCaller:
+    """Audio endpoint for `run_call` over one WebSocket.
+
+    `listen` returns the next caller turn, `speak` and `speak_stream` queue
+    reply sentences for the sender task.
+    """
+
+    def __init__(self, websocket: WebSocket, recognizer_factory: Callable, sample_rate: int = WHISPER_SAMPLE_RATE,
+                 synthesize: Optional[Callable[[str], bytes]] = None, send_queue: int = SERVER_SEND_QUEUE,
+                 send_timeout: float = SERVER_SEND_TIMEOUT, inbound_queue: int = SERVER_INBOUND_QUEUE):
+        self.websocket = websocket
+        self.recognizer_factory = recognizer_factory
+        self.sample_rate = sample_rate
+        self.synthesize = synthesize
+        self.send_timeout = send_timeout
+        self.turns = asyncio.Queue(maxsize=inbound_queue)
+        self.outbox = asyncio.Queue(maxsize=send_queue)
+        self.closed = False
+        self._transcriber = None
+        self._endpointer = None
+
+    # run_call endpoint
+
+    async def listen(self, duration):
+        if self.closed:
+            raise CallEnded()
+        try:
+            turn = await asyncio.wait_for(self.turns.get(), duration)
+        except asyncio.TimeoutError:
+            return ""
+        if turn is _HANGUP:
+            raise CallEnded()
+        return turn
+
+    async def speak(self, text):
+        for sentence in split_sentences(text):
+            await self._say(sentence)
+        await self._send({"type": "turn_end"})
+
+    async def speak_stream(self, sentences):
+        async for sentence in sentences:
+            await self._say(sentence)
+        await self._send({"type": "turn_end"})
+
+    async def _say(self, sentence):
+        await self._send({"type": "reply", "text": sentence})
+        if self.synthesize is not None:
+            await self._send(await asyncio.to_thread(self.synthesize, sentence))
+
+    async def _send(self, message):
+        if self.closed:
+            raise CallEnded()
+        try:
+            await asyncio.wait_for(self.outbox.put(message), self.send_timeout)
+        except asyncio.TimeoutError:
+            metrics.increment("server.slow_clients")
+            self.closed = True
+            raise CallEnded() from None
+
+    # Socket tasks
+
+    async def send_loop(self):
+        """Drain the outbox to the socket until the call ends"""
+        while True:
+            message = await self.outbox.get()
+            if message is None:
+                return
+            if isinstance(message, bytes):
+                await self.websocket.send_bytes(message)
+            else:
+                await self.websocket.send_text(json.dumps(message))
+
+    async def receive_loop(self):
+        """Turn incoming frames into caller turns until the caller hangs up"""
+        try:
+            while True:
+                frame = await self.websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    return
+                if frame.get("bytes") is not None:
+                    try:
+                        chunk = np.frombuffer(frame["bytes"], dtype=np.int16)
+                    except ValueError:
+                        metrics.increment("server.bad_frames")  # not whole int16 samples
+                        continue
+                    await self._audio(chunk)
+                    continue
+
+                try:
+                    message = json.loads(frame.get("text") or "{}")
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    metrics.increment("server.bad_frames")
+                    continue
+                kind = message.get("type")
+                if kind == "text":
+                    await self.turns.put(message.get("text", ""))
+                elif kind == "end_of_turn":
+                    await self._finish_audio_turn()
+                elif kind == "hangup":
+                    return
+        except WebSocketDisconnect:
+            return
+        finally:
+            self.closed = True
+            if self._transcriber is not None:
+                self._transcriber.cancel()
+            # Wake `listen` even if the turn queue is full
+            while self.turns.full():
+                self.turns.get_nowait()
+            self.turns.put_nowait(_HANGUP)
+
+    async def _audio(self, chunk):
+        if self._transcriber is None:
+            self._transcriber = StreamingTranscriber(self.recognizer_factory(), self.sample_rate).start()
+            self._endpointer = EnergyEndpointer(sample_rate=self.sample_rate)
+        self._transcriber.feed(chunk)
+        if self._endpointer.process(chunk):
+            await self._finish_audio_turn()
+
+    async def _finish_audio_turn(self):
+        transcriber, self._transcriber = self._transcriber, None
+        if transcriber is None:
+            return
+        transcript = await asyncio.to_thread(transcriber.finish)
+        await self.turns.put(transcript)
+
+
+def create_app(handler_factory: Callable = default_handler, recognizer_factory: Callable = default_recognizer,
+               synthesize: Optional[Callable[[str], bytes]] = None, max_sessions: int = SERVER_MAX_SESSIONS,
+               send_queue: int = SERVER_SEND_QUEUE, send_timeout: float = SERVER_SEND_TIMEOUT,
+               inbound_queue: int = SERVER_INBOUND_QUEUE, listening_window: float = LISTENING_WINDOW,
+               sessions: Optional[SessionStore] = None) -> FastAPI:
+    """Build the server; every argument is shared by all calls it takes"""
+    if synthesize is None and SERVER_SEND_AUDIO:
+        synthesize = elevenlabs_synthesizer()
+    if sessions is None and SESSION_CHECKPOINTS:
+        sessions = SessionStore()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        # The async clients are bound to this loop, so they are closed on it
+        await get_client_registry().aclose()
+
+    app = FastAPI(title="AI front desk", lifespan=lifespan)
+    app.state.active_sessions = 0
+
+    @app.get("/health")
+    async def health():
+        return {"active_sessions": app.state.active_sessions, "max_sessions": max_sessions}
+
+    @app.get("/metrics")
+    async def snapshot():
+        return metrics.snapshot()
+
+    @app.websocket("/call")
+    async def call(websocket: WebSocket, sample_rate: int = WHISPER_SAMPLE_RATE, session: Optional[str] = None):
+        await websocket.accept()
+        if app.state.active_sessions >= max_sessions:
+            metrics.increment("server.rejected_sessions")
+            await websocket.send_text(json.dumps({"type": "busy"}))
+            await websocket.close(code=BUSY_CLOSE_CODE)
+            return
+
+        app.state.active_sessions += 1
+        metrics.set_gauge("server.active_sessions", app.state.active_sessions)
+        caller = WebSocketCaller(websocket, recognizer_factory, sample_rate, synthesize,
+                                 send_queue, send_timeout, inbound_queue)
+        sender = asyncio.ensure_future(caller.send_loop())
+        receiver = asyncio.ensure_future(caller.receive_loop())
+        try:
+            handler = handler_factory()
+            session_id, resumed = uuid.uuid4().hex, False
+            if session and sessions:
+                try:
+                    resumed = await asyncio.to_thread(sessions.resume, session, handler)
+                    if resumed:
+                        session_id = session  # an id with no checkpoint behind it is not adopted
+                except ValueError:
+                    metrics.increment("server.bad_resumes")  # unknown format or bad id: start over
+                    handler = handler_factory()
+            await caller._send({"type": "session", "id": session_id, "resumed": resumed})
+
+            async def checkpoint(handler):
+                await asyncio.to_thread(sessions.save, session_id, handler)
+
+            with metrics.timer("server.call_time"):
+                await run_call(handler, caller, listening_window=listening_window, pause=0,
+                               checkpoint=checkpoint if sessions else None, greet=not resumed)
+            if sessions:
+                await asyncio.to_thread(sessions.delete, session_id)
+            await caller._send({"type": "end"})
+        except CallEnded:
+            pass  # the checkpoint stays behind so the caller can reconnect
+        finally:
+            app.state.active_sessions -= 1
+            metrics.set_gauge("server.active_sessions", app.state.active_sessions)
+            caller.closed = True
+            receiver.cancel()
+            # Let queued replies go out, unless the client has stopped reading
+            try:
+                caller.outbox.put_nowait(None)
+                await asyncio.wait_for(sender, send_timeout)
+            except Exception:
+                sender.cancel()
+            try:
+                await websocket.close()
+            except Exception:
+                pass  # already closed by the client
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT)
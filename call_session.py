@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Asyncio turn loop for one call
+
+`run_call` drives a ConversationHandler (or the HybridRouter in front of
+one) against any audio endpoint with async `listen(duration)` and
+`speak(text)` methods. Endpoints that also have `speak_stream(sentences)`
+get each reply sentence by sentence while the LLM is still writing it.
+Waiting on the caller, the LLM or TTS never blocks the event loop, so one
+process can hold many calls at once.
+
+    python call_session.py   # one call on the local mic and speakers
+"""
+
+import asyncio
+import queue
+
+from config import USE_ELEVENLABS, LISTENING_WINDOW, PAUSE_BETWEEN_RESPONSES, HYBRID_ROUTER_ENABLED
+from conversation_handler import ConversationHandler
+from hybrid_router import HybridRouter
+from metrics import metrics
+
+MAX_TURNS = 50  # Prevent infinite loops
+
+
+class VoiceHandlerIO:
+    """Async audio endpoint over the blocking VoiceHandler.
+
+    Recording and playback run in worker threads, so the event loop stays
+    free while the caller talks or the reply plays.
+    """
+
+    def __init__(self, voice_handler):
+        self.voice_handler = voice_handler
+
+    async def listen(self, duration):
+        return await asyncio.to_thread(self.voice_handler.speech_to_text, duration)
+
+    async def speak(self, text):
+        await asyncio.to_thread(self.voice_handler.text_to_speech, text)
+
+    async def speak_stream(self, sentences):
+        """Speak an async stream of sentences, starting with the first one to arrive"""
+        pending = queue.Queue()
+        speaking = asyncio.ensure_future(
+            asyncio.to_thread(self.voice_handler.speak_sentences, iter(pending.get, None))
+        )
+        try:
+            async for sentence in sentences:
+                pending.put(sentence)
+        finally:
+            pending.put(None)
+        await speaking
+
+
+async def run_call(handler, audio, listening_window=LISTENING_WINDOW,
+                   pause=PAUSE_BETWEEN_RESPONSES, max_turns=MAX_TURNS, checkpoint=None, greet=True):
+    """Hold one conversation until the caller says goodbye; returns the number of turns.
+
+    `checkpoint(handler)` is awaited after every turn; a resumed call skips the greeting.
+    """
+    if greet:
+        await audio.speak(handler.get_greeting())
+
+    turns = 0
+    for _ in range(max_turns):
+        user_input = await audio.listen(listening_window)
+        if not user_input:
+            continue
+
+        if hasattr(audio, "speak_stream"):
+            await audio.speak_stream(handler.astream_user_input(user_input))
+        else:
+            await audio.speak(await handler.aprocess_user_input(user_input))
+        turns += 1
+        if checkpoint is not None:
+            await checkpoint(handler)
+
+        if handler.conversation_state == "closing":
+            break
+        await asyncio.sleep(pause)
+
+    metrics.increment("call_session.completed_calls")
+    return turns
+
+
+async def main():
+    from voice_handler_simple import VoiceHandler
+
+    voice_handler = VoiceHandler(use_elevenlabs=USE_ELEVENLABS)
+    voice_handler.start_call_recording()
+    try:
+        handler = HybridRouter() if HYBRID_ROUTER_ENABLED else ConversationHandler()
+        await run_call(handler, VoiceHandlerIO(voice_handler))
+    finally:
+        voice_handler.stop_call_recording()
+        metrics.print_summary()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
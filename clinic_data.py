@@ -1,13 +1,7 @@
 # Mock database for the clinic
 
-# Available appointment slots
-APPOINTMENT_SLOTS = {
-    "Monday": ["10:00 AM", "2:30 PM"],
-    "Tuesday": ["9:15 AM", "3:45 PM"],
-    "Wednesday": ["11:30 AM", "4:00 PM"],
-    "Thursday": ["8:30 AM", "1:15 PM"],
-    "Friday": ["10:45 AM", "3:00 PM"]
-}
+# Appointment slots are not listed here: availability.py builds them on the
+# calendar from each doctor's available_days and Config.BUSINESS_HOURS
 
 # Accepted insurance providers
 INSURANCE_PROVIDERS = {
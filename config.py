@@ -35,6 +35,27 @@ class Config:
 # Voice Settings
 USE_ELEVENLABS = False  # Set to True for production, False for testing
 ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Jessica voice
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_OUTPUT_FORMAT = "pcm_22050"  # raw 16-bit PCM so audio can be played while it streams in
+
+# API clients (api_clients.py): one pooled HTTP client per provider for the whole process
+API_TIMEOUT = 30.0  # seconds to wait for a response
+API_CONNECT_TIMEOUT = 5.0
+API_POOL_TIMEOUT = 10.0  # seconds a request may wait for a free connection before failing
+API_MAX_RETRIES = 2  # retries on connection errors, and on 429/5xx where the SDK supports it
+API_KEEPALIVE_EXPIRY = 60.0  # idle seconds before a pooled connection is closed
+API_CONCURRENCY = {"openai": 16, "elevenlabs": 4}  # requests in flight per provider, per sync or async pool
+
+# TTS phrase cache (fixed replies are only synthesized once)
+TTS_CACHE_DIR = "cache/tts"
+TTS_CACHE_MAX_ITEMS = 64  # phrases kept in memory; the fixed replies are also kept on disk
+
+# Local TTS worker (local_tts.py): speaks when ElevenLabs is off or fails
+LOCAL_TTS_BACKEND = "auto"  # "pyttsx3" (macOS voices, libespeak on Linux), "espeak" (CLI), "file" (test stub) or "auto"
+LOCAL_TTS_VOICE = "samantha"  # first system voice whose name contains this
+LOCAL_TTS_RATE = 150  # words per minute
+LOCAL_TTS_SAMPLE_RATE = 22050  # every backend's audio is resampled to this
+LOCAL_TTS_TIMEOUT = 30.0  # seconds to wait for the worker to start or render a sentence
 
 # Audio Settings
 SAMPLE_RATE = 16000
@@ -48,4 +69,46 @@ DEBUG_TIME_EXTRACTION = True  # Set to False to disable time extraction debug ou
 CLINIC_NAME = "Harmony Family Clinic"
 CLINIC_PHONE = "(407) 555-0123"
 CLINIC_ADDRESS = "123 Health Street, Orlando, FL 32801"
-CLINIC_HOURS = "Monday through Friday, 8:00 AM to 5:00 PM"
\ No newline at end of file
+CLINIC_HOURS = "Monday through Friday, 8:00 AM to 5:00 PM"
+
+# Voice Activity Detection (end the listening turn once the caller stops talking)
+VAD_ENABLED = True  # Set to False to always record the full LISTENING_WINDOW
+VAD_FRAME_MS = 30  # analysis frame length in milliseconds
+VAD_ENERGY_THRESHOLD = 500.0  # minimum int16 RMS energy treated as speech
+VAD_NOISE_MULTIPLIER = 3.0  # speech must also be this many times the noise floor
+VAD_MIN_SPEECH_MS = 150  # voiced audio required before a turn counts as speech
+VAD_TRAILING_SILENCE = 0.8  # seconds of silence after speech that ends the turn
+
+# Local Whisper fallback (used when the OpenAI Whisper API call fails)
+LOCAL_WHISPER_MODEL = "base"
+PRELOAD_LOCAL_WHISPER = False  # Load the local model in the background at startup
+
+# Call recording (streamed to disk as the call happens)
+CALL_RECORDINGS_DIR = "recordings"
+CALL_RECORDING_LAYOUT = "stereo"  # "stereo" (caller left, assistant right) or "split" (two mono files)
+
+# Appointment calendar (doctors' days come from clinic_data.DOCTORS, hours from Config.BUSINESS_HOURS)
+AVAILABILITY_HORIZON_DAYS = 90  # how far ahead callers can book
+SLOTS_OFFERED = 4  # open times read out when the caller picks a day
+BOOKINGS_DB = "appointments/bookings.db"  # SQLite store shared by every process taking calls
+BOOKING_HOLD_SECONDS = 300  # a chosen slot is held this long for the caller to finish booking
+
+# WebSocket server (call_server.py): one call per connection
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_MAX_SESSIONS = 100  # calls one process holds at once; more are turned away as busy
+SERVER_SEND_QUEUE = 32  # reply messages buffered per call before the turn waits on the client
+SERVER_SEND_TIMEOUT = 10.0  # seconds a full send buffer may stall before the call is dropped
+SERVER_INBOUND_QUEUE = 4  # caller turns buffered per call before the socket stops being read
+SERVER_SEND_AUDIO = False  # also send each reply sentence as PCM audio (needs ElevenLabs)
+SESSION_CHECKPOINTS = True  # snapshot each call after every turn so any worker can resume it
+SESSION_CHECKPOINT_DIR = "sessions"
+
+# LLM turn handling
+LLM_SINGLE_CALL = True  # One structured call per turn; False uses separate intent/extraction/reply calls
+HYBRID_ROUTER_ENABLED = True  # Answer routine turns (hours, days, times, phone numbers) with rules; escalate the rest to the LLM
+
+# Conversation memory sent to the LLM with every turn
+CONVERSATION_MEMORY_TOKENS = 600  # budget for recent turns; older facts live in the patient_info summary
+CONVERSATION_MEMORY_MAX_MESSAGES = 20
+CONVERSATION_MEMORY_TRIM_RATIO = 0.6  # when over budget, trim down to this share so the prompt prefix stays stable
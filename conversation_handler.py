@@ -1,49 +1,153 @@
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from clinic_data import APPOINTMENT_SLOTS, INSURANCE_PROVIDERS, DOCTORS, CLINIC_INFO
+import json
+import time
+from typing import List, Literal, NamedTuple, Optional, Tuple
 
-class ConversationHandler:
-    def __init__(self, llm_model="gpt-4o"):
-        self.llm = ChatOpenAI(model=llm_model)
-        self.conversation_history = []
-        self.patient_info = {
-            "name": None,
-            "insurance": None,
-            "policy_number": None,
-            "appointment_day": None,
-            "appointment_time": None,
-            "reason": None,
-            "doctor_preference": None,
-            "phone_number": None
-        }
-        self.current_intent = None
-        self.conversation_state = "greeting"  # greeting, collecting_info, confirming, closing
-        
-        # Initialize system prompt
-        self.system_prompt = self._create_system_prompt()
-        
-    def _create_system_prompt(self):
-        """Create the system prompt with all clinic data embedded"""
-        
-        # Format appointment slots for the prompt
-        appointment_text = ""
-        for day, times in APPOINTMENT_SLOTS.items():
-            appointment_text += f"- {day}: {', '.join(times)}\n"
-            
-        # Format insurance info
-        insurance_text = ", ".join([ins for ins in INSURANCE_PROVIDERS if INSURANCE_PROVIDERS[ins]["accepted"]])
-        
-        # Format doctor info
-        doctor_text = ""
-        for name, info in DOCTORS.items():
-            doctor_text += f"- Dr. {name} ({info['specialty']}): Available {', '.join(info['available_days'])}\n"
-        
-        # Format clinic hours
-        hours_text = ""
-        for day, hours in CLINIC_INFO["hours"].items():
-            hours_text += f"- {day}: {hours}\n"
+from pydantic import BaseModel, ValidationError
+from api_clients import get_client_registry
+from availability import AvailabilityEngine, SlotUnavailable, format_date, get_availability, parse_clock
+from clinic_data import INSURANCE_PROVIDERS, DOCTORS, CLINIC_INFO
+from config import Config, LLM_SINGLE_CALL
+from conversation_memory import ConversationMemory, summarize_patient_info
+from metrics import metrics
+from tts_pipeline import SentenceChunker, split_sentences
+
+
+class TurnFields(BaseModel):
+    """Intent and details extracted from the patient's latest message"""
+    intent: Literal["appointment", "insurance", "info"]
+    name: Optional[str] = None
+    appointment_day: Optional[str] = None
+    appointment_time: Optional[str] = None
+    reason: Optional[str] = None
+    doctor: Optional[str] = None
+    insurance: Optional[str] = None
+    policy_number: Optional[str] = None
+
+
+class TurnResult(TurnFields):
+    """Everything one turn needs, returned by a single structured LLM call"""
+    reply: str
+
+
+class LLMRequest(NamedTuple):
+    """One LLM call requested by a conversation turn"""
+    messages: list
+    structured: bool = False  # reply is (or, when streamed, starts with) a JSON object
+    stream: bool = False  # reply is spoken sentence by sentence as it is generated
+
+
+TURN_RESULT_INSTRUCTIONS = f"""
+        Reply with a single JSON object and nothing else, matching this JSON schema:
+        {json.dumps(TurnResult.model_json_schema())}
+
+        - intent: the patient's request, one of 'appointment', 'insurance' or 'info'
+        - the remaining fields: information found in the patient's latest message, or null
+        - reply: what you say to the patient next, taking the newly extracted information into account
+        """
+
+
+STREAMED_TURN_INSTRUCTIONS = f"""
+        Start your reply with a single line holding a JSON object that matches this JSON schema:
+        {json.dumps(TurnFields.model_json_schema())}
+
+        - intent: the patient's request, one of 'appointment', 'insurance' or 'info'
+        - the remaining fields: information found in the patient's latest message, or null
+
+        After that line, write what you say to the patient next as plain text, taking the
+        newly extracted information into account.
+        """
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def reply_start(content):
+    """Index where the spoken text starts after an optional leading JSON object.
+
+    Returns None while the JSON object is still incomplete (or malformed).
+    """
+    stripped = content.lstrip()
+    if not stripped.startswith("{"):
+        return 0
+    try:
+        _, end = _JSON_DECODER.raw_decode(stripped)
+    except ValueError:
+        return None
+    return len(content) - len(stripped) + end
+
+
+def split_streamed_reply(content) -> Tuple[str, str]:
+    """Split a streamed structured reply into (JSON header, spoken reply)"""
+    start = reply_start(content)
+    if start is None:
+        return content.strip(), ""
+    return content[:start].strip(), content[start:].strip()
+
+
+class ReplyStream:
+    """Turns streamed LLM text into sentences, holding back a leading JSON header"""
+
+    def __init__(self, expect_header=False):
+        self.text = ""
+        self._header_pending = expect_header
+        self._chunker = SentenceChunker()
+        self._started = time.perf_counter()
+        self._first_sentence = True
+
+    def _spoken(self, sentences: List[str]) -> List[str]:
+        if sentences and self._first_sentence:
+            self._first_sentence = False
+            metrics.observe("conversation.time_to_first_sentence", time.perf_counter() - self._started)
+        return sentences
+
+    def feed(self, token: str) -> List[str]:
+        self.text += token
+        if not self._header_pending:
+            return self._spoken(self._chunker.feed(token))
+
+        if not self.text.strip() or "}" not in token and self.text.lstrip().startswith("{"):
+            return []  # header still arriving
+        start = reply_start(self.text)
+        if start is None:
+            return []
+        self._header_pending = False
+        return self._spoken(self._chunker.feed(self.text[start:]))
+
+    def flush(self) -> List[str]:
+        if self._header_pending:
+            return []  # the header never completed, so nothing was meant to be spoken
+        return self._spoken(self._chunker.flush())
+
+
+def parse_turn_result(content):
+    """Validate a structured reply, tolerating a Markdown code fence around the JSON"""
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in structured reply")
+    return TurnResult.model_validate_json(content[start:end + 1])
+
+
+def create_system_prompt():
+    """Create the system prompt with all clinic data embedded"""
+    
+    # Format the appointment schedule for the prompt; which times are still
+    # open changes with every booking, so that goes in the state info instead.
+    # Office hours need no booking store, so importing this module opens none
+    appointment_text = AvailabilityEngine().describe_schedule()
         
-        return f"""
+    # Format insurance info
+    insurance_text = ", ".join([ins for ins in INSURANCE_PROVIDERS if INSURANCE_PROVIDERS[ins]["accepted"]])
+    
+    # Format doctor info
+    doctor_text = ""
+    for name, info in DOCTORS.items():
+        doctor_text += f"- Dr. {name} ({info['specialty']}): Available {', '.join(info['available_days'])}\n"
+    
+    # Format clinic hours
+    hours_text = ""
+    for day, hours in CLINIC_INFO["hours"].items():
+        hours_text += f"- {day}: {hours}\n"
+    
+    return f"""
         You are an AI front desk assistant for {CLINIC_INFO["name"]}. Your job is to help patients with appointment scheduling, insurance verification, and answering questions about the clinic.
 
         IMPORTANT GUIDELINES:
@@ -69,7 +173,7 @@ class ConversationHandler:
         ACCEPTED INSURANCE:
         {insurance_text}
 
-        AVAILABLE APPOINTMENT SLOTS:
+        APPOINTMENT SCHEDULE:
         {appointment_text}
 
         CONVERSATION FLOW:
@@ -83,47 +187,325 @@ class ConversationHandler:
         8. End the conversation politely
 
         Remember to maintain a natural, helpful conversation while efficiently collecting the necessary information.
+    """
+
+
+# Static guidance for the reply; it sits right after the system prompt so the
+# whole static block forms one prefix the provider can cache across turns
+STATE_GUIDANCE = """
+        Each turn ends with the current conversation state, the patient intent and the patient
+        information collected so far. Based on that information:
+        
+        1. If this is a greeting, welcome the patient and ask how you can help.
+        
+        2. If collecting information:
+           - For appointments: If any required field is missing (name, day, time, reason), ask for it.
+           - For insurance: If any required field is missing (name, insurance provider, policy number), ask for it.
+           - For general info: Answer their question based on clinic information.
+        
+        3. If confirming:
+           - For appointments: Confirm the appointment details and check if the slot is available.
+           - For insurance: Verify if their insurance is accepted and confirm the details.
+        
+        4. If closing: Thank them for calling and wish them a good day.
+        
+        Remember to ask only ONE question at a time and keep responses concise and professional.
+        """
+
+INTENT_PROMPT = "You are analyzing a patient's request to a medical clinic. Categorize their intent as one of: 'appointment', 'insurance', or 'info'. Respond with just that single word."
+
+APPOINTMENT_EXTRACTION_PROMPT = f"""
+        Extract the following information from the patient's message if present:
+        - Patient name
+        - Appointment day
+        - Appointment time
+        - Reason for visit
+        - Doctor preference
+        
+        Available days: {', '.join(Config.BUSINESS_HOURS)}
+        Available doctors: {', '.join(['Dr. ' + name for name in DOCTORS.keys()])}
+        
+        Return a JSON object with these fields. If information is not present, use null.
+        Example: {{"name": "John Smith", "day": "Monday", "time": "10:00 AM", "reason": "checkup", "doctor": "Smith"}}
+        Only return the JSON, nothing else.
+        """
+
+INSURANCE_EXTRACTION_PROMPT = f"""
+        Extract the following information from the patient's message if present:
+        - Patient name
+        - Insurance provider
+        - Policy number
+        
+        Available insurance providers: {', '.join(INSURANCE_PROVIDERS.keys())}
+        
+        Return a JSON object with these fields. If information is not present, use null.
+        Example: {{"name": "John Smith", "insurance": "BlueCross", "policy_number": "ABC123456"}}
+        Only return the JSON, nothing else.
         """
+
+SYSTEM_PROMPT = create_system_prompt()
+REPLY_PROMPT = SYSTEM_PROMPT + STATE_GUIDANCE
+STRUCTURED_REPLY_PROMPT = REPLY_PROMPT + TURN_RESULT_INSTRUCTIONS
+STREAMED_REPLY_PROMPT = REPLY_PROMPT + STREAMED_TURN_INSTRUCTIONS
+
+
+class ConversationHandler:
+    def __init__(self, llm_model="gpt-4o", llm=None, single_call=LLM_SINGLE_CALL, availability=None):
+        if llm is None:
+            # One client per process, so calls reuse its connection pool
+            llm = get_client_registry().chat_model(llm_model)
+            # JSON mode keeps the single-call reply parseable
+            self.structured_llm = llm.bind(response_format={"type": "json_object"})
+        else:
+            self.structured_llm = llm
+        self.llm = llm
+        self.single_call = single_call
+        self.memory = ConversationMemory()
+        self.patient_info = {
+            "name": None,
+            "insurance": None,
+            "policy_number": None,
+            "appointment_day": None,
+            "appointment_time": None,
+            "reason": None,
+            "doctor_preference": None,
+            "phone_number": None
+        }
+        self.current_intent = None
+        self.conversation_state = "greeting"  # greeting, collecting_info, confirming, closing
+        # Shared calendar; booking a slot takes it away from every other caller
+        self.availability = availability or get_availability()
+        self.booked_slot = None
+        self._confirmed_slot = None  # the booked slot once it is final in the booking store
+        self.turn_usage = {}
+        
+        # Static prompts are built once per process and shared by every call
+        self.system_prompt = SYSTEM_PROMPT
     
     def process_user_input(self, user_input):
         """Process user input and generate appropriate response"""
+        turn = self._turn(user_input)
+        content = None
+        try:
+            while True:
+                content = self._invoke(turn.send(content))
+        except StopIteration as done:
+            return done.value
+    
+    async def aprocess_user_input(self, user_input):
+        """Async process_user_input; waiting on the LLM doesn't block the event loop"""
+        turn = self._turn(user_input)
+        content = None
+        try:
+            while True:
+                content = await self._ainvoke(turn.send(content))
+        except StopIteration as done:
+            return done.value
+    
+    def stream_user_input(self, user_input):
+        """Process user input, yielding the response sentence by sentence as the LLM writes it"""
+        turn = self._turn(user_input, stream=True)
+        content = None
+        reply = ""
+        try:
+            while True:
+                request = turn.send(content)
+                if not request.stream:
+                    content = self._invoke(request)
+                    continue
+                
+                reader = ReplyStream(expect_header=request.structured)
+                message = None
+                metrics.increment("conversation.llm_calls")
+                for chunk in self.llm.stream(request.messages):
+                    message = chunk if message is None else message + chunk
+                    yield from reader.feed(chunk.content)
+                yield from reader.flush()
+                content = self._count_usage(message) if message is not None else ""
+                reply = split_streamed_reply(content)[1] if request.structured else content.strip()
+        except StopIteration as done:
+            response = done.value
+        
+        # Confirmation details added after the streamed reply
+        yield from split_sentences(response[len(reply):])
+    
+    async def astream_user_input(self, user_input):
+        """Async stream_user_input"""
+        turn = self._turn(user_input, stream=True)
+        content = None
+        reply = ""
+        try:
+            while True:
+                request = turn.send(content)
+                if not request.stream:
+                    content = await self._ainvoke(request)
+                    continue
+                
+                reader = ReplyStream(expect_header=request.structured)
+                message = None
+                metrics.increment("conversation.llm_calls")
+                async for chunk in self.llm.astream(request.messages):
+                    message = chunk if message is None else message + chunk
+                    for sentence in reader.feed(chunk.content):
+                        yield sentence
+                for sentence in reader.flush():
+                    yield sentence
+                content = self._count_usage(message) if message is not None else ""
+                reply = split_streamed_reply(content)[1] if request.structured else content.strip()
+        except StopIteration as done:
+            response = done.value
+        
+        for sentence in split_sentences(response[len(reply):]):
+            yield sentence
+    
+    def _turn(self, user_input, stream=False):
+        """One conversation turn.
+        
+        Yields an LLMRequest for every LLM call it needs and is sent the
+        reply text back, so the same logic runs under invoke, ainvoke and
+        streaming. Returns the response.
+        """
         
         # Add user input to conversation history
-        self.conversation_history.append({"role": "user", "content": user_input})
+        self.memory.add("human", user_input)
+        self.turn_usage = {"llm_calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+        
+        mode = "single_call" if self.single_call else "multi_call"
+        with metrics.timer(f"conversation.turn_time.{mode}"):
+            response = None
+            if self.single_call:
+                if stream:
+                    response = yield from self._process_streamed_structured_turn(user_input)
+                else:
+                    response = yield from self._process_structured_turn()
+            if response is None:
+                response = yield from self._process_sequential_turn(user_input, stream)
+        self._report_usage()
+        
+        # Add response to conversation history
+        self.memory.add("assistant", response)
+        
+        # Check if conversation is complete
+        if "goodbye" in user_input.lower() or "thank you" in user_input.lower() or "bye" in user_input.lower():
+            self.conversation_state = "closing"
+        
+        return response
+    
+    def _process_sequential_turn(self, user_input, stream=False):
+        """Intent, extraction and reply as separate LLM calls"""
+        yield from self._extract_sequentially(user_input)
         
+        # Generate response based on current state
+        return (yield from self._generate_response(stream))
+    
+    def _extract_sequentially(self, user_input):
+        """Intent and extraction as separate LLM calls"""
         # Determine intent if not already set
         if not self.current_intent and self.conversation_state == "greeting":
-            self.current_intent = self._determine_intent(user_input)
+            self.current_intent = yield from self._determine_intent(user_input)
             self.conversation_state = "collecting_info"
         
         # Update patient info based on input
-        self._update_patient_info(user_input)
+        yield from self._update_patient_info(user_input)
         
         # Check if all required patient info is present before confirming appointment
         if self.conversation_state == "collecting_info" and self._has_all_required_info():
             self.conversation_state = "confirming"
+    
+    def _process_structured_turn(self):
+        """Intent, extraction and reply from one LLM call; returns None if the reply can't be parsed"""
+        messages = self._history_messages(STRUCTURED_REPLY_PROMPT)
+        messages.append(("system", self._state_info()))
         
-        # Generate response based on current state
-        response = self._generate_response()
+        content = yield LLMRequest(messages, structured=True)
+        try:
+            result = parse_turn_result(content)
+        except (ValidationError, ValueError) as e:
+            print(f"Structured reply could not be parsed, using separate calls: {e}")
+            metrics.increment("conversation.structured_fallbacks")
+            return None
         
-        # Add response to conversation history
-        self.conversation_history.append({"role": "assistant", "content": response})
+        self._apply_turn_fields(result)
+        return self._add_confirmation(result.reply)
+    
+    def _process_streamed_structured_turn(self, user_input):
+        """Like _process_structured_turn, but the reply follows a JSON header line and is streamed.
         
-        # Check if conversation is complete
-        if "goodbye" in user_input.lower() or "thank you" in user_input.lower() or "bye" in user_input.lower():
-            self.conversation_state = "closing"
+        Returns None if nothing speakable came back.
+        """
+        messages = self._history_messages(STREAMED_REPLY_PROMPT)
+        messages.append(("system", self._state_info()))
         
-        return response
+        content = yield LLMRequest(messages, structured=True, stream=True)
+        header, reply = split_streamed_reply(content)
+        if not reply:
+            print("Streamed reply was empty, using separate calls")
+            metrics.increment("conversation.structured_fallbacks")
+            return None
+        
+        try:
+            self._apply_turn_fields(TurnFields.model_validate_json(header))
+        except (ValidationError, ValueError) as e:
+            # The reply has already been spoken; only the extraction needs redoing
+            print(f"Streamed header could not be parsed, extracting separately: {e}")
+            metrics.increment("conversation.structured_fallbacks")
+            yield from self._extract_sequentially(user_input)
+        
+        return self._add_confirmation(reply)
+    
+    def _apply_turn_fields(self, fields):
+        """Update intent, patient_info and state from a structured reply"""
+        if not self.current_intent and self.conversation_state == "greeting":
+            self.current_intent = fields.intent
+            self.conversation_state = "collecting_info"
+        
+        self._apply_extracted_info(fields.model_dump())
+        
+        if self.conversation_state == "collecting_info" and self._has_all_required_info():
+            self.conversation_state = "confirming"
+    
+    def _invoke(self, request):
+        """Run one chat completion and return the reply text"""
+        metrics.increment("conversation.llm_calls")
+        llm = self.structured_llm if request.structured else self.llm
+        return self._count_usage(llm.invoke(request.messages))
+    
+    async def _ainvoke(self, request):
+        metrics.increment("conversation.llm_calls")
+        llm = self.structured_llm if request.structured else self.llm
+        return self._count_usage(await llm.ainvoke(request.messages))
+    
+    def _count_usage(self, message):
+        """Add a reply's token usage to this turn's totals; returns the reply text"""
+        usage = getattr(message, "usage_metadata", None) or {}
+        details = usage.get("input_token_details") or {}
+        self.turn_usage["llm_calls"] += 1
+        self.turn_usage["input_tokens"] += usage.get("input_tokens", 0)
+        self.turn_usage["cached_tokens"] += details.get("cache_read", 0) or 0
+        self.turn_usage["output_tokens"] += usage.get("output_tokens", 0)
+        return message.content
+    
+    def _report_usage(self):
+        usage = self.turn_usage
+        if not usage["input_tokens"]:
+            return  # The model didn't report usage
+        
+        hit_rate = usage["cached_tokens"] / usage["input_tokens"]
+        metrics.observe("conversation.input_tokens", usage["input_tokens"])
+        metrics.observe("conversation.cached_tokens", usage["cached_tokens"])
+        metrics.observe("conversation.output_tokens", usage["output_tokens"])
+        metrics.observe("conversation.cache_hit_rate", hit_rate)
+        print(f"LLM usage: {usage['input_tokens']} input tokens ({hit_rate:.0%} cached), "
+              f"{usage['output_tokens']} output tokens, {usage['llm_calls']} calls")
     
     def _determine_intent(self, user_input):
         """Determine the user's intent from their input"""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are analyzing a patient's request to a medical clinic. Categorize their intent as one of: 'appointment', 'insurance', or 'info'. Respond with just that single word."),
+        messages = [
+            ("system", INTENT_PROMPT),
             ("human", user_input)
-        ])
+        ]
         
-        intent_chain = prompt | self.llm
-        intent = intent_chain.invoke({}).strip().lower()
+        intent = (yield LLMRequest(messages)).strip().lower()
         
         # Validate intent
         if intent not in ["appointment", "insurance", "info"]:
@@ -137,82 +519,57 @@ class ConversationHandler:
         # For now, we'll use a simple LLM-based extraction
         
         if self.current_intent == "appointment":
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", f"""
-                Extract the following information from the patient's message if present:
-                - Patient name
-                - Appointment day
-                - Appointment time
-                - Reason for visit
-                - Doctor preference
-                
-                Available days: {', '.join(APPOINTMENT_SLOTS.keys())}
-                Available doctors: {', '.join(['Dr. ' + name for name in DOCTORS.keys()])}
-                
-                Return a JSON object with these fields. If information is not present, use null.
-                Example: {{"name": "John Smith", "day": "Monday", "time": "10:00 AM", "reason": "checkup", "doctor": "Smith"}}
-                Only return the JSON, nothing else.
-                """),
+            messages = [
+                ("system", APPOINTMENT_EXTRACTION_PROMPT),
                 ("human", user_input)
-            ])
+            ]
             
-            extraction_chain = prompt | self.llm
+            content = yield LLMRequest(messages)
             try:
-                import json
-                result = extraction_chain.invoke({})
-                extracted_info = json.loads(result)
+                extracted_info = json.loads(content)
                 
-                if extracted_info.get("name"):
-                    self.patient_info["name"] = extracted_info["name"]
-                if extracted_info.get("day"):
-                    self.patient_info["appointment_day"] = extracted_info["day"]
-                if extracted_info.get("time"):
-                    self.patient_info["appointment_time"] = extracted_info["time"]
-                if extracted_info.get("reason"):
-                    self.patient_info["reason"] = extracted_info["reason"]
-                if extracted_info.get("doctor"):
-                    # Remove "Dr. " if present
-                    doctor = extracted_info["doctor"]
-                    if doctor.startswith("Dr. "):
-                        doctor = doctor[4:]
-                    self.patient_info["doctor_preference"] = doctor
+                self._apply_extracted_info({
+                    "name": extracted_info.get("name"),
+                    "appointment_day": extracted_info.get("day"),
+                    "appointment_time": extracted_info.get("time"),
+                    "reason": extracted_info.get("reason"),
+                    "doctor": extracted_info.get("doctor")
+                })
             except:
                 # If JSON parsing fails, continue without extraction
                 pass
                 
         elif self.current_intent == "insurance":
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", f"""
-                Extract the following information from the patient's message if present:
-                - Patient name
-                - Insurance provider
-                - Policy number
-                
-                Available insurance providers: {', '.join(INSURANCE_PROVIDERS.keys())}
-                
-                Return a JSON object with these fields. If information is not present, use null.
-                Example: {{"name": "John Smith", "insurance": "BlueCross", "policy_number": "ABC123456"}}
-                Only return the JSON, nothing else.
-                """),
+            messages = [
+                ("system", INSURANCE_EXTRACTION_PROMPT),
                 ("human", user_input)
-            ])
+            ]
             
-            extraction_chain = prompt | self.llm
+            content = yield LLMRequest(messages)
             try:
-                import json
-                result = extraction_chain.invoke({})
-                extracted_info = json.loads(result)
+                extracted_info = json.loads(content)
                 
-                if extracted_info.get("name"):
-                    self.patient_info["name"] = extracted_info["name"]
-                if extracted_info.get("insurance"):
-                    self.patient_info["insurance"] = extracted_info["insurance"]
-                if extracted_info.get("policy_number"):
-                    self.patient_info["policy_number"] = extracted_info["policy_number"]
+                self._apply_extracted_info({
+                    "name": extracted_info.get("name"),
+                    "insurance": extracted_info.get("insurance"),
+                    "policy_number": extracted_info.get("policy_number")
+                })
             except:
                 # If JSON parsing fails, continue without extraction
                 pass
     
+    def _apply_extracted_info(self, extracted_info):
+        """Copy non-empty extracted fields into patient_info"""
+        for field in ("name", "appointment_day", "appointment_time", "reason", "insurance", "policy_number"):
+            if extracted_info.get(field):
+                self.patient_info[field] = extracted_info[field]
+        if extracted_info.get("doctor"):
+            # Remove "Dr. " if present
+            doctor = extracted_info["doctor"]
+            if doctor.startswith("Dr. "):
+                doctor = doctor[4:]
+            self.patient_info["doctor_preference"] = doctor
+    
     def _has_all_required_info(self):
         """Check if we have all required information based on intent"""
         if self.current_intent == "appointment":
@@ -230,74 +587,88 @@ class ConversationHandler:
             )
         return True  # For general info, no specific requirements
     
-    def _generate_response(self):
-        """Generate appropriate response based on conversation state"""
+    def _history_messages(self, static_prompt):
+        """Static prompt, then the recent conversation.
         
-        # Create prompt with conversation history and current state
-        messages = [("system", self.system_prompt)]
+        Per-turn state goes after the history, so consecutive turns share
+        the longest possible prompt prefix.
+        """
+        messages = [("system", static_prompt)]
         
-        # Add conversation history (last 5 exchanges to keep context manageable)
-        history_to_include = self.conversation_history[-10:] if len(self.conversation_history) > 10 else self.conversation_history
-        for message in history_to_include:
-            if message["role"] == "user":
-                messages.append(("human", message["content"]))
-            else:
-                messages.append(("assistant", message["content"]))
-                
-        # Add current state information to help guide the response
-        state_info = f"""
+        # Recent turns within the token budget; older facts are in the state summary
+        messages.extend(self.memory)
+        return messages
+    
+    def _state_info(self):
+        """Current state information to help guide the response (see STATE_GUIDANCE)"""
+        return f"""
         Current conversation state: {self.conversation_state}
         Current patient intent: {self.current_intent}
         
-        Patient information collected so far:
-        - Name: {self.patient_info['name']}
-        - Insurance: {self.patient_info['insurance']}
-        - Policy Number: {self.patient_info['policy_number']}
-        - Appointment Day: {self.patient_info['appointment_day']}
-        - Appointment Time: {self.patient_info['appointment_time']}
-        - Reason for Visit: {self.patient_info['reason']}
-        - Doctor Preference: {self.patient_info['doctor_preference']}
-        
-        Based on this information:
-        
-        1. If this is a greeting, welcome the patient and ask how you can help.
-        
-        2. If collecting information:
-           - For appointments: If any required field is missing (name, day, time, reason), ask for it.
-           - For insurance: If any required field is missing (name, insurance provider, policy number), ask for it.
-           - For general info: Answer their question based on clinic information.
-        
-        3. If confirming:
-           - For appointments: Confirm the appointment details and check if the slot is available.
-           - For insurance: Verify if their insurance is accepted and confirm the details.
-        
-        4. If closing: Thank them for calling and wish them a good day.
-        
-        Remember to ask only ONE question at a time and keep responses concise and professional.
+        Patient information collected so far: {summarize_patient_info(self.patient_info)}{self._open_times()}
         """
+    
+    def _open_times(self):
+        """Open times on the requested day; these change with every booking"""
+        day = self.patient_info["appointment_day"]
+        if self.booked_slot:
+            return f"\n        Booked: {self.booked_slot.describe()} with Dr. {self.booked_slot.doctor}"
+        on = self.availability.first_open_date(day) if day else None
+        if not on:
+            return ""
+        times = ", ".join(slot.time for slot in self.availability.open_slots(on))
+        return f"\n        Open times on {format_date(on)}: {times}"
+    
+    def _generate_response(self, stream=False):
+        """Generate appropriate response based on conversation state"""
         
-        messages.append(("system", state_info))
+        # Create prompt with conversation history and current state
+        messages = self._history_messages(REPLY_PROMPT)
+        messages.append(("system", self._state_info()))
         
         # Generate response
-        prompt = ChatPromptTemplate.from_messages(messages)
-        response_chain = prompt | self.llm
-        response = response_chain.invoke({})
-        
-        # If confirming appointment, check if slot is available
-        if self.conversation_state == "confirming" and self.current_intent == "appointment":
+        content = yield LLMRequest(messages, stream=stream)
+        return self._add_confirmation(content.strip() if stream else content)
+    
+    def _confirm_booking(self, slot):
+        self.availability.confirm(slot, self.patient_info["name"], self.patient_info["phone_number"],
+                                  self.patient_info["reason"])
+        self._confirmed_slot = slot
+
+    def _add_confirmation(self, response):
+        """Append slot or insurance confirmation once all details are collected"""
+        # A slot the rules route held before handing the call over is made final once the details are in
+        if (self.conversation_state == "confirming" and self.current_intent == "appointment"
+                and self.booked_slot and self.booked_slot != self._confirmed_slot):
+            try:
+                self._confirm_booking(self.booked_slot)
+                response += f"\n\nYour appointment has been confirmed for {self.booked_slot.describe()} with Dr. {self.booked_slot.doctor}."
+            except SlotUnavailable:
+                self.booked_slot = None  # The hold lapsed and another caller took the slot
+
+        # If confirming appointment, book the earliest matching slot on the calendar
+        if self.conversation_state == "confirming" and self.current_intent == "appointment" and not self.booked_slot:
             day = self.patient_info["appointment_day"]
             time = self.patient_info["appointment_time"]
+            doctor = self.patient_info["doctor_preference"]
+            
+            # "10 AM" and "10:00 AM" are the same slot
+            minutes = parse_clock(time) if day and time else None
+            slot = None
+            if minutes is not None and (not doctor or doctor in DOCTORS):
+                slot = self.availability.find(day, minutes, doctor)
+            if slot:
+                try:
+                    self.availability.book(slot)
+                    self._confirm_booking(slot)
+                    self.booked_slot = slot
+                except SlotUnavailable:
+                    slot = None  # Another caller took it a moment ago
             
-            # Check if slot is available
-            if day in APPOINTMENT_SLOTS and time in APPOINTMENT_SLOTS[day]:
-                # Slot is available, update response to confirm
-                response += f"\n\nYour appointment has been confirmed for {day} at {time}."
-                if self.patient_info["doctor_preference"]:
-                    doctor = self.patient_info["doctor_preference"]
-                    if doctor in DOCTORS and day in DOCTORS[doctor]["available_days"]:
-                        response += f" with Dr. {doctor}."
-                    else:
-                        response += f" However, Dr. {doctor} is not available on {day}. Would you like to schedule with another doctor or choose a different day?"
+            if slot:
+                response += f"\n\nYour appointment has been confirmed for {slot.describe()} with Dr. {slot.doctor}."
+            elif doctor and minutes is not None and self.availability.find(day, minutes):
+                response += f"\n\nI'm sorry, but Dr. {doctor} is not available on {day} at {time}. Would you like to schedule with another doctor or choose a different day?"
             else:
                 # Slot is not available
                 response += f"\n\nI'm sorry, but the requested time slot ({time} on {day}) is not available. Would you like to choose another time or day?"
@@ -0,0 +1,81 @@
+"""
+Token-budgeted conversation memory
+
+Recent turns are kept in a bounded deque together with their token
+counts, so adding a turn and trimming old ones is O(1) per turn however
+long the call runs. Facts from turns that fall out of the window are not
+lost: the handler keeps them in `patient_info`, which is rendered as a
+compact summary by `summarize_patient_info`.
+
+When the budget is exceeded, memory is trimmed down to a low-water mark
+rather than by one message at a time. The oldest kept message then stays
+the same for several turns, so the provider's prompt-prefix cache keeps
+hitting on the history as well as on the static prompt.
+"""
+
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple
+
+from config import CONVERSATION_MEMORY_TOKENS, CONVERSATION_MEMORY_MAX_MESSAGES, CONVERSATION_MEMORY_TRIM_RATIO
+
+CHARS_PER_TOKEN = 4  # rough average for English text with OpenAI tokenizers
+
+# patient_info field -> label used in the summary
+_SUMMARY_LABELS = {
+    "name": "name",
+    "phone_number": "phone",
+    "insurance": "insurance",
+    "policy_number": "policy",
+    "appointment_day": "day",
+    "appointment_time": "time",
+    "reason": "reason",
+    "doctor_preference": "doctor",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without loading a tokenizer"""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def summarize_patient_info(patient_info: Dict[str, Optional[str]]) -> str:
+    """One line with only the details collected so far"""
+    known = [f"{label}={patient_info[field]}" for field, label in _SUMMARY_LABELS.items()
+             if patient_info.get(field)]
+    return "; ".join(known) if known else "nothing yet"
+
+
+class ConversationMemory:
+    def __init__(self, max_tokens: int = CONVERSATION_MEMORY_TOKENS,
+                 max_messages: int = CONVERSATION_MEMORY_MAX_MESSAGES,
+                 trim_ratio: float = CONVERSATION_MEMORY_TRIM_RATIO):
+        self.max_tokens = max_tokens
+        self.trim_to = int(max_tokens * trim_ratio)
+        self.tokens = 0
+        self._messages = deque(maxlen=max_messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        """Kept messages, oldest first, as (role, content) prompt tuples"""
+        for role, content, _ in self._messages:
+            yield role, content
+
+    def add(self, role: str, content: str):
+        """Remember a message; role is "human" or "assistant" """
+        if len(self._messages) == self._messages.maxlen:
+            self.tokens -= self._messages[0][2]  # about to be pushed out by the deque
+
+        tokens = estimate_tokens(content)
+        self._messages.append((role, content, tokens))
+        self.tokens += tokens
+
+        if self.tokens > self.max_tokens:
+            # Always keep the newest message, even if it alone is over budget
+            while len(self._messages) > 1 and self.tokens > self.trim_to:
+                self.tokens -= self._messages.popleft()[2]
+
+    def clear(self):
+        self._messages.clear()
+        self.tokens = 0
@@ -4,34 +4,51 @@ Drop-in replacement for your existing assistant
 """
 
 import re
-import json
 import time
 from typing import Dict, List, Optional, Any
-from appointment_handler import AppointmentHandler
-from datetime import datetime
-import os
+from appointment_handler import AppointmentHandler, SCHEDULE_PROMPT, STATIC_RESPONSES as APPOINTMENT_RESPONSES
+from entity_extractor import DAY, TIME, PHONE, NAME, first_entity, normalize_times
+from intent_matcher import classify
+from availability import SlotUnavailable, format_date, get_availability, parse_clock
+from config import SLOTS_OFFERED
+
+# Fixed replies - these never change between calls, so their audio is
+# pre-rendered into the TTS phrase cache (see prerender_tts.py)
+GREETING = "Thank you for calling Harmony Family Clinic. This is the virtual assistant speaking. How may I assist you today?"
+NO_INPUT_RESPONSE = "I'm sorry, I didn't hear anything. Could you please repeat that?"
+HOURS_RESPONSE = "Our clinic hours are Monday through Friday, 8:00 AM to 5:00 PM. We're closed on weekends. Would you like to schedule an appointment?"
+LOCATION_RESPONSE = "We're located at 123 Health Street, Orlando, FL 32801 in the Medical Plaza building with plenty of parking. Can I help you schedule a visit?"
+COST_RESPONSE = "Our fees vary by service and insurance coverage. We accept most insurance plans and offer competitive self-pay rates. Would you like to schedule an appointment to discuss your needs?"
+GOODBYE_RESPONSE = "Thank you for calling Harmony Family Clinic. Have a wonderful day!"
+INSURANCE_GENERAL_RESPONSE = "We accept most major insurance plans including Blue Cross Blue Shield, Aetna, Cigna, UnitedHealthcare, Humana, and others. Which insurance provider do you have?"
+NAME_PROMPT = "Thank you for that information. Could I get your full name for our records?"
+ASK_DAY_RESPONSE = "What day would work best for your appointment? We have availability Monday through Friday."
+HELP_RESPONSE = "I'm here to help with appointments, insurance questions, or any other information you need. How can I assist you?"
+
+STATIC_RESPONSES = [
+    GREETING, NO_INPUT_RESPONSE, HOURS_RESPONSE, LOCATION_RESPONSE, COST_RESPONSE,
+    GOODBYE_RESPONSE, INSURANCE_GENERAL_RESPONSE, NAME_PROMPT, ASK_DAY_RESPONSE, HELP_RESPONSE,
+] + APPOINTMENT_RESPONSES
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
 
 class AppointmentError(Exception):
     pass
 
 class SimpleEnhancedAssistant:
-    def __init__(self):
+    def __init__(self, availability=None):
         # Patient information
         self.patient_name = None
         self.phone = None
-        self.appointment_date = None
+        self.appointment_date = None  # weekday name, e.g. 'monday'
+        self.appointment_on = None  # the calendar date offered for that weekday
         self.appointment_time = None
+        self.booked_slot = None
         self.reason_for_visit = None
         self.context = "greeting"
         
-        # Available slots
-        self.available_slots = {
-            'monday': ['9:00 AM', '10:30 AM', '2:00 PM', '3:30 PM'],
-            'tuesday': ['9:15 AM', '10:00 AM', '1:15 PM', '3:30 PM'],
-            'wednesday': ['8:30 AM', '11:00 AM', '2:30 PM', '4:00 PM'],
-            'thursday': ['9:00 AM', '10:15 AM', '1:00 PM', '3:45 PM'],
-            'friday': ['8:45 AM', '10:30 AM', '2:15 PM', '4:30 PM']
-        }
+        # Shared calendar; booking a slot takes it away from every other caller
+        self.availability = availability or get_availability()
         
         # Insurance providers
         self.insurance_providers = [
@@ -44,16 +61,12 @@ class SimpleEnhancedAssistant:
         self.conversation_history = []
         
         # Initialize the appointment handler
-        self.appointment_handler = AppointmentHandler()
-        
-        # Appointment directory
-        self.appointments_dir = "appointments"
-        os.makedirs(self.appointments_dir, exist_ok=True)
+        self.appointment_handler = AppointmentHandler(self.availability)
 
     def process_input(self, user_input):
         """Main processing function - drop-in replacement"""
         if not user_input or not user_input.strip():
-            return "I'm sorry, I didn't hear anything. Could you please repeat that?"
+            return NO_INPUT_RESPONSE
         
         # Add to conversation history
         self.conversation_history.append({"role": "user", "content": user_input})
@@ -66,19 +79,23 @@ class SimpleEnhancedAssistant:
         if intent == 'insurance':
             response = self.handle_insurance(cleaned_input)
         elif intent == 'hours':
-            response = "Our clinic hours are Monday through Friday, 8:00 AM to 5:00 PM. We're closed on weekends. Would you like to schedule an appointment?"
+            response = HOURS_RESPONSE
         elif intent == 'location':
-            response = "We're located at 123 Health Street, Orlando, FL 32801 in the Medical Plaza building with plenty of parking. Can I help you schedule a visit?"
+            response = LOCATION_RESPONSE
         elif intent == 'cost':
-            response = "Our fees vary by service and insurance coverage. We accept most insurance plans and offer competitive self-pay rates. Would you like to schedule an appointment to discuss your needs?"
+            response = COST_RESPONSE
         elif intent == 'goodbye':
-            response = "Thank you for calling Harmony Family Clinic. Have a wonderful day!"
+            response = GOODBYE_RESPONSE
         elif intent == 'appointment':
             # Use the enhanced appointment handler
             response = self.appointment_handler.process_appointment_request(cleaned_input, self.conversation_history)
             
             # Update appointment information if it was set by the handler
             self._update_appointment_info_from_conversation()
+            slot = self.appointment_handler.booked_slot
+            if slot and slot != self.booked_slot:
+                # The handler already gave back the slot it replaced
+                self._use_slot(slot)
         else:
             response = self.handle_appointment_flow(cleaned_input)
         
@@ -99,7 +116,7 @@ class SimpleEnhancedAssistant:
                     break
         
         # Extract time
-        time_pattern = re.compile(r'appointment for \w+ at (\d{1,2}:\d{2} [AP]M)', re.IGNORECASE)
+        time_pattern = re.compile(r'appointment for \w+(?:, \w+ \d+)? at (\d{1,2}:\d{2} [AP]M)', re.IGNORECASE)
         for message in reversed(self.conversation_history):
             if "content" in message:
                 time_match = time_pattern.search(message["content"])
@@ -109,126 +126,26 @@ class SimpleEnhancedAssistant:
 
     def fix_speech_errors(self, text):
         """Fix common speech-to-text errors"""
-        text = text.strip()
-        
-        # Time corrections
-        corrections = {
-            'turn am': '10:00 AM',
-            'turn AM': '10:00 AM',
-            '10 am': '10:00 AM',
-            '10am': '10:00 AM',
-            '9.15': '9:15 AM',
-            '9:15': '9:15 AM',
-            '1.15': '1:15 PM',
-            '1:15': '1:15 PM',
-            '3.30': '3:30 PM',
-            '3:30': '3:30 PM',
-            'nine fifteen': '9:15 AM',
-            'ten am': '10:00 AM',
-            'one fifteen': '1:15 PM',
-            'three thirty': '3:30 PM'
-        }
-        
-        text_lower = text.lower()
-        for error, fix in corrections.items():
-            if error in text_lower:
-                return text.replace(error, fix)
-        
-        return text
+        # Spoken and misheard times ("nine fifteen", "turn am") become "9:15 AM"
+        return normalize_times(text.strip())
 
     def extract_day(self, text):
         """Extract day from text"""
-        text = text.lower()
-        days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
-        
-        for day in days:
-            if day in text or day[:3] in text:
-                return day
-        return None
+        day = first_entity(text, DAY)
+        return day if day in WEEKDAYS else None
 
     def extract_time(self, text):
         """Extract time with better error handling"""
-        text = self.fix_speech_errors(text)
-        
-        # Normalize the text for better matching
-        text = text.lower().replace('.', ':')
-        
-        # Look for time patterns
-        time_patterns = [
-            r'(\d{1,2}):(\d{2})\s*(am|pm)',
-            r'(\d{1,2})\s*(am|pm)',
-            r'(\d{1,2}):(\d{2})'
-        ]
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, text)
-            if match:
-                # Format the time consistently
-                if len(match.groups()) == 3:  # HH:MM AM/PM format
-                    hour, minute, ampm = match.groups()
-                    return f"{hour}:{minute} {ampm.upper()}"
-                elif len(match.groups()) == 2:
-                    if ':' in match.group(0):  # HH:MM format
-                        hour, minute = match.groups()
-                        # Assume PM for afternoon hours
-                        ampm = "PM" if int(hour) >= 12 and int(hour) < 24 else "AM"
-                        return f"{hour}:{minute} {ampm}"
-                    else:  # HH AM/PM format
-                        hour, ampm = match.groups()
-                        return f"{hour}:00 {ampm.upper()}"
-        
-        # Check for simple hour mentions (e.g., "11 a.m.")
-        hour_pattern = r'(\d{1,2})(?:\s*)(a\.m\.|am|a\.m|p\.m\.|pm|p\.m)'
-        hour_match = re.search(hour_pattern, text)
-        if hour_match:
-            hour = hour_match.group(1)
-            am_pm = 'AM' if any(x in hour_match.group(2).lower() for x in ['a', 'am']) else 'PM'
-            return f"{hour}:00 {am_pm}"
-        
-        return None
+        return first_entity(text, TIME)
 
     def extract_phone(self, text):
         """Extract phone number"""
-        # Remove words
-        numbers_only = re.sub(r'[^\d\s]', '', text)
-        digits = re.findall(r'\d', numbers_only)
-        
-        if len(digits) >= 10:
-            phone_str = ''.join(digits[:10])
-            return f"({phone_str[:3]}) {phone_str[3:6]}-{phone_str[6:]}"
-        
-        return None
+        return first_entity(text, PHONE)
 
     def detect_intent(self, text):
         """Detect what the user wants"""
-        text = text.lower()
-        
-        # Expanded goodbye phrases
-        goodbye_phrases = [
-            'goodbye', 'bye', 'thank you', 'thanks', 
-            'that\'s it', 'i\'m finished', 'i\'m done', 'no that\'s all',
-            'that\'s all', 'end call', 'hang up', 'finished', 'done',
-            'no more questions', 'nothing else'
-        ]
-        
-        # Check for goodbye intent first
-        for phrase in goodbye_phrases:
-            if phrase in text:
-                return 'goodbye'
-        
-        # Then check other intents
-        if any(word in text for word in ['appointment', 'book', 'schedule', 'visit']):
-            return 'appointment'
-        elif any(word in text for word in ['insurance', 'coverage', 'plan', 'blue cross', 'aetna']):
-            return 'insurance'
-        elif any(word in text for word in ['hours', 'open', 'time', 'when']):
-            return 'hours'
-        elif any(word in text for word in ['where', 'location', 'address']):
-            return 'location'
-        elif any(word in text for word in ['cost', 'price', 'fee', 'charge']):
-            return 'cost'
-        
-        return 'general'
+        # Goodbye wins over everything else, then INTENT_KEYWORDS order
+        return classify(text).intent
 
     def handle_insurance(self, text):
         """Handle insurance questions"""
@@ -240,7 +157,7 @@ class SimpleEnhancedAssistant:
                 return f"Yes, we do accept {insurance}. Most of their plans are in-network with our providers. Would you like me to verify your specific coverage when you come in?"
         
         # General insurance question
-        return "We accept most major insurance plans including Blue Cross Blue Shield, Aetna, Cigna, UnitedHealthcare, Humana, and others. Which insurance provider do you have?"
+        return INSURANCE_GENERAL_RESPONSE
 
     def handle_appointment_flow(self, user_input):
         """Handle appointment booking flow"""
@@ -248,64 +165,46 @@ class SimpleEnhancedAssistant:
         # Initial appointment request
         if any(word in user_input.lower() for word in ['appointment', 'book', 'schedule']) and not self.appointment_date:
             self.context = "scheduling"
-            return "I'd be happy to help you schedule an appointment. What day would work best for you? We're open Monday through Friday."
+            return SCHEDULE_PROMPT
         
         # Day selection
         day = self.extract_day(user_input)
         if day and not self.appointment_date:
-            self.appointment_date = day
-            slots = self.available_slots.get(day, [])
-            slots_text = ", ".join(slots)
-            return f"For {day.title()}, I have these times available: {slots_text}. Which time works best for you?"
+            on = self.availability.first_open_date(day)
+            if not on:
+                return f"I'm sorry, we don't have any openings on {day.title()}s in the coming weeks. Would another day work?"
+            self.appointment_date, self.appointment_on = day, on
+            return f"For {format_date(on)}, I have these times available: {self._offered_times()}. Which time works best for you?"
         
-        # Time selection
+        # Time selection, or a different time before the booking is confirmed
         time = self.extract_time(user_input)
-        if time and self.appointment_date and not self.appointment_time:
-            # Check if time is available
-            available_times = self.available_slots.get(self.appointment_date, [])
-            
-            # Normalize the extracted time and available times for comparison
-            normalized_time = time.lower().replace('.', ':').replace(' ', '')
-            
-            for available_time in available_times:
-                normalized_avail = available_time.lower().replace('.', ':').replace(' ', '')
-                
-                # Check for exact match or partial match
-                if normalized_time == normalized_avail or normalized_time in normalized_avail:
-                    self.appointment_time = available_time
-                    return f"Perfect! I have you scheduled for {self.appointment_date.title()} at {available_time}. May I ask what brings you in today?"
-        
-            # If we get here, no match was found
-            # Try to match just the hour part
-            hour_match = re.search(r'(\d{1,2})', time)
-            if hour_match:
-                hour = hour_match.group(1)
-                for available_time in available_times:
-                    if hour in available_time.split(':')[0]:
-                        self.appointment_time = available_time
-                        return f"Perfect! I have you scheduled for {self.appointment_date.title()} at {available_time}. May I ask what brings you in today?"
-        
-            # Time not available
-            slots_text = ", ".join(available_times)
-            return f"I don't have {time} available on {self.appointment_date.title()}. The available times are: {slots_text}. Which works for you?"
+        if time and self.appointment_date and (not self.appointment_time or self._is_new_time(time)):
+            on = self._appointment_day()
+            slot = self.availability.match(on, parse_clock(time)) if on else None
+            if slot:
+                try:
+                    self.availability.book(slot)
+                    if self.booked_slot and self.booked_slot != slot:
+                        self.availability.release(self.booked_slot)
+                    self._use_slot(slot)
+                    return f"Perfect! I have you scheduled for {slot.describe()}. May I ask what brings you in today?"
+                except SlotUnavailable:
+                    pass  # Another caller took it a moment ago
+        
+            # Time not available - offer the closest one
+            nearest = self.availability.nearest(on, parse_clock(time)) if on else None
+            closest = f" The closest is {nearest.time}." if nearest else ""
+            return f"I don't have {time} available on {self.appointment_date.title()}.{closest} The available times are: {self._offered_times()}. Which works for you?"
         
         # Reason for visit
         if self.appointment_date and self.appointment_time and not self.reason_for_visit and not any(word in user_input.lower() for word in ['name', 'phone', 'email']):
             self.reason_for_visit = user_input.strip()
-            return "Thank you for that information. Could I get your full name for our records?"
+            return NAME_PROMPT
         
         # Name collection
         if ('name' in user_input.lower() or not self.patient_name) and self.appointment_time:
-            # Extract name
-            if 'name is' in user_input.lower():
-                name_part = user_input.lower().split('name is')[1].strip()
-                self.patient_name = name_part.title()
-            elif 'i\'m' in user_input.lower():
-                name_part = user_input.lower().split('i\'m')[1].strip()
-                self.patient_name = name_part.title()
-            else:
-                # Assume the input is the name if we're asking for it
-                self.patient_name = user_input.strip().title()
+            # Extract name; if there is no "my name is", assume the input is the name since we asked for it
+            self.patient_name = first_entity(user_input, NAME) or user_input.strip().title()
             
             return f"Thank you, {self.patient_name}. Would you like me to send a confirmation to your phone or email?"
         
@@ -313,18 +212,50 @@ class SimpleEnhancedAssistant:
         phone = self.extract_phone(user_input)
         if phone:
             self.phone = phone
-            return f"Perfect! I'll send a confirmation to {phone}. Your appointment summary:\n\nPatient: {self.patient_name}\nDate: {self.appointment_date.title()}\nTime: {self.appointment_time}\nReason: {self.reason_for_visit}\n\nPlease arrive 15 minutes early. Is there anything else I can help you with?"
+            if self.booked_slot:
+                try:
+                    self.save_appointment()
+                except AppointmentError:
+                    # The hold lapsed and someone else took the time
+                    lapsed = self.appointment_time
+                    self.booked_slot = self.appointment_time = None
+                    return f"I'm sorry, {lapsed} on {self._appointment_day_text()} was booked by someone else while we were talking. The available times are: {self._offered_times()}. Which works for you?"
+            return f"Perfect! I'll send a confirmation to {phone}. Your appointment summary:\n\nPatient: {self.patient_name}\nDate: {self._appointment_day_text()}\nTime: {self.appointment_time}\nReason: {self.reason_for_visit}\n\nPlease arrive 15 minutes early. Is there anything else I can help you with?"
         
         # Default responses based on context
         if not self.appointment_date:
-            return "What day would work best for your appointment? We have availability Monday through Friday."
+            return ASK_DAY_RESPONSE
         elif not self.appointment_time:
-            slots = self.available_slots.get(self.appointment_date, [])
-            slots_text = ", ".join(slots)
-            return f"For {self.appointment_date.title()}, which time works best: {slots_text}?"
+            return f"For {self._appointment_day_text()}, which time works best: {self._offered_times()}?"
         
         # General helpful response
-        return "I'm here to help with appointments, insurance questions, or any other information you need. How can I assist you?"
+        return HELP_RESPONSE
+    
+    def _use_slot(self, slot):
+        """Make a booked slot the caller's appointment, here and in the appointment handler"""
+        self.booked_slot = self.appointment_handler.booked_slot = slot
+        self.appointment_date = WEEKDAYS[slot.date.weekday()]
+        self.appointment_on = slot.date
+        self.appointment_time = slot.time
+    
+    def _is_new_time(self, time):
+        """True if the caller asks for another time while a slot is held but not yet confirmed"""
+        return bool(self.booked_slot) and not self.phone and parse_clock(time) not in (None, self.booked_slot.minutes)
+    
+    def _appointment_day(self):
+        """Calendar date for the chosen weekday, picked on first use"""
+        if self.appointment_date and not self.appointment_on:
+            self.appointment_on = self.availability.first_open_date(self.appointment_date)
+        return self.appointment_on
+    
+    def _appointment_day_text(self):
+        on = self._appointment_day()
+        return format_date(on) if on else self.appointment_date.title()
+    
+    def _offered_times(self):
+        on = self._appointment_day()
+        slots = self.availability.open_slots(on, limit=SLOTS_OFFERED) if on else []
+        return ", ".join(slot.time for slot in slots)
     
     def get_appointment_summary(self):
         """Return a formatted appointment summary"""
@@ -334,7 +265,7 @@ class SimpleEnhancedAssistant:
         summary = f"""
 === APPOINTMENT SUMMARY ===
 Patient: {self.patient_name or 'Not provided'}
-Date: {self.appointment_date.title()}
+Date: {self._appointment_day_text()}
 Time: {self.appointment_time}
 Reason: {self.reason_for_visit or 'Not specified'}
 Contact: {self.phone or 'Not provided'}
@@ -350,32 +281,30 @@ Thank you for choosing Harmony Family Clinic!
             "patient_name": self.patient_name,
             "phone": self.phone,
             "appointment_date": self.appointment_date,
+            "appointment_on": self.appointment_on.isoformat() if self.appointment_on else None,
             "appointment_time": self.appointment_time,
+            "doctor": self.booked_slot.doctor if self.booked_slot else None,
             "reason_for_visit": self.reason_for_visit,
             "context": self.context
         }
     
-    def save_appointment(self, appointment_data: Dict[str, Any]) -> str:
+    def save_appointment(self, appointment_data: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """Confirm the held slot in the booking store; returns the booking id"""
+        data = appointment_data or self.to_dict()
         try:
             # Validate appointment data
-            self._validate_appointment_data(appointment_data)
-            
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"appointment_{timestamp}.json"
-            filepath = os.path.join(self.appointments_dir, filename)
-            
-            # Save to file
-            with open(filepath, 'w') as f:
-                json.dump(appointment_data, f, indent=2)
+            self._validate_appointment_data(data)
+            if not self.booked_slot:
+                raise ValueError("No time slot is held for this appointment")
             
-            return filepath
+            return self.availability.confirm(
+                self.booked_slot, data["patient_name"], data.get("phone"), data.get("reason_for_visit"))
             
-        except Exception as e:
+        except (ValueError, SlotUnavailable) as e:
             raise AppointmentError(f"Failed to save appointment: {str(e)}")
     
     def _validate_appointment_data(self, data: Dict[str, Any]) -> None:
-        required_fields = ["name", "day", "time"]
+        required_fields = ["patient_name", "appointment_date", "appointment_time"]
         missing_fields = [field for field in required_fields if not data.get(field)]
         
         if missing_fields:
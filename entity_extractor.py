@@ -0,0 +1,290 @@
+"""
+Single-pass entity extraction for caller transcripts
+
+A transcript is tokenized once by one compiled pattern, and a single scan
+over the tokens picks out days, times, phone numbers and names. Each
+entity comes back normalized ("Monday", "1:15 PM", "(407) 555-0123",
+"Jane Doe") with its span in the original text. The same scan drives
+`normalize_times`, which rewrites every spoken time in a transcript into
+the "H:MM AM" form the scheduling code expects.
+
+Results are memoized on the text, so the router, the rule engine and the
+voice handler share one extraction per transcript.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+DAY = "day"
+TIME = "time"
+PHONE = "phone"
+NAME = "name"
+
+DAY_NAMES = {
+    'monday': 'monday', 'mon': 'monday',
+    'tuesday': 'tuesday', 'tue': 'tuesday', 'tues': 'tuesday',
+    'wednesday': 'wednesday', 'wed': 'wednesday',
+    'thursday': 'thursday', 'thu': 'thursday', 'thur': 'thursday', 'thurs': 'thursday',
+    'friday': 'friday', 'fri': 'friday',
+    'saturday': 'saturday', 'sunday': 'sunday',
+}
+
+HOUR_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'turn': 10,  # "ten am" as speech-to-text often hears it
+}
+
+# Spoken minutes; "forty" also takes a following "five"
+MINUTE_WORDS = {'fifteen': 15, 'thirty': 30, 'forty': 40, 'fifty': 50}
+
+DIGIT_WORDS = {
+    'zero': '0', 'oh': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+}
+
+NAME_TRIGGERS = [('my', 'name', 'is'), ('name', 'is'), ("name's",), ('this', 'is'), ("i'm",), ('i', 'am')]
+_NAME_TRIGGER_STARTS = {trigger[0] for trigger in NAME_TRIGGERS}
+
+# Words that follow a name trigger without being a name ("I'm calling to...")
+_NOT_NAMES = {
+    'a', 'an', 'the', 'not', 'just', 'here', 'calling', 'looking', 'trying', 'having', 'feeling',
+    'going', 'wondering', 'sorry', 'fine', 'good', 'okay', 'ok', 'so', 'very', 'really', 'sure',
+    'available', 'free', 'interested', 'new', 'sick', 'at', 'on', 'for', 'with', 'to', 'and',
+    'but', 'about', 'in', 'from', 'still', 'also', 'done', 'finished', 'it', 'that', 'is',
+}
+
+# Meridiems, numbers, words and separators; the kind of a token is told
+# from its text, which is faster than one named group per kind
+_TOKEN = re.compile(r"(?<![a-z])[ap]\.?m\b\.?|\d+|[a-z]+(?:'[a-z]+)?|[:.\-()+]", re.IGNORECASE)
+_MERIDIEMS = {'am', 'pm', 'a.m', 'p.m', 'a.m.', 'p.m.'}
+
+_PHONE_SEPARATORS = {'-', '.', '(', ')', '+'}
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str   # lowercased
+    start: int
+    end: int
+
+
+class Entity(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+def _kind(token):
+    if token[0].isdigit():
+        return 'number'
+    if token in _MERIDIEMS:
+        return 'meridiem'
+    return 'word' if token[0].isalpha() else 'sep'
+
+
+def tokenize(text: str) -> List[Token]:
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        token = match.group().lower()
+        tokens.append(Token(_kind(token), token, match.start(), match.end()))
+    return tokens
+
+
+def format_time(hour: int, minute: int, meridiem: Optional[str] = None) -> Optional[str]:
+    """'H:MM AM' for a spoken time, or None if it is not a clock time.
+
+    Without AM/PM, hours are read inside the clinic day: 7-11 are morning,
+    12-6 afternoon, and 13-23 as a 24-hour clock.
+    """
+    if minute > 59:
+        return None
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        return f"{hour}:{minute:02d} {'AM' if meridiem.startswith('a') else 'PM'}"
+    if hour > 23:
+        return None
+    if hour == 0:
+        return f"12:{minute:02d} AM"
+    if 7 <= hour <= 11:
+        return f"{hour}:{minute:02d} AM"
+    return f"{hour - 12 if hour > 12 else hour}:{minute:02d} PM"
+
+
+class _Scanner:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+
+    def kind(self, i):
+        return self.tokens[i].kind if i < len(self.tokens) else None
+
+    def word(self, i):
+        return self.tokens[i].text if i < len(self.tokens) else None
+
+    def touching(self, i, j):
+        """True if only whitespace separates tokens i and j"""
+        return not self.text[self.tokens[i].end:self.tokens[j].start].strip()
+
+    def meridiem_at(self, i):
+        if self.kind(i) == 'meridiem':
+            return self.word(i)[0]
+        return None
+
+    def time_at(self, i) -> Optional[Tuple[str, int]]:
+        """(normalized time, index after it) for a time starting at token i"""
+        tokens = self.tokens
+        kind, word = tokens[i].kind, tokens[i].text
+
+        if kind == 'number':
+            # 10:30, 9.15, 10:30 am, 10 30 am, 10-30 am
+            if (self.kind(i + 2) == 'number' and len(self.word(i + 2)) == 2
+                    and self.word(i + 1) in (':', '.', '-')):
+                meridiem = self.meridiem_at(i + 3)
+                if self.word(i + 1) != '-' or meridiem:
+                    value = format_time(int(word), int(self.word(i + 2)), meridiem)
+                    if value:
+                        return value, i + 4 if meridiem else i + 3
+            if (self.kind(i + 1) == 'number' and len(self.word(i + 1)) == 2
+                    and self.meridiem_at(i + 2) and self.touching(i, i + 1)):
+                value = format_time(int(word), int(self.word(i + 1)), self.meridiem_at(i + 2))
+                if value:
+                    return value, i + 3
+
+            meridiem = self.meridiem_at(i + 1)
+            if meridiem and len(word) <= 2:
+                value = format_time(int(word), 0, meridiem)  # 10 am
+            elif meridiem and len(word) in (3, 4):
+                value = format_time(int(word[:-2]), int(word[-2:]), meridiem)  # 115 pm
+            elif self.word(i + 1) == "o'clock" and len(word) <= 2:
+                value = format_time(int(word), 0)
+            else:
+                return None
+            return (value, i + 2) if value else None
+
+        if kind == 'word' and word in HOUR_WORDS:
+            hour, end, minute = HOUR_WORDS[word], i + 1, None
+            if self.word(end) in MINUTE_WORDS:
+                minute = MINUTE_WORDS[self.word(end)]
+                end += 1
+                if minute == 40:
+                    if self.word(end) == '-':
+                        end += 1
+                    if self.word(end) != 'five':
+                        return None
+                    minute, end = 45, end + 1
+            elif self.word(end) == "o'clock":
+                minute, end = 0, end + 1
+
+            meridiem = self.meridiem_at(end)
+            if minute is None and not meridiem:
+                return None  # a bare "one" or "ten" is not a time
+            if meridiem:
+                end += 1
+            value = format_time(hour, minute or 0, meridiem)
+            return (value, end) if value else None
+
+        return None
+
+    def phone_at(self, i) -> Optional[Tuple[str, int]]:
+        digits = []
+        j = i
+        while j < len(self.tokens):
+            kind, word = self.tokens[j].kind, self.tokens[j].text
+            if kind == 'number':
+                digits.append(word)
+            elif kind == 'word' and word in DIGIT_WORDS:
+                digits.append(DIGIT_WORDS[word])
+            elif kind != 'sep' or word not in _PHONE_SEPARATORS or j == i:
+                break
+            j += 1
+
+        number = "".join(digits)
+        if len(number) == 11 and number.startswith('1'):
+            number = number[1:]
+        if len(number) < 10:
+            return None
+        while self.tokens[j - 1].kind == 'sep':
+            j -= 1
+        return f"({number[:3]}) {number[3:6]}-{number[6:10]}", j
+
+    def name_at(self, i) -> Optional[Tuple[str, int, int]]:
+        for trigger in NAME_TRIGGERS:
+            if tuple(self.word(i + k) for k in range(len(trigger))) != trigger:
+                continue
+            start = j = i + len(trigger)
+            while (j < len(self.tokens) and j - start < 3 and self.kind(j) == 'word'
+                   and self.word(j) not in _NOT_NAMES and self.word(j) not in DAY_NAMES
+                   and (j == start or self.touching(j - 1, j))):
+                j += 1
+            if j > start:
+                words = self.text[self.tokens[start].start:self.tokens[j - 1].end].split()
+                return " ".join(word.capitalize() for word in words), start, j
+            return None
+        return None
+
+    def scan(self) -> Tuple[Entity, ...]:
+        entities = []
+        tokens = self.tokens
+        i = 0
+        while i < len(tokens):
+            kind, word, start, _ = tokens[i]
+            # Each matcher only runs on tokens that can start its entity
+            if kind == 'number' or word in HOUR_WORDS:
+                found = self.time_at(i)
+                if found:
+                    value, end = found
+                    entities.append(Entity(TIME, value, start, tokens[end - 1].end))
+                    i = end
+                    continue
+
+            if kind == 'number' or word in DIGIT_WORDS:
+                found = self.phone_at(i)
+                if found:
+                    value, end = found
+                    entities.append(Entity(PHONE, value, start, tokens[end - 1].end))
+                    i = end
+                    continue
+
+            if word in _NAME_TRIGGER_STARTS:
+                found = self.name_at(i)
+                if found:
+                    value, first, end = found
+                    entities.append(Entity(NAME, value, tokens[first].start, tokens[end - 1].end))
+                    i = end
+                    continue
+
+            if word in DAY_NAMES:
+                entities.append(Entity(DAY, DAY_NAMES[word], start, tokens[i].end))
+            i += 1
+        return tuple(entities)
+
+
+@lru_cache(maxsize=256)
+def extract_entities(text: str) -> Tuple[Entity, ...]:
+    """Every day, time, phone number and name in the text, in order"""
+    return _Scanner(text).scan()
+
+
+def first_entity(text: str, kind: str) -> Optional[str]:
+    for entity in extract_entities(text):
+        if entity.kind == kind:
+            return entity.value
+    return None
+
+
+@lru_cache(maxsize=256)
+def normalize_times(text: str) -> str:
+    """Rewrite each spoken time in a transcript as 'H:MM AM'"""
+    pieces = []
+    last = 0
+    for entity in extract_entities(text):
+        if entity.kind == TIME:
+            pieces.append(text[last:entity.start])
+            pieces.append(entity.value)
+            last = entity.end
+    pieces.append(text[last:])
+    return "".join(pieces)
@@ -0,0 +1,162 @@
+"""
+Stand-in chat model for tests, benchmarks and load tests
+
+Answers the ConversationHandler prompts (intent, extraction, reply and the
+single structured call) from simple rules over the caller's latest
+message, after sleeping for a fixed per-call latency so turn timings
+behave like a real provider round-trip without spending tokens.
+
+Replies carry usage metadata from a simulated provider prefix cache:
+prompts of at least 1024 tokens reuse any previously seen prefix in
+128-token blocks, with a token counted as four characters.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+_DAYS = re.compile(r'\b(monday|tuesday|wednesday|thursday|friday)\b', re.IGNORECASE)
+_TIME = re.compile(r'\b(\d{1,2}:\d{2}\s*[ap]m)\b', re.IGNORECASE)
+_NAME = re.compile(r"\bmy name is ([a-z]+(?: [a-z]+)?)", re.IGNORECASE)
+_REASON = re.compile(r'\bfor (?:a |an )?([a-z]+(?: [a-z]+)?)(?: on|$|\.)', re.IGNORECASE)
+_DOCTOR = re.compile(r'\bdr\.? ([a-z]+)', re.IGNORECASE)
+
+CHARS_PER_TOKEN = 4
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_BLOCK_TOKENS = 128
+
+
+def _classify(text):
+    lowered = text.lower()
+    if "insurance" in lowered or "policy" in lowered:
+        return "insurance"
+    if "appointment" in lowered or _DAYS.search(text):
+        return "appointment"
+    return "info"
+
+
+def _extract(text):
+    def first(pattern, transform=lambda value: value):
+        match = pattern.search(text)
+        return transform(match.group(1)) if match else None
+
+    return {
+        "name": first(_NAME, str.title),
+        "appointment_day": first(_DAYS, str.title),
+        "appointment_time": first(_TIME, str.upper),
+        "reason": first(_REASON),
+        "doctor": first(_DOCTOR, str.title),
+    }
+
+
+class ScriptedChatModel:
+    """Duck-types the parts of a LangChain chat model the handlers use"""
+
+    def __init__(self, latency=0.0, structured_output=True, token_delay=0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.structured_output = structured_output
+        self.calls = 0
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+
+    def bind(self, **kwargs):
+        return self
+
+    def _respond(self, messages):
+        system = "\n".join(content for role, content in messages if role == "system")
+        latest = next((content for role, content in reversed(messages) if role == "human"), "")
+
+        if "Categorize their intent" in system:
+            return _classify(latest)
+        if "Extract the following information" in system:
+            extracted = _extract(latest)
+            return json.dumps({
+                "name": extracted["name"], "day": extracted["appointment_day"],
+                "time": extracted["appointment_time"], "reason": extracted["reason"],
+                "doctor": extracted["doctor"]
+            })
+
+        reply = "Thanks. Could you tell me a little more?"
+        if "Start your reply with a single line holding a JSON object" in system:
+            if not self.structured_output:
+                return reply
+            header = dict(_extract(latest), intent=_classify(latest))
+            return json.dumps(header) + "\n" + reply
+        if "JSON schema" in system:
+            if not self.structured_output:
+                return reply  # Plain text where JSON was asked for
+            return json.dumps(dict(_extract(latest), intent=_classify(latest), reply=reply))
+        return reply
+
+    def _usage(self, messages, reply):
+        prompt = "".join(f"{role}\x00{content}\x00" for role, content in messages)
+        block = PREFIX_CACHE_BLOCK_TOKENS * CHARS_PER_TOKEN
+        input_tokens = len(prompt) // CHARS_PER_TOKEN
+
+        cached_tokens = 0
+        if input_tokens >= PREFIX_CACHE_MIN_TOKENS:
+            prefixes = [hash(prompt[:end]) for end in range(block, len(prompt) + 1, block)]
+            with self._lock:
+                for prefix in prefixes:
+                    if prefix not in self._cached_prefixes:
+                        break
+                    cached_tokens += PREFIX_CACHE_BLOCK_TOKENS
+                self._cached_prefixes.update(prefixes)
+
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": len(reply) // CHARS_PER_TOKEN,
+            "total_tokens": input_tokens + len(reply) // CHARS_PER_TOKEN,
+            "input_token_details": {"cache_read": cached_tokens},
+        }
+
+    def _reply(self, messages):
+        content = self._respond(messages)
+        return AIMessage(content=content, usage_metadata=self._usage(messages, content))
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._reply(messages)
+
+    def _chunks(self, messages):
+        """The reply split into word-sized chunks; the last one carries the usage"""
+        content = self._respond(messages)
+        pieces = re.findall(r'\S+\s*|\s+', content) or [""]
+        for piece in pieces[:-1]:
+            yield AIMessageChunk(content=piece)
+        yield AIMessageChunk(content=pieces[-1], usage_metadata=self._usage(messages, content))
+
+    def stream(self, messages):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        for chunk in self._chunks(messages):
+            yield chunk
+            if self.token_delay:
+                time.sleep(self.token_delay)
+
+    async def astream(self, messages):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for chunk in self._chunks(messages):
+            yield chunk
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+
+    async def ainvoke(self, messages):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._reply(messages)
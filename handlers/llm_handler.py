@@ -1,13 +1,13 @@
-import openai
-from openai import OpenAI
 from dotenv import load_dotenv
-import os
+
+from api_clients import get_client_registry
+from tts_pipeline import SentenceChunker
 
 load_dotenv()
 
 class LLMHandler:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = get_client_registry().openai()
         self.system_prompt = """
         You are an AI front desk assistant for Wellness Medical Center. Your role is to:
         1. Help patients schedule appointments
@@ -25,16 +25,18 @@ class LLMHandler:
         - Keep responses concise
         """
         
+    def _build_messages(self, user_input, conversation_history):
+        messages = [{"role": "system", "content": self.system_prompt}]
+        messages.extend(conversation_history)
+        messages.append({"role": "user", "content": user_input})
+        return messages
+        
     def generate_response(self, user_input, conversation_history=[]):
         """Generate a response using the OpenAI API"""
         try:
-            messages = [{"role": "system", "content": self.system_prompt}]
-            messages.extend(conversation_history)
-            messages.append({"role": "user", "content": user_input})
-            
             response = self.client.chat.completions.create(
                 model="gpt-4",
-                messages=messages,
+                messages=self._build_messages(user_input, conversation_history),
                 temperature=0.7
             )
             
@@ -42,3 +44,22 @@ class LLMHandler:
         except Exception as e:
             print(f"Error generating response: {e}")
             return "I'm sorry, I'm having trouble processing your request. Could you please try again?"
+    
+    def stream_response(self, user_input, conversation_history=[]):
+        """Yield the response sentence by sentence while the OpenAI API is still generating it"""
+        try:
+            stream = self.client.chat.completions.create(
+                model="gpt-4",
+                messages=self._build_messages(user_input, conversation_history),
+                temperature=0.7,
+                stream=True
+            )
+            
+            chunker = SentenceChunker()
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield from chunker.feed(chunk.choices[0].delta.content)
+            yield from chunker.flush()
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            yield "I'm sorry, I'm having trouble processing your request. Could you please try again?"
@@ -0,0 +1,227 @@
+"""
+Hybrid rules-first / LLM-fallback turn router
+
+Most caller turns are routine: the hours, the address, a day, a time, a
+phone number. The rule engine in enhanced_ai_assistant answers those in
+pure Python in well under a millisecond. Only turns the rules cannot read
+with confidence - several intents at once, open questions, nothing to
+extract - are escalated to the ConversationHandler and its LLM.
+
+Slots collected on either route are copied to the other, so a booking
+can move between them turn by turn. Every turn records the counter
+`router.route.<route>` and the timing `router.turn_time.<route>`.
+"""
+
+import re
+from typing import NamedTuple
+
+from clinic_data import CLINIC_INFO
+from enhanced_ai_assistant import SimpleEnhancedAssistant, NO_INPUT_RESPONSE
+from intent_matcher import matched_intents
+from metrics import metrics
+from tts_pipeline import split_sentences
+
+RULES = "rules"
+LLM = "llm"
+
+# Intents the rule engine answers with a canned or table-driven reply
+_DIRECT_INTENTS = {'goodbye', 'insurance', 'hours', 'location', 'cost', 'appointment'}
+
+_QUESTION_START = re.compile(
+    r"^\s*(what|why|how|which|who|can|could|would|should|is|are|do|does|will)\b", re.IGNORECASE
+)
+
+
+class Route(NamedTuple):
+    route: str
+    reason: str
+
+
+def _is_question(text):
+    return text.rstrip().endswith('?') or bool(_QUESTION_START.match(text))
+
+
+class HybridRouter:
+    """Drop-in for ConversationHandler that answers confident turns locally.
+
+    `llm_handler` is any object with the ConversationHandler interface; by
+    default one is built the first time a turn is escalated, so calls
+    that never need the LLM never construct a client.
+    """
+
+    def __init__(self, rules=None, llm_handler=None, llm_factory=None):
+        self.rules = rules or SimpleEnhancedAssistant()
+        self._llm_handler = llm_handler
+        self._llm_factory = llm_factory
+        self._closing = False
+        # Turns the rules answered since the LLM last saw the conversation
+        self._unsynced = []
+
+    @property
+    def llm_handler(self):
+        if self._llm_handler is None:
+            if self._llm_factory is None:
+                from conversation_handler import ConversationHandler
+                self._llm_factory = ConversationHandler
+            self._llm_handler = self._llm_factory()
+        return self._llm_handler
+
+    @property
+    def conversation_state(self):
+        if self._closing:
+            return "closing"
+        if self._llm_handler is not None:
+            return self._llm_handler.conversation_state
+        return "collecting_info" if self.rules.appointment_date else "greeting"
+
+    def get_greeting(self):
+        if self._llm_handler is not None:
+            return self._llm_handler.get_greeting()
+        return f"Hello! Thank you for calling {CLINIC_INFO['name']}. I'm an AI assistant. How can I help you today?"
+
+    def route(self, user_input):
+        """Decide which route answers this turn, without changing any state"""
+        if not user_input or not user_input.strip():
+            return Route(RULES, "no input")
+
+        text = self.rules.fix_speech_errors(user_input)
+        intents = matched_intents(text)
+        if len(intents) > 1:
+            return Route(LLM, "several intents: " + ", ".join(intents))
+        if intents:
+            if intents[0] in _DIRECT_INTENTS:
+                return Route(RULES, intents[0])
+            return Route(LLM, intents[0])
+
+        # No intent keyword: the rules can still fill the slot the booking is waiting for
+        rules = self.rules
+        if not rules.appointment_date:
+            if rules.extract_day(text):
+                return Route(RULES, "day")
+        elif not rules.appointment_time:
+            if rules.extract_time(text):
+                return Route(RULES, "time")
+        elif not _is_question(text):
+            if not rules.reason_for_visit:
+                return Route(RULES, "reason")
+            if not rules.patient_name:
+                return Route(RULES, "name")
+        if rules.extract_phone(text):
+            return Route(RULES, "phone")
+        return Route(LLM, "nothing to extract")
+
+    def process_user_input(self, user_input):
+        route = self.route(user_input)
+        with metrics.timer(f"router.turn_time.{route.route}"):
+            if route.route == RULES:
+                return self._answer_locally(user_input, route)
+            self._before_llm_turn()
+            response = self.llm_handler.process_user_input(user_input)
+            self._after_llm_turn(user_input, response)
+            return response
+
+    async def aprocess_user_input(self, user_input):
+        route = self.route(user_input)
+        with metrics.timer(f"router.turn_time.{route.route}"):
+            if route.route == RULES:
+                return self._answer_locally(user_input, route)
+            self._before_llm_turn()
+            response = await self.llm_handler.aprocess_user_input(user_input)
+            self._after_llm_turn(user_input, response)
+            return response
+
+    def stream_user_input(self, user_input):
+        route = self.route(user_input)
+        if route.route == RULES:
+            with metrics.timer(f"router.turn_time.{RULES}"):
+                response = self._answer_locally(user_input, route)
+            yield from split_sentences(response)
+            return
+
+        # Streamed LLM turns are timed by the handler (time to first sentence);
+        # timing here would include the caller's playback
+        self._before_llm_turn()
+        sentences = []
+        for sentence in self.llm_handler.stream_user_input(user_input):
+            sentences.append(sentence)
+            yield sentence
+        self._after_llm_turn(user_input, " ".join(sentences))
+
+    async def astream_user_input(self, user_input):
+        route = self.route(user_input)
+        if route.route == RULES:
+            with metrics.timer(f"router.turn_time.{RULES}"):
+                response = self._answer_locally(user_input, route)
+            for sentence in split_sentences(response):
+                yield sentence
+            return
+
+        self._before_llm_turn()
+        sentences = []
+        async for sentence in self.llm_handler.astream_user_input(user_input):
+            sentences.append(sentence)
+            yield sentence
+        self._after_llm_turn(user_input, " ".join(sentences))
+
+    def _answer_locally(self, user_input, route):
+        metrics.increment(f"router.route.{RULES}")
+        response = self.rules.process_input(user_input)
+        if response != NO_INPUT_RESPONSE:
+            self._unsynced.append(("human", user_input))
+            self._unsynced.append(("assistant", response))
+        if route.reason == "goodbye":
+            self._closing = True
+        return response
+
+    def _before_llm_turn(self):
+        """Bring the LLM handler up to date with what the rules collected"""
+        metrics.increment(f"router.route.{LLM}")
+        handler = self.llm_handler
+        for role, content in self._unsynced:
+            handler.memory.add(role, content)
+        self._unsynced.clear()
+
+        rules = self.rules
+        info = handler.patient_info
+        for field, value in (
+            ("name", rules.patient_name),
+            ("phone_number", rules.phone),
+            ("appointment_day", rules.appointment_date and rules.appointment_date.title()),
+            ("appointment_time", rules.appointment_time),
+            ("reason", rules.reason_for_visit),
+        ):
+            if value and not info.get(field):
+                info[field] = value
+
+        # Both routes hold the same slot, so only that one is ever confirmed. If the
+        # rules moved the caller to another time they already gave the old slot back
+        if rules.booked_slot != handler.booked_slot:
+            handler.booked_slot = rules.booked_slot
+            if rules.booked_slot:
+                info["appointment_day"] = rules.appointment_date.title()
+                info["appointment_time"] = rules.booked_slot.time
+
+        if rules.appointment_date and not handler.current_intent:
+            handler.current_intent = "appointment"
+            handler.conversation_state = "collecting_info"
+
+    def _after_llm_turn(self, user_input, response):
+        """Hand what the LLM collected back to the rules"""
+        rules = self.rules
+        rules.conversation_history.append({"role": "user", "content": user_input})
+        rules.conversation_history.append({"role": "assistant", "content": response})
+
+        info = self.llm_handler.patient_info
+        day = info.get("appointment_day")
+        rules.appointment_date = rules.appointment_date or (day.lower() if day else None)
+        rules.appointment_time = rules.appointment_time or info.get("appointment_time")
+        rules.reason_for_visit = rules.reason_for_visit or info.get("reason")
+        rules.patient_name = rules.patient_name or info.get("name")
+        rules.phone = rules.phone or info.get("phone_number")
+        slot = self.llm_handler.booked_slot
+        if slot != rules.booked_slot:
+            # The LLM only books once it holds nothing, so there is no older slot to give back
+            rules.booked_slot = rules.appointment_handler.booked_slot = slot
+            if slot:
+                rules.appointment_on = slot.date
+                rules.appointment_time = slot.time
@@ -0,0 +1,87 @@
+"""
+Single-pass keyword intent matcher
+
+Every goodbye phrase and intent keyword is compiled into one alternation
+regex with word boundaries, so a transcript is scanned once instead of
+once per keyword. Results are memoized on the normalized text: the same
+turn is classified by the router, the assistant and the main loop, and
+only the first of them pays for the scan.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+# Phrases that end the call; checked before any other intent
+GOODBYE_PHRASES = [
+    'goodbye', 'bye', 'thank you', 'thanks',
+    'that\'s it', 'i\'m finished', 'i\'m done', 'no that\'s all',
+    'that\'s all', 'end call', 'hang up', 'finished', 'done',
+    'no more questions', 'nothing else'
+]
+
+# Keywords per intent, in priority order
+INTENT_KEYWORDS = {
+    'appointment': ['appointment', 'book', 'schedule', 'visit'],
+    'insurance': ['insurance', 'coverage', 'plan', 'blue cross', 'aetna'],
+    'hours': ['hours', 'open', 'time', 'when'],
+    'location': ['where', 'location', 'address'],
+    'cost': ['cost', 'price', 'fee', 'charge'],
+}
+
+INTENT_PRIORITY = ['goodbye'] + list(INTENT_KEYWORDS)
+
+# Keywords also match their plain inflections ("booking", "fees", "plans")
+_INFLECTION = r'(?:s|es|d|ed|ing)?'
+
+
+class KeywordSpan(NamedTuple):
+    intent: str
+    keyword: str
+    start: int
+    end: int
+
+
+class IntentMatch(NamedTuple):
+    intent: str                     # highest-priority intent, or 'general'
+    intents: Tuple[str, ...]        # every matched intent, in priority order
+    spans: Tuple[KeywordSpan, ...]  # every keyword hit, in text order
+
+
+def _compile(table):
+    intent_of = {word: intent for intent, words in table.items() for word in words}
+    # Longest first, so "no that's all" wins over "that's all" at the same position.
+    # One capture group plus a dict lookup is several times faster in `re`
+    # than a named group per keyword
+    alternation = "|".join(re.escape(word) for word in sorted(intent_of, key=len, reverse=True))
+    return re.compile(rf"\b({alternation}){_INFLECTION}\b"), intent_of
+
+
+_MATCHER, _INTENT_OF = _compile({'goodbye': GOODBYE_PHRASES, **INTENT_KEYWORDS})
+
+
+@lru_cache(maxsize=256)
+def _classify(text: str) -> IntentMatch:
+    spans = []
+    found = set()
+    for match in _MATCHER.finditer(text):
+        keyword = match.group(1)
+        intent = _INTENT_OF[keyword]
+        spans.append(KeywordSpan(intent, keyword, match.start(), match.end()))
+        found.add(intent)
+
+    intents = tuple(intent for intent in INTENT_PRIORITY if intent in found)
+    return IntentMatch(intents[0] if intents else 'general', intents, tuple(spans))
+
+
+def classify(text: str) -> IntentMatch:
+    """Intent, all matched intents and keyword spans for one transcript.
+
+    Spans index into the lowercased, stripped text.
+    """
+    return _classify(text.strip().lower())
+
+
+def matched_intents(text):
+    """Every intent whose keywords appear in the text, in priority order"""
+    return list(classify(text).intents)
@@ -0,0 +1,321 @@
+"""
+Resident local text-to-speech worker
+
+When ElevenLabs is off or fails, replies are spoken by a local engine. Each
+reply used to spawn a fresh `say` process. Now one worker process owns
+the engine instead. It is started and warmed once, receives sentences
+over a queue and sends back 16-bit mono PCM at LOCAL_TTS_SAMPLE_RATE. The
+audio is cached in the phrase cache like ElevenLabs audio, and it plays
+through the same output stream and call recording.
+
+The engine runs in its own process because pyttsx3 blocks the thread that
+renders, and on macOS it has to be that process's main thread. Backends
+are pluggable:
+
+    pyttsx3   the system voices: NSSpeechSynthesizer on macOS, libespeak on Linux
+    espeak    the espeak-ng / espeak command line, for images without libespeak
+    file      a test stub that renders a tone and appends each request to a log file
+"""
+
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional, Type
+
+import numpy as np
+
+from audio_playback import PCM16Decoder
+from config import LOCAL_TTS_BACKEND, LOCAL_TTS_RATE, LOCAL_TTS_SAMPLE_RATE, LOCAL_TTS_TIMEOUT, LOCAL_TTS_VOICE
+from metrics import metrics
+
+# Tried in order by the "auto" backend
+AUTO_BACKENDS = ("pyttsx3", "espeak")
+
+_READY = "ready"
+_WARM_UP_TEXT = "Ready."
+
+
+class LocalTTSError(RuntimeError):
+    pass
+
+
+def _audio_to_pcm(source, sample_rate: int) -> bytes:
+    """16-bit mono PCM at `sample_rate` from a WAV or AIFF file or file-like object"""
+    import soundfile as sf
+
+    from resampler import resample
+
+    audio, rate = sf.read(source, dtype="float32", always_2d=True)
+    audio = resample(audio.mean(axis=1), rate, sample_rate)
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class LocalTTSBackend:
+    """Renders one sentence to 16-bit mono PCM; lives inside the worker process"""
+
+    name = ""
+
+    def __init__(self, sample_rate: int = LOCAL_TTS_SAMPLE_RATE, voice: str = LOCAL_TTS_VOICE,
+                 rate: int = LOCAL_TTS_RATE):
+        self.sample_rate = sample_rate
+        self.voice = voice
+        self.rate = rate
+
+    def warm(self):
+        """Load the engine and its voice before the first real sentence"""
+        self.render(_WARM_UP_TEXT)
+
+    def render(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+class Pyttsx3Backend(LocalTTSBackend):
+    name = "pyttsx3"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        for voice in self.engine.getProperty('voices'):
+            if self.voice and self.voice.lower() in voice.name.lower():
+                self.engine.setProperty('voice', voice.id)
+                break
+        self.engine.setProperty('rate', self.rate)
+        self.engine.setProperty('volume', 1.0)
+        # NSSpeechSynthesizer writes AIFF, the other drivers WAV
+        suffix = ".aiff" if sys.platform == "darwin" else ".wav"
+        self._path = os.path.join(tempfile.mkdtemp(prefix="local-tts-"), f"utterance{suffix}")
+
+    def render(self, text):
+        self.engine.save_to_file(text, self._path)
+        self.engine.runAndWait()
+        return _audio_to_pcm(self._path, self.sample_rate)
+
+
+class EspeakBackend(LocalTTSBackend):
+    """One short-lived espeak process per sentence, but inside the worker, off the call's thread"""
+
+    name = "espeak"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.binary is None:
+            raise LocalTTSError("Neither espeak-ng nor espeak is on the PATH")
+
+    def render(self, text):
+        import io
+
+        result = subprocess.run([self.binary, "--stdout", "-s", str(self.rate), text],
+                                capture_output=True, check=True)
+        return _audio_to_pcm(io.BytesIO(result.stdout), self.sample_rate)
+
+
+class FileBackend(LocalTTSBackend):
+    """Test stub: 50 ms of tone per word, and one "<pid>\\t<text>" line per request in `log_path`"""
+
+    name = "file"
+
+    def __init__(self, log_path: Optional[str] = None, **options):
+        super().__init__(**options)
+        self.log_path = log_path
+
+    def warm(self):
+        pass  # nothing to load, and the log only holds real requests
+
+    def render(self, text):
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"{os.getpid()}\t{text}\n")
+        samples = int(self.sample_rate * 0.05) * max(1, len(text.split()))
+        tone = 0.3 * np.sin(2 * np.pi * 440 * np.arange(samples) / self.sample_rate)
+        return (tone * 32767).astype("<i2").tobytes()
+
+
+BACKENDS: Dict[str, Type[LocalTTSBackend]] = {
+    Pyttsx3Backend.name: Pyttsx3Backend,
+    EspeakBackend.name: EspeakBackend,
+    FileBackend.name: FileBackend,
+}
+
+
+def _serve(backend: str, options: dict, requests, results):
+    """Worker process: build and warm a backend, then render sentences until told to stop"""
+    engine, errors = None, []
+    for name in AUTO_BACKENDS if backend == "auto" else (backend,):
+        try:
+            engine = BACKENDS[name](**options)
+            engine.warm()
+            break
+        except Exception as e:
+            engine = None
+            errors.append(f"{name}: {e}")
+    if engine is None:
+        results.put((_READY, None, "; ".join(errors)))
+        return
+    results.put((_READY, engine.name, None))
+
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        request_id, text = request
+        try:
+            results.put((request_id, engine.render(text), None))
+        except Exception as e:
+            results.put((request_id, None, str(e)))
+
+
+class LocalTTSWorker:
+    """Client side of the worker process; `render` and `synthesize` are safe to call from any thread.
+
+    The worker is started on first use, or ahead of time with `warm_up`. If it
+    dies or stops answering, it is replaced on the next request.
+    """
+
+    def __init__(self, backend: str = LOCAL_TTS_BACKEND, cache=None, timeout: float = LOCAL_TTS_TIMEOUT,
+                 sample_rate: int = LOCAL_TTS_SAMPLE_RATE, **options):
+        if backend != "auto" and backend not in BACKENDS:
+            raise ValueError(f"Unknown local TTS backend: {backend}")
+        self.backend = backend
+        self.cache = cache
+        self.timeout = timeout
+        self.sample_rate = sample_rate
+        self.options = {"sample_rate": sample_rate, **options}
+        self.backend_name = None  # the backend actually running, once started
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start and warm the worker if it is not running; raises LocalTTSError if no backend works"""
+        with self._lock:
+            if not self.running:
+                self._start()
+        return self
+
+    def warm_up(self) -> threading.Thread:
+        """Start the worker in the background so the first reply does not wait for it"""
+        def _warm():
+            try:
+                self.start()
+            except LocalTTSError as e:
+                print(f"Local speech synthesis unavailable: {e}")
+
+        thread = threading.Thread(target=_warm, name="local-tts-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _start(self):
+        self._stop()
+        # Spawned, not forked: the engine must not inherit the audio and HTTP state of this process
+        context = multiprocessing.get_context("spawn")
+        self._requests, self._results = context.Queue(), context.Queue()
+        self._process = context.Process(target=_serve, name="local-tts",
+                                        args=(self.backend, self.options, self._requests, self._results),
+                                        daemon=True)
+        with metrics.timer("local_tts.start_time"):
+            self._process.start()
+            _, name, error = self._receive(_READY)
+        if error:
+            self._stop()
+            raise LocalTTSError(f"No local TTS backend could start ({error})")
+        self.backend_name = name
+        metrics.increment("local_tts.starts")
+
+    def _receive(self, request_id):
+        """The worker's answer to one request, waiting no longer than `timeout`"""
+        waited = 0.0
+        while True:
+            try:
+                answer = self._results.get(timeout=0.25)
+            except queue.Empty:
+                waited += 0.25
+                if not self._process.is_alive() or waited >= self.timeout:
+                    self._stop()
+                    raise LocalTTSError("Local TTS worker stopped responding") from None
+                continue
+            if answer[0] == request_id:
+                return answer
+
+    def _cache_key(self, text):
+        # Keyed on the configured backend, so a cached sentence plays without starting the worker
+        return f"local:{self.options.get('voice', LOCAL_TTS_VOICE)}", self.backend, text, f"pcm_{self.sample_rate}"
+
+    def render(self, text: str) -> bytes:
+        """16-bit mono PCM at `sample_rate` for one sentence, from the phrase cache or the worker"""
+        if self.cache is not None:
+            audio = self.cache.get(*self._cache_key(text))
+            if audio is not None:
+                return audio
+
+        with self._lock:
+            if not self.running:
+                self._start()
+            self._next_id += 1
+            request_id = self._next_id
+            with metrics.timer("local_tts.render_time"):
+                self._requests.put((request_id, text))
+                _, audio, error = self._receive(request_id)
+        if error:
+            raise LocalTTSError(f"Local TTS failed: {error}")
+
+        metrics.increment("local_tts.renders")
+        if self.cache is not None:
+            voice_id, model_id, text, output_format = self._cache_key(text)
+            self.cache.put(voice_id, model_id, text, audio, output_format)
+        return audio
+
+    def synthesize(self, sentence: str) -> Iterator[np.ndarray]:
+        """Float32 samples for one sentence, in the shape SentencePipeline plays"""
+        samples = PCM16Decoder().decode(self.render(sentence))
+        if samples.size:
+            yield samples
+
+    def _stop(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.is_alive():
+            try:
+                self._requests.put(None)
+                process.join(timeout=1.0)
+            except Exception:
+                pass
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1.0)
+        self._requests = self._results = None
+
+    def close(self):
+        """Stop the worker process"""
+        with self._lock:
+            self._stop()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_local_tts() -> LocalTTSWorker:
+    """Return the worker shared by every voice handler in the process"""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                from tts_cache import get_phrase_cache
+
+                _worker = LocalTTSWorker(cache=get_phrase_cache())
+    return _worker
@@ -1,16 +1,26 @@
-from simple_enhanced_assistant import SimpleEnhancedAssistant
-from voice_handler_simple import VoiceHandler
+import time
+_STARTED = time.perf_counter()
+
 import json
 import os
-import time
 from datetime import datetime
-from config import USE_ELEVENLABS, LISTENING_WINDOW, PAUSE_BETWEEN_RESPONSES
+from enhanced_ai_assistant import SimpleEnhancedAssistant, GREETING
+from config import USE_ELEVENLABS, LISTENING_WINDOW, PAUSE_BETWEEN_RESPONSES, LOCAL_WHISPER_MODEL, PRELOAD_LOCAL_WHISPER
+from metrics import metrics
 
 def main():
     """Main function to run the AI front desk assistant"""
     print("\n=== AI FRONT-DESK ASSISTANT FOR HEALTHCARE CLINIC ===\n")
     
     try:
+        # Audio and speech providers load here, on first use, rather than when main is imported
+        from voice_handler_simple import VoiceHandler
+        
+        # Load the local Whisper fallback while the rest of startup happens
+        if PRELOAD_LOCAL_WHISPER:
+            from model_registry import get_model_registry
+            get_model_registry().warm_up([LOCAL_WHISPER_MODEL])
+        
         # Setup voice handler with Mac mic and speakers
         # Use configuration to determine ElevenLabs usage
         voice_handler = VoiceHandler(use_elevenlabs=USE_ELEVENLABS)
@@ -29,7 +39,8 @@ def main():
         voice_handler.start_call_recording()
         
         # Initial greeting
-        initial_response = "Thank you for calling Harmony Family Clinic. This is the virtual assistant speaking. How may I assist you today?"
+        initial_response = GREETING
+        metrics.set_gauge("startup.seconds_to_greeting", time.perf_counter() - _STARTED)
         print(f"AI: {initial_response}")
         voice_handler.text_to_speech(initial_response)
         
@@ -86,7 +97,7 @@ def main():
     except ImportError as e:
         print(f"\n❌ IMPORT ERROR: {e}")
         print("Please ensure all required files are present:")
-        print("- simple_enhanced_assistant.py")
+        print("- enhanced_ai_assistant.py")
         print("- voice_handler_simple.py")
         print("- config.py")
     except KeyboardInterrupt:
@@ -104,6 +115,8 @@ def main():
         # Stop call recording and save the complete conversation
         if 'voice_handler' in locals():
             voice_handler.stop_call_recording()
+        
+        metrics.print_summary()
 
 def save_conversation_log(assistant):
     """Save the conversation log to a file"""
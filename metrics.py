@@ -0,0 +1,99 @@
+"""
+Process-wide metrics for the front desk assistant
+
+Counters, gauges and timing observations are kept in memory and can be
+printed at the end of a call or exported as a dictionary.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any
+
+# Keep the most recent observations per timing so memory stays bounded
+MAX_OBSERVATIONS = 1000
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.timings = {}
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            if name not in self.timings:
+                self.timings[name] = deque(maxlen=MAX_OBSERVATIONS)
+            self.timings[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the body of a `with` block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of all metrics with timing summaries"""
+        with self._lock:
+            timings = {}
+            for name, values in self.timings.items():
+                values = list(values)
+                timings[name] = {
+                    "count": len(values),
+                    "mean": sum(values) / len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "max": max(values),
+                }
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": timings,
+            }
+
+    def print_summary(self):
+        """Print a human readable summary"""
+        snapshot = self.snapshot()
+        if not any(snapshot.values()):
+            return
+
+        print("📊 Metrics:")
+        for name, value in sorted(snapshot["counters"].items()):
+            print(f"  {name}: {value}")
+        for name, value in sorted(snapshot["gauges"].items()):
+            print(f"  {name}: {value:.2f}")
+        for name, summary in sorted(snapshot["timings"].items()):
+            print(f"  {name}: n={summary['count']} p50={summary['p50'] * 1000:.0f}ms "
+                  f"p95={summary['p95'] * 1000:.0f}ms max={summary['max'] * 1000:.0f}ms")
+
+
+# Shared instance used by every component in the process
+metrics = Metrics()
@@ -0,0 +1,138 @@
+"""
+Process-wide registry for local speech models
+
+Loading a local Whisper model takes seconds and hundreds of MB, so each
+model is loaded once and shared by every turn and every session in the
+process. Models can be warmed up in the background at startup.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from metrics import metrics
+
+
+def _load_whisper_model(name: str):
+    import whisper
+    return whisper.load_model(name)
+
+
+def _warm_whisper_model(model):
+    # One second of silence is enough to initialise the decoder
+    model.transcribe(np.zeros(16000, dtype=np.float32))
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident memory of this process in bytes, if the platform exposes it"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ModelRegistry:
+    def __init__(self,
+                 loader: Callable[[str], object] = _load_whisper_model,
+                 warmer: Optional[Callable[[object], None]] = _warm_whisper_model):
+        self.loader = loader
+        self.warmer = warmer
+        self._models: Dict[str, object] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._lock:
+            if name not in self._load_locks:
+                self._load_locks[name] = threading.Lock()
+            return self._load_locks[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str):
+        """Return the model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            metrics.increment("model_registry.hits")
+            return model
+
+        # Only one thread loads a given model; others wait for it
+        with self._lock_for(name):
+            model = self._models.get(name)
+            if model is not None:
+                metrics.increment("model_registry.hits")
+                return model
+
+            print(f"Loading local model '{name}'...")
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            model = self.loader(name)
+            load_seconds = time.perf_counter() - start
+            rss_after = current_rss_bytes()
+
+            metrics.increment("model_registry.loads")
+            metrics.observe(f"model_registry.load_time.{name}", load_seconds)
+            if rss_before is not None and rss_after is not None:
+                metrics.set_gauge(f"model_registry.rss_delta_mb.{name}",
+                                  (rss_after - rss_before) / (1024 * 1024))
+                metrics.set_gauge("model_registry.process_rss_mb", rss_after / (1024 * 1024))
+
+            print(f"Local model '{name}' loaded in {load_seconds:.1f}s")
+            self._models[name] = model
+            return model
+
+    def warm_up(self, names: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """Load (and optionally exercise) models ahead of the first turn"""
+        names = list(names)
+
+        def _warm():
+            for name in names:
+                try:
+                    model = self.get(name)
+                    if self.warmer is not None:
+                        with metrics.timer(f"model_registry.warm_time.{name}"):
+                            self.warmer(model)
+                except Exception as e:
+                    print(f"Failed to warm up local model '{name}': {e}")
+
+        if not background:
+            _warm()
+            return None
+
+        thread = threading.Thread(target=_warm, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        """Drop all loaded models"""
+        with self._lock:
+            self._models.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the registry shared by the whole process"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pre-render the assistant's fixed replies into the TTS phrase cache
+
+Run at deploy time so the greeting, hours, location, cost, goodbye and
+scheduling prompts play back without a network round-trip:
+
+    python prerender_tts.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from api_clients import get_client_registry
+from config import ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, ELEVENLABS_OUTPUT_FORMAT
+from enhanced_ai_assistant import STATIC_RESPONSES
+from tts_cache import get_phrase_cache
+from tts_pipeline import split_sentences
+
+
+def prerender(client, cache, voice_id=ELEVENLABS_VOICE_ID, model_id=ELEVENLABS_MODEL_ID,
+              output_format=ELEVENLABS_OUTPUT_FORMAT, phrases=STATIC_RESPONSES):
+    """Render every sentence that is not cached yet; returns (rendered, skipped)"""
+    rendered = 0
+    skipped = 0
+
+    # Replies are synthesized one sentence at a time, so that is what gets cached
+    cache.persist(phrases)
+    sentences = [sentence for phrase in phrases for sentence in split_sentences(phrase)]
+
+    for text in dict.fromkeys(sentences):  # de-duplicate, keep order
+        if cache.contains(voice_id, model_id, text, output_format):
+            skipped += 1
+            continue
+
+        print(f"Rendering: {text[:60]}{'...' if len(text) > 60 else ''}")
+        cache.get_or_render(
+            voice_id, model_id, text,
+            lambda: client.text_to_speech.convert(
+                voice_id=voice_id, text=text, model_id=model_id, output_format=output_format
+            ),
+            output_format
+        )
+        rendered += 1
+
+    return rendered, skipped
+
+
+def main():
+    load_dotenv()
+
+    if not os.getenv("ELEVENLABS_API_KEY"):
+        print("ELEVENLABS_API_KEY is not set - nothing to pre-render.")
+        sys.exit(1)
+
+    client = get_client_registry().elevenlabs()
+    cache = get_phrase_cache()
+
+    rendered, skipped = prerender(client, cache)
+    print(f"✅ Pre-rendered {rendered} sentences ({skipped} already cached) into {cache.directory}")
+
+
+if __name__ == "__main__":
+    main()
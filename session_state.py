@@ -0,0 +1,266 @@
+"""
+Versioned snapshots of call state
+
+Everything a call has collected lives in one of three objects: the rule
+engine (SimpleEnhancedAssistant and its AppointmentHandler), the LLM
+ConversationHandler, and the HybridRouter that keeps the two in step.
+`snapshot` copies their state into small `__slots__` records and packs
+each record as a positional list, behind a header with a magic, a format
+version and a codec byte. `restore` loads a snapshot into a freshly built
+session of the same kind, so a call can continue on another worker or
+after a crash without replaying the conversation. A slot hold in the
+booking store travels with the call and is adopted by the new worker.
+
+Snapshots are msgpack when ormsgpack or msgpack is installed and compact
+JSON otherwise; the codec byte says which, so any worker reads both.
+`SessionStore` keeps the latest snapshot of each call in a local directory.
+"""
+
+import json
+import os
+import re
+import tempfile
+from datetime import date
+from typing import Optional
+
+from availability import Slot
+from booking_store import Hold
+from config import SESSION_CHECKPOINT_DIR
+from metrics import metrics
+
+try:
+    import ormsgpack as _msgpack
+except ImportError:
+    try:
+        import msgpack as _msgpack
+    except ImportError:
+        _msgpack = None
+
+SNAPSHOT_VERSION = 1
+_MAGIC = b"FD"
+MSGPACK = 1
+JSON = 2
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class _Record:
+    """Fixed set of fields, packed positionally in `__slots__` order"""
+
+    __slots__ = ()
+
+    def pack(self) -> list:
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def unpack(cls, values):
+        if len(values) != len(cls.__slots__):
+            raise SnapshotError(f"{cls.__name__} has {len(values)} fields, expected {len(cls.__slots__)}")
+        record = cls()
+        for field, value in zip(cls.__slots__, values):
+            setattr(record, field, value)
+        return record
+
+
+# Slots, dates and holds as plain values
+
+def _slot_out(slot):
+    return [slot.doctor, slot.date.toordinal(), slot.minutes] if slot else None
+
+
+def _slot_in(value):
+    return Slot(value[0], date.fromordinal(value[1]), value[2]) if value else None
+
+
+def _hold_out(availability, slot):
+    hold = availability.hold_for(slot) if slot else None
+    return [hold.id, hold.expires_at] if hold else None
+
+
+def _adopt(availability, slot, hold):
+    if slot and hold:
+        availability.adopt(Hold(hold[0], slot, hold[1]))
+
+
+class AssistantState(_Record):
+    """SimpleEnhancedAssistant and its AppointmentHandler"""
+
+    __slots__ = ("patient_name", "phone", "appointment_date", "appointment_on", "appointment_time",
+                 "booked_slot", "hold", "reason_for_visit", "context", "history", "handler_slot")
+
+    @classmethod
+    def capture(cls, assistant):
+        state = cls()
+        state.patient_name = assistant.patient_name
+        state.phone = assistant.phone
+        state.appointment_date = assistant.appointment_date
+        state.appointment_on = assistant.appointment_on.toordinal() if assistant.appointment_on else None
+        state.appointment_time = assistant.appointment_time
+        state.booked_slot = _slot_out(assistant.booked_slot)
+        state.hold = _hold_out(assistant.availability, assistant.booked_slot)
+        state.reason_for_visit = assistant.reason_for_visit
+        state.context = assistant.context
+        state.history = [[message["role"], message["content"]] for message in assistant.conversation_history]
+        state.handler_slot = _slot_out(assistant.appointment_handler.booked_slot)
+        return state
+
+    def apply(self, assistant):
+        assistant.patient_name = self.patient_name
+        assistant.phone = self.phone
+        assistant.appointment_date = self.appointment_date
+        assistant.appointment_on = date.fromordinal(self.appointment_on) if self.appointment_on else None
+        assistant.appointment_time = self.appointment_time
+        assistant.booked_slot = _slot_in(self.booked_slot)
+        _adopt(assistant.availability, assistant.booked_slot, self.hold)
+        assistant.reason_for_visit = self.reason_for_visit
+        assistant.context = self.context
+        assistant.conversation_history = [{"role": role, "content": content} for role, content in self.history]
+        assistant.appointment_handler.booked_slot = _slot_in(self.handler_slot)
+
+
+class HandlerState(_Record):
+    """ConversationHandler: what the LLM has collected and what it remembers"""
+
+    __slots__ = ("patient_info", "current_intent", "conversation_state", "memory", "booked_slot", "hold")
+
+    @classmethod
+    def capture(cls, handler):
+        state = cls()
+        # Values only; the keys are fixed by ConversationHandler for a given SNAPSHOT_VERSION
+        state.patient_info = list(handler.patient_info.values())
+        state.current_intent = handler.current_intent
+        state.conversation_state = handler.conversation_state
+        state.memory = [[role, content] for role, content in handler.memory]
+        state.booked_slot = _slot_out(handler.booked_slot)
+        state.hold = _hold_out(handler.availability, handler.booked_slot)
+        return state
+
+    def apply(self, handler):
+        handler.patient_info = dict(zip(handler.patient_info, self.patient_info))
+        handler.current_intent = self.current_intent
+        handler.conversation_state = self.conversation_state
+        handler.memory.clear()
+        for role, content in self.memory:
+            handler.memory.add(role, content)
+        handler.booked_slot = _slot_in(self.booked_slot)
+        _adopt(handler.availability, handler.booked_slot, self.hold)
+
+
+class RouterState(_Record):
+    """HybridRouter: both routes plus the turns the LLM has not seen yet"""
+
+    __slots__ = ("rules", "llm", "closing", "unsynced")
+
+    @classmethod
+    def capture(cls, router):
+        state = cls()
+        state.rules = AssistantState.capture(router.rules).pack()
+        # The LLM handler only exists once a turn has been escalated
+        state.llm = HandlerState.capture(router._llm_handler).pack() if router._llm_handler is not None else None
+        state.closing = router._closing
+        state.unsynced = [[role, content] for role, content in router._unsynced]
+        return state
+
+    def apply(self, router):
+        AssistantState.unpack(self.rules).apply(router.rules)
+        if self.llm is not None:
+            HandlerState.unpack(self.llm).apply(router.llm_handler)
+        router._closing = self.closing
+        router._unsynced = [(role, content) for role, content in self.unsynced]
+
+
+# Record type per session class, by name so rules-only workers never import the LLM stack
+_RECORDS = (("HybridRouter", RouterState), ("SimpleEnhancedAssistant", AssistantState),
+            ("ConversationHandler", HandlerState))
+
+
+def _record_type(session):
+    names = {cls.__name__ for cls in type(session).__mro__}
+    for kind, (name, record) in enumerate(_RECORDS):
+        if name in names:
+            return kind, record
+    raise SnapshotError(f"Cannot snapshot a {type(session).__name__}")
+
+
+def snapshot(session, codec: Optional[int] = None) -> bytes:
+    """Pack the state of a HybridRouter, SimpleEnhancedAssistant or ConversationHandler"""
+    kind, record = _record_type(session)
+    payload = [kind, record.capture(session).pack()]
+    codec = codec or (MSGPACK if _msgpack else JSON)
+    if codec == MSGPACK:
+        body = _msgpack.packb(payload)
+    else:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return _MAGIC + bytes((SNAPSHOT_VERSION, codec)) + body
+
+
+def restore(data: bytes, session):
+    """Load a snapshot into a new session of the same kind; returns the session"""
+    if data[:2] != _MAGIC or len(data) < 4:
+        raise SnapshotError("Not a session snapshot")
+    version, codec = data[2], data[3]
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Snapshot version {version} is not supported (expected {SNAPSHOT_VERSION})")
+    if codec == MSGPACK and _msgpack is None:
+        raise SnapshotError("Snapshot is msgpack but neither ormsgpack nor msgpack is installed")
+    if codec not in (MSGPACK, JSON):
+        raise SnapshotError(f"Unknown snapshot codec {codec}")
+    try:
+        kind, values = _msgpack.unpackb(data[4:]) if codec == MSGPACK else json.loads(data[4:])
+    except Exception as e:
+        raise SnapshotError(f"Corrupt snapshot: {e}") from e
+
+    expected, record = _record_type(session)
+    if kind != expected:
+        raise SnapshotError(f"Snapshot is for a different kind of session than {type(session).__name__}")
+    record.unpack(values).apply(session)
+    return session
+
+
+class SessionStore:
+    """Latest snapshot of each call, one file per session id"""
+
+    def __init__(self, directory: str = SESSION_CHECKPOINT_DIR):
+        self.directory = directory
+
+    def _path(self, session_id: str) -> str:
+        if not _SESSION_ID.match(session_id):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return os.path.join(self.directory, f"{session_id}.snap")
+
+    def save(self, session_id: str, session):
+        """Checkpoint a session; the previous checkpoint stays intact until this one is written"""
+        path = self._path(session_id)
+        with metrics.timer("sessions.checkpoint_time"):
+            data = snapshot(session)
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def resume(self, session_id: str, session) -> bool:
+        """Load the checkpoint into `session`; False if there is none"""
+        try:
+            with open(self._path(session_id), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        restore(data, session)
+        metrics.increment("sessions.resumed")
+        return True
+
+    def delete(self, session_id: str):
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Startup import-time report
+
+Imports each entry point in a fresh interpreter under `python -X importtime`
+and reports the time its imports take, the slowest modules it pulls in, and
+any provider SDK loaded at import time. The providers (OpenAI, ElevenLabs,
+LangChain, httpx, audio I/O, pyttsx3, Whisper) load on first use, so an
+entry point that imports one of them is a startup regression.
+
+    python startup_report.py                 # table
+    python startup_report.py --json          # one JSON document, for CI to track
+    python startup_report.py --budget-ms 500 # exit 1 if an entry point is over budget or loads a provider
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, NamedTuple
+
+ENTRY_POINTS = ("main", "voice_handler_simple", "conversation_handler", "call_session", "enhanced_ai_assistant")
+
+# Top-level packages that must not be imported until a call needs them
+DEFERRED_PROVIDERS = ("openai", "elevenlabs", "langchain_core", "langchain_openai", "httpx",
+                      "sounddevice", "soundfile", "pyttsx3", "whisper")
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class StartupReport(NamedTuple):
+    entry_point: str
+    import_us: int        # cumulative import time of the entry point
+    wall_seconds: float   # interpreter start to exit, as a cold start
+    imports: List[ImportRecord]
+    providers: List[str]  # deferred providers that were imported anyway
+
+    def slowest(self, count: int = 10) -> List[ImportRecord]:
+        return sorted(self.imports, key=lambda record: record.self_us, reverse=True)[:count]
+
+    def to_dict(self, count: int = 10) -> dict:
+        return {
+            "entry_point": self.entry_point,
+            "import_ms": round(self.import_us / 1000, 1),
+            "wall_ms": round(self.wall_seconds * 1000, 1),
+            "modules": len(self.imports),
+            "providers": self.providers,
+            "slowest": [{"module": record.module, "self_ms": round(record.self_us / 1000, 1)}
+                        for record in self.slowest(count)],
+        }
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Records from `-X importtime` stderr, in the order the imports finished"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        records.append(ImportRecord(stripped, int(fields[0]), int(fields[1]), (len(name) - len(stripped) - 1) // 2))
+    return records
+
+
+def measure(entry_point: str, python: str = sys.executable) -> StartupReport:
+    started = time.perf_counter()
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {entry_point}"],
+                            cwd=_ROOT, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - started
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no output"
+        raise RuntimeError(f"Importing {entry_point} failed: {error}")
+
+    imports = parse_importtime(result.stderr)
+    import_us = next((record.cumulative_us for record in reversed(imports)
+                      if record.module == entry_point and record.depth == 0), 0)
+    loaded = {record.module.split(".")[0] for record in imports}
+    providers = [provider for provider in DEFERRED_PROVIDERS if provider in loaded]
+    return StartupReport(entry_point, import_us, wall_seconds, imports, providers)
+
+
+def print_report(reports: List[StartupReport], count: int):
+    for report in reports:
+        print(f"\n{report.entry_point}: {report.import_us / 1000:.1f} ms of imports, "
+              f"{report.wall_seconds * 1000:.0f} ms cold start, {len(report.imports)} modules")
+        if report.providers:
+            print(f"  ❌ imported at startup: {', '.join(report.providers)}")
+        for record in report.slowest(count):
+            print(f"  {record.self_us / 1000:8.1f} ms  {record.module}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("entry_points", nargs="*", default=list(ENTRY_POINTS))
+    parser.add_argument("--json", action="store_true", help="print one JSON document instead of a table")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list per entry point")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if any entry point's imports take longer than this")
+    args = parser.parse_args(argv)
+
+    reports = [measure(entry_point) for entry_point in args.entry_points]
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0],
+                          "entry_points": [report.to_dict(args.top) for report in reports]}, indent=2))
+    else:
+        print_report(reports, args.top)
+
+    over_budget = [report.entry_point for report in reports
+                   if args.budget_ms is not None and report.import_us / 1000 > args.budget_ms]
+    if args.budget_ms is not None and (over_budget or any(report.providers for report in reports)):
+        if not args.json:
+            print(f"\n❌ Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget) or 'none'}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Streaming speech-to-text pipeline
+
+Audio chunks from the `sd.InputStream` callback are handed to a pluggable
+recognizer on a worker thread while the caller is still talking, so the
+transcription work overlaps the recording instead of starting after it.
+Nothing is written to disk - audio is kept in an in-memory buffer.
+"""
+
+import io
+import queue
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from resampler import resample
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+class Recognizer:
+    """Base class for recognizers used by StreamingTranscriber.
+
+    `accept_audio` is called with each int16 chunk as it arrives and may
+    return a partial hypothesis. `finish` returns the final transcript.
+    """
+
+    def start(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+
+    def accept_audio(self, chunk: np.ndarray) -> Optional[str]:
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        raise NotImplementedError
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
+        """Run a complete clip through the recognizer in one go"""
+        self.start(sample_rate)
+        self.accept_audio(audio)
+        return self.finish()
+
+
+class WhisperAPIRecognizer(Recognizer):
+    """OpenAI Whisper API recognizer.
+
+    The API only returns a final transcript. The WAV is encoded in memory as
+    chunks arrive, so `finish` only has to upload it.
+    """
+
+    def __init__(self, client, model: str = "whisper-1"):
+        self.client = client
+        self.model = model
+        self._buffer = None
+        self._writer = None
+
+    def start(self, sample_rate: int) -> None:
+        import soundfile as sf
+
+        super().start(sample_rate)
+        self._buffer = io.BytesIO()
+        self._writer = sf.SoundFile(self._buffer, mode='w', samplerate=sample_rate,
+                                    channels=1, format='WAV', subtype='PCM_16')
+
+    def accept_audio(self, chunk: np.ndarray) -> Optional[str]:
+        self._writer.write(chunk.reshape(-1))
+        return None
+
+    def finish(self) -> str:
+        self._writer.close()
+        audio_bytes = self._buffer.getvalue()
+        self._buffer = None
+        self._writer = None
+
+        transcript = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=("speech.wav", audio_bytes)
+        )
+        return transcript.text.strip()
+
+
+class LocalWhisperRecognizer(Recognizer):
+    """Local Whisper model fed straight from memory.
+
+    The model itself comes from the process-wide registry, so it is only
+    loaded once no matter how many turns fall back to it.
+    """
+
+    def __init__(self, model_name: str = "base", registry=None):
+        self.model_name = model_name
+        self.registry = registry
+        self._chunks = []
+
+    def start(self, sample_rate: int) -> None:
+        super().start(sample_rate)
+        self._chunks = []
+
+    def accept_audio(self, chunk: np.ndarray) -> Optional[str]:
+        self._chunks.append(chunk.reshape(-1))
+        return None
+
+    def finish(self) -> str:
+        from model_registry import get_model_registry
+
+        audio = np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.int16)
+        self._chunks = []
+
+        # Whisper wants mono float32 at 16 kHz
+        audio = audio.astype(np.float32) / 32768.0
+        if self.sample_rate != WHISPER_SAMPLE_RATE:
+            audio = resample(audio, self.sample_rate, WHISPER_SAMPLE_RATE)
+
+        registry = self.registry or get_model_registry()
+        model = registry.get(self.model_name)
+        result = model.transcribe(audio)
+        return result["text"].strip()
+
+
+class ScriptedRecognizer(Recognizer):
+    """Offline stand-in that "hears" a fixed transcript.
+
+    Words are revealed as partial hypotheses in proportion to how much audio
+    has been received, which is enough to exercise the pipeline without a
+    network connection or a speech model.
+    """
+
+    def __init__(self, transcript: str, words_per_second: float = 2.5):
+        self.words = transcript.split()
+        self.words_per_second = words_per_second
+        self.samples_received = 0
+
+    def start(self, sample_rate: int) -> None:
+        super().start(sample_rate)
+        self.samples_received = 0
+
+    def accept_audio(self, chunk: np.ndarray) -> Optional[str]:
+        self.samples_received += len(chunk)
+        seconds = self.samples_received / self.sample_rate
+        heard = min(len(self.words), int(seconds * self.words_per_second))
+        return " ".join(self.words[:heard]) if heard else None
+
+    def finish(self) -> str:
+        return " ".join(self.words)
+
+
+class StreamingTranscriber:
+    """Feeds audio to a recognizer on a worker thread as it is recorded.
+
+    `feed` is safe to call from the audio callback: it only enqueues a copy
+    of the chunk. Partial hypotheses are exposed through `partial` and the
+    optional `on_partial` callback; `finish` blocks until the recognizer has
+    consumed all audio and returns the final transcript.
+    """
+
+    _STOP = object()
+
+    def __init__(self, recognizer: Recognizer, sample_rate: int,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.partial = ""
+        self._queue = queue.Queue()
+        self._error = None
+        self._cancelled = False
+        self._worker = None
+
+    def start(self):
+        """Start the recognizer and its worker thread"""
+        self.recognizer.start(self.sample_rate)
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        return self
+
+    def feed(self, chunk: np.ndarray):
+        """Queue a chunk of audio for recognition (non-blocking)"""
+        if self._worker is not None and not self._cancelled:
+            self._queue.put_nowait(chunk.copy())
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is self._STOP:
+                return
+            if self._error is not None or self._cancelled:
+                continue
+            try:
+                hypothesis = self.recognizer.accept_audio(chunk)
+            except Exception as e:
+                self._error = e
+                continue
+            if hypothesis and hypothesis != self.partial:
+                self.partial = hypothesis
+                if self.on_partial:
+                    self.on_partial(hypothesis)
+
+    def _stop_worker(self):
+        if self._worker is not None:
+            self._queue.put(self._STOP)
+            self._worker.join()
+            self._worker = None
+
+    def finish(self) -> str:
+        """Wait for queued audio to be consumed and return the final transcript"""
+        self._stop_worker()
+        if self._error is not None:
+            raise self._error
+        return self.recognizer.finish()
+
+    def cancel(self):
+        """Drop any queued audio without producing a transcript"""
+        self._cancelled = True
+        self._stop_worker()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Test the API client registry against a local HTTP stand-in: keep-alive reuse,
+per-provider concurrency caps, timeouts, retries and one client per process
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("ELEVENLABS_API_KEY", "test-key")
+
+from api_clients import ELEVENLABS, OPENAI, ClientRegistry, ProviderPolicy, get_client_registry
+from metrics import metrics
+
+COMPLETION = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+    "choices": [{"index": 0, "finish_reason": "stop",
+                 "message": {"role": "assistant", "content": "Hello from the stand-in"}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class _StandIn(ThreadingHTTPServer):
+    """Records connections and requests in flight; `failures` requests get a 503 first"""
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0, failures=0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = delay
+        self.failures = failures
+        self.requests = 0
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        pass  # a client that timed out hung up before the reply
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            fail = server.failures > 0
+            server.failures -= fail
+        try:
+            time.sleep(server.delay)
+            if fail:
+                self._reply(503, b'{"error": {"message": "overloaded"}}', "application/json")
+            elif "text-to-speech" in self.path:
+                self._reply(200, b"\x00\x01" * 64, "audio/mpeg")
+            else:
+                self._reply(200, json.dumps(COMPLETION).encode("utf-8"), "application/json")
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _handle
+
+
+def _registry(server, **policy):
+    policy.setdefault("concurrency", 4)
+    return ClientRegistry({
+        OPENAI: ProviderPolicy(base_url=f"{server.url}/v1", **policy),
+        ELEVENLABS: ProviderPolicy(base_url=server.url, **policy),
+    })
+
+
+def test_connections_are_kept_alive_and_reused():
+    server = _StandIn()
+    registry = _registry(server)
+    try:
+        client = registry.http_client(OPENAI)
+        for _ in range(20):
+            assert client.get(f"{server.url}/ping").status_code == 200
+        assert server.requests == 20
+        assert len(server.connections) == 1
+    finally:
+        registry.close()
+        server.stop()
+
+
+def test_requests_in_flight_are_capped_per_provider():
+    server = _StandIn(delay=0.05)
+    registry = _registry(server, concurrency=3)
+    try:
+        client = registry.http_client(OPENAI)
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            statuses = list(pool.map(lambda _: client.get(f"{server.url}/ping").status_code, range(24)))
+        assert statuses == [200] * 24
+        assert server.max_in_flight == 3
+        # Callers past the cap waited for a pooled connection instead of opening their own
+        assert len(server.connections) == 3
+    finally:
+        registry.close()
+        server.stop()
+
+
+def test_read_timeout():
+    server = _StandIn(delay=0.5)
+    registry = _registry(server, timeout=0.1, max_retries=0)
+    try:
+        registry.http_client(OPENAI).get(f"{server.url}/slow")
+        assert False, "expected a read timeout"
+    except httpx.ReadTimeout:
+        pass
+    finally:
+        registry.close()
+        server.stop()
+
+
+def test_callers_past_the_cap_give_up_at_the_pool_timeout():
+    server = _StandIn(delay=0.5)
+    registry = _registry(server, concurrency=1, pool_timeout=0.05, max_retries=0)
+    try:
+        client = registry.http_client(OPENAI)
+        holder = threading.Thread(target=lambda: client.get(f"{server.url}/slow"))
+        holder.start()
+        time.sleep(0.1)
+        try:
+            client.get(f"{server.url}/slow")
+            assert False, "expected a pool timeout"
+        except httpx.PoolTimeout:
+            pass
+        holder.join()
+        assert server.requests == 1
+    finally:
+        registry.close()
+        server.stop()
+
+
+def test_sdk_clients_share_the_pool_and_retry_policy():
+    server = _StandIn(failures=1)
+    registry = _registry(server, max_retries=2)
+    try:
+        before = metrics.snapshot()["counters"].get("api.openai.requests", 0)
+        # The first attempt gets a 503 and the SDK retries on the pooled client
+        reply = registry.chat_model().invoke("Hi")
+        assert reply.content == "Hello from the stand-in"
+        assert server.requests == 2
+        assert metrics.snapshot()["counters"]["api.openai.requests"] - before == 2
+
+        completion = registry.openai().chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "Hi"}])
+        assert completion.choices[0].message.content == "Hello from the stand-in"
+
+        audio = b"".join(registry.elevenlabs().text_to_speech.stream(voice_id="voice", text="Hello"))
+        assert audio == b"\x00\x01" * 64
+
+        # Both SDKs and the chat model reused one connection per provider
+        assert len(server.connections) == 2
+    finally:
+        registry.close()
+        server.stop()
+
+
+def test_retries_happen_in_one_layer():
+    retries = {}
+
+    class Recording(httpx.HTTPTransport):
+        def __init__(self, **kwargs):
+            retries[len(retries)] = kwargs.get("retries", 0)
+            super().__init__(**kwargs)
+
+    registry = ClientRegistry({provider: ProviderPolicy(4, max_retries=2) for provider in (OPENAI, ELEVENLABS)})
+    original, httpx.HTTPTransport = httpx.HTTPTransport, Recording
+    try:
+        registry.http_client(OPENAI)
+        registry.http_client(ELEVENLABS)
+    finally:
+        httpx.HTTPTransport = original
+    # The OpenAI SDK retries itself; ElevenLabs' streaming endpoints only get the transport's retries
+    assert retries == {0: 0, 1: 2}
+    assert registry.openai().max_retries == 2
+    registry.close()
+
+
+def test_aclose_closes_the_async_pool_on_its_own_loop():
+    server = _StandIn()
+    registry = _registry(server)
+    try:
+        sync_client = registry.http_client(OPENAI)
+        async_client = registry.async_http_client(OPENAI)
+
+        async def call_then_shut_down():
+            assert (await async_client.get(f"{server.url}/ping")).status_code == 200
+            await registry.aclose()
+
+        asyncio.run(call_then_shut_down())
+        assert sync_client.is_closed and async_client.is_closed
+        # Rebuilt on next use
+        assert registry.async_http_client(OPENAI) is not async_client
+    finally:
+        registry.close()
+        server.stop()
+
+
+def test_close_closes_sync_and_async_clients():
+    server = _StandIn()
+    registry = _registry(server)
+    try:
+        sync_client = registry.http_client(OPENAI)
+        async_client = registry.async_http_client(OPENAI)
+        assert registry.chat_model().http_async_client is async_client
+        registry.close()
+        assert sync_client.is_closed and async_client.is_closed
+    finally:
+        server.stop()
+
+
+def test_every_handler_gets_the_same_clients():
+    from availability import AvailabilityEngine
+    from call_server import default_recognizer
+    from conversation_handler import ConversationHandler
+
+    registry = get_client_registry()
+    assert get_client_registry() is registry
+    assert registry.openai() is registry.openai()
+    assert registry.chat_model("gpt-4o") is registry.chat_model("gpt-4o")
+
+    first = ConversationHandler(availability=AvailabilityEngine())
+    second = ConversationHandler(availability=AvailabilityEngine())
+    assert first.llm is second.llm is registry.chat_model("gpt-4o")
+    assert first.llm.http_client is registry.http_client(OPENAI)
+    assert default_recognizer().client is registry.openai()
+    assert registry.openai()._client is registry.http_client(OPENAI)
+
+
+if __name__ == "__main__":
+    test_connections_are_kept_alive_and_reused()
+    test_requests_in_flight_are_capped_per_provider()
+    test_read_timeout()
+    test_callers_past_the_cap_give_up_at_the_pool_timeout()
+    test_sdk_clients_share_the_pool_and_retry_policy()
+    test_retries_happen_in_one_layer()
+    test_aclose_closes_the_async_pool_on_its_own_loop()
+    test_close_closes_sync_and_async_clients()
+    test_every_handler_gets_the_same_clients()
+    print("✅ API client tests passed")
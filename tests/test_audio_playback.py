@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test streaming playback with a fake ElevenLabs generator and output stream
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from audio_playback import AudioRingBuffer, PCM16Decoder, StreamingPlayer
+
+SAMPLE_RATE = 22050
+
+
+class FakeOutputStream:
+    """Pulls blocks from the callback on a thread, like sd.OutputStream"""
+
+    def __init__(self, samplerate, device, channels, dtype, blocksize, callback):
+        self.blocksize = blocksize
+        self.callback = callback
+        self.period = blocksize / samplerate / 2  # run at twice real time
+        self.played = []
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running.is_set():
+            out = np.empty((self.blocksize, 1), dtype=np.float32)
+            self.callback(out, self.blocksize, None, None)
+            self.played.append(out[:, 0].copy())
+            time.sleep(self.period)
+
+    def stop(self):
+        self._running.clear()
+        self._thread.join()
+
+    def close(self):
+        pass
+
+
+def _pcm_bytes(samples):
+    return (samples * 32767).astype('<i2').tobytes()
+
+
+def fake_elevenlabs_stream(audio, chunk_bytes=4001, delay=0.02):
+    """Yield PCM in odd-sized chunks with network-like gaps"""
+    data = _pcm_bytes(audio)
+    for start in range(0, len(data), chunk_bytes):
+        time.sleep(delay)
+        yield data[start:start + chunk_bytes]
+
+
+def test_decoder_handles_split_samples():
+    audio = np.linspace(-0.5, 0.5, 1000, dtype=np.float32)
+    data = _pcm_bytes(audio)
+    decoder = PCM16Decoder()
+    decoded = np.concatenate([decoder.decode(data[i:i + 333]) for i in range(0, len(data), 333)])
+    assert np.allclose(decoded, audio, atol=1e-4)
+
+
+def test_ring_buffer_wraps_and_pads():
+    ring = AudioRingBuffer(8)
+    out = np.empty(5, dtype=np.float32)
+
+    ring.write(np.arange(6, dtype=np.float32))
+    assert ring.read_into(out) == 5
+    ring.write(np.arange(6, 12, dtype=np.float32))  # wraps around the end
+    assert ring.available == 7
+
+    out = np.empty(10, dtype=np.float32)
+    assert ring.read_into(out) == 7
+    assert list(out[:7]) == [5, 6, 7, 8, 9, 10, 11]
+    assert not out[7:].any()
+
+
+def test_playback_starts_before_generation_finishes():
+    audio = (0.3 * np.cos(2 * np.pi * 440 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)).astype(np.float32)
+    streams = []
+
+    def factory(**kwargs):
+        streams.append(FakeOutputStream(**kwargs))
+        return streams[-1]
+
+    player = StreamingPlayer(SAMPLE_RATE, stream_factory=factory)
+    recorded = []
+    started = time.perf_counter()
+    player.play_chunks(fake_elevenlabs_stream(audio), on_audio=recorded.append)
+    finished = time.perf_counter()
+
+    # 11 chunks arrive 20ms apart; first audio should come after roughly one chunk
+    time_to_first_audio = player.first_audio_at - started
+    assert time_to_first_audio < 0.1
+    assert finished - started > 0.2
+
+    played = np.concatenate(streams[0].played)
+    start = np.flatnonzero(played)[0]
+    assert np.allclose(played[start:start + len(audio)], audio, atol=1e-4)
+    assert np.allclose(np.concatenate(recorded), audio, atol=1e-4)
+
+
+if __name__ == "__main__":
+    test_decoder_handles_split_samples()
+    test_ring_buffer_wraps_and_pads()
+    test_playback_starts_before_generation_finishes()
+    print("✅ Streaming playback tests passed")
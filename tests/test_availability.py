@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test the calendar-backed availability engine and booking through it
+"""
+
+from datetime import date, datetime
+
+from availability import AvailabilityEngine, Slot, SlotUnavailable, format_clock, format_date, parse_clock
+from appointment_handler import AppointmentHandler
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+
+# Friday, October 16 2026, before opening
+FRIDAY_MORNING = datetime(2026, 10, 16, 7, 30)
+MONDAY = date(2026, 10, 19)
+
+
+def _engine(now=FRIDAY_MORNING, **kwargs):
+    return AvailabilityEngine(clock=lambda: now, **kwargs)
+
+
+def test_clock_round_trip():
+    assert parse_clock("9:15 AM") == 9 * 60 + 15
+    assert parse_clock("12:00 PM") == 12 * 60
+    assert parse_clock("12:30 am") == 30
+    assert parse_clock("one fifteen pm") == 13 * 60 + 15
+    assert parse_clock("whenever") is None
+    for minutes in (0, 9 * 60 + 15, 12 * 60, 17 * 60 + 45):
+        assert parse_clock(format_clock(minutes)) == minutes
+    assert format_date(MONDAY) == "Monday, October 19"
+
+
+def test_slots_follow_doctor_days_and_business_hours():
+    engine = _engine()
+    first = engine.next_open_slots(3)
+    assert [slot.time for slot in first] == ["9:00 AM", "9:30 AM", "10:00 AM"]
+    assert first[0].date == FRIDAY_MORNING.date()
+
+    assert engine.first_open_date("Monday") == MONDAY
+    assert engine.first_open_date("Saturday") is None
+    assert engine.first_open_date("Wednesday", "Patel") is None
+    assert {slot.doctor for slot in engine.next_open_slots(4, "Johnson")} == {"Johnson"}
+    assert engine.free_intervals("Smith", MONDAY) == [(9 * 60, 17 * 60)]
+
+
+def test_started_slots_are_never_offered():
+    engine = _engine(datetime(2026, 10, 16, 10, 5))
+    assert engine.next_open_slots(1)[0].time == "10:30 AM"
+    assert not engine.is_free(Slot("Smith", FRIDAY_MORNING.date(), 10 * 60))
+    assert engine.first_open_date("Thursday") == date(2026, 10, 22)
+
+
+def test_booking_clears_one_slot_for_every_query():
+    engine = _engine()
+    ten = 10 * 60
+    booked = engine.book(engine.match(MONDAY, ten, "Smith"))
+    assert booked == Slot("Smith", MONDAY, ten)
+    assert not engine.is_free(booked)
+    assert engine.match(MONDAY, ten).doctor == "Patel"
+
+    engine.book(engine.match(MONDAY, ten))
+    assert engine.match(MONDAY, ten).time == "10:30 AM"  # same hour
+    assert engine.nearest(MONDAY, ten).time == "9:30 AM"  # earlier wins the tie
+    assert engine.first_after(MONDAY, ten).time == "10:30 AM"
+    assert engine.find("Monday", ten).date == date(2026, 10, 26)
+    assert engine.free_intervals("Smith", MONDAY) == [(9 * 60, ten), (ten + 30, 17 * 60)]
+
+    try:
+        engine.book(booked)
+        assert False, "booked the same slot twice"
+    except SlotUnavailable:
+        pass
+
+    engine.release(booked)
+    assert engine.match(MONDAY, ten) == booked
+
+
+def test_fully_booked_days_are_skipped_until_a_slot_is_released():
+    engine = _engine()
+    friday = FRIDAY_MORNING.date()
+    booked = []
+    while engine.open_slots(friday):
+        booked.extend(engine.book(slot) for slot in engine.open_slots(friday))
+
+    assert engine.next_open_slots(1)[0].date == MONDAY
+    engine.release(booked[-1])
+    assert engine.next_open_slots(1) == [booked[-1]]
+
+
+def test_assistants_book_through_the_shared_calendar():
+    engine = _engine()
+    first = SimpleEnhancedAssistant(engine)
+    second = SimpleEnhancedAssistant(engine)
+    for assistant in (first, second):
+        assistant.process_input("I'd like to book an appointment")
+        assistant.process_input("Monday")
+        assistant.process_input("10:00 AM")
+
+    assert first.booked_slot == Slot("Smith", MONDAY, 10 * 60)
+    assert second.booked_slot == Slot("Patel", MONDAY, 10 * 60)
+
+    handler = AppointmentHandler(engine)
+    history = [{"role": "user", "content": "Monday please"}]
+    reply = handler.process_appointment_request("10:00 AM", history)
+    assert handler.booked_slot.time == "10:30 AM"
+    assert "10:30 AM" in reply
+
+
+if __name__ == "__main__":
+    test_clock_round_trip()
+    test_slots_follow_doctor_days_and_business_hours()
+    test_started_slots_are_never_offered()
+    test_booking_clears_one_slot_for_every_query()
+    test_fully_booked_days_are_skipped_until_a_slot_is_released()
+    test_assistants_book_through_the_shared_calendar()
+    print("✅ Availability tests passed")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite booking store: unique slots, holds that lapse, and many threads racing for the same slots
+"""
+
+import os
+import random
+import tempfile
+import threading
+from datetime import date, datetime
+
+from availability import AvailabilityEngine, HoldExpired, Slot, SlotUnavailable
+from booking_store import BookingStore
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+
+MONDAY = date(2026, 10, 19)
+SLOT = Slot("Smith", MONDAY, 10 * 60 + 30)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _engine(store):
+    return AvailabilityEngine(clock=lambda: datetime(2026, 10, 16, 7, 30), store=store)
+
+
+def test_a_slot_has_one_owner_until_its_hold_lapses():
+    clock = _Clock()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookingStore(os.path.join(tmp, "bookings.db"), hold_seconds=60, clock=clock)
+        hold = store.reserve(SLOT)
+        try:
+            store.reserve(SLOT)
+            assert False, "reserved a held slot"
+        except SlotUnavailable:
+            pass
+        assert store.taken(MONDAY) == {("Smith", SLOT.minutes)}
+
+        # Nobody confirmed within the hold: the slot is free again
+        clock.now += 61
+        assert store.taken(MONDAY) == set()
+        other = store.reserve(SLOT)
+        try:
+            store.confirm(hold, "Jane Doe")
+            assert False, "confirmed a lapsed hold"
+        except HoldExpired:
+            pass
+
+        store.confirm(other, "John Roe", "(407) 555-0123", "checkup")
+        clock.now += 3600  # confirmed bookings never lapse
+        assert store.expire_holds() == []
+        assert [(row["patient_name"], row["minutes"]) for row in store.bookings(MONDAY)] == [("John Roe", SLOT.minutes)]
+        store.close()
+
+
+def test_threads_racing_for_the_same_slots_never_double_book():
+    slots = [Slot(doctor, MONDAY, 9 * 60 + 30 * i) for doctor in ("Smith", "Patel") for i in range(8)]
+    threads = 24
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db")
+        # Two stores on one file stand in for two server processes
+        stores = [BookingStore(path), BookingStore(path)]
+        won = []
+        lost = []
+        start = threading.Barrier(threads)
+
+        def caller(n):
+            store = stores[n % 2]
+            order = slots[:]
+            random.Random(n).shuffle(order)
+            start.wait()
+            for slot in order:
+                try:
+                    hold = store.reserve(slot)
+                except SlotUnavailable:
+                    lost.append(slot)
+                    continue
+                store.confirm(hold, f"Caller {n}")
+                won.append(slot)
+            store.close()
+
+        workers = [threading.Thread(target=caller, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert sorted(won) == sorted(slots)
+        assert len(lost) == threads * len(slots) - len(slots)
+        assert len(stores[0].bookings(MONDAY)) == len(slots)
+
+
+def test_engines_sharing_a_store_book_each_slot_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db")
+        first, second = _engine(BookingStore(path)), _engine(BookingStore(path))
+        assert second.is_free(SLOT)  # loads Monday before the first engine books it
+
+        first.confirm(first.book(SLOT), "Jane Doe")
+        try:
+            second.book(SLOT)
+            assert False, "booked a slot another process owns"
+        except SlotUnavailable:
+            pass
+        assert not second.is_free(SLOT)
+        assert not _engine(BookingStore(path)).is_free(SLOT)  # a fresh process sees it too
+
+        # Threads in one process share the engine; one of them gets each slot
+        candidates = first.open_slots(MONDAY, "Patel")[:5]
+        booked = []
+
+        def caller():
+            for slot in candidates:
+                try:
+                    booked.append(first.book(slot))
+                except SlotUnavailable:
+                    pass
+
+        workers = [threading.Thread(target=caller) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert sorted(booked) == candidates
+
+
+def test_a_lapsed_hold_is_renewed_unless_someone_took_the_slot():
+    clock = _Clock()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db")
+        engine = _engine(BookingStore(path, hold_seconds=60, clock=clock))
+        rival = _engine(BookingStore(path, hold_seconds=60, clock=clock))
+
+        engine.book(SLOT)
+        clock.now += 61
+        assert engine.confirm(SLOT, "Jane Doe")  # nobody wanted it meanwhile
+
+        later = Slot("Smith", MONDAY, 11 * 60)
+        engine.book(later)
+        clock.now += 61
+        rival.book(later)
+        try:
+            engine.confirm(later, "Jane Doe")
+            assert False, "confirmed a slot the rival now holds"
+        except HoldExpired:
+            pass
+        assert not engine.is_free(later)
+
+
+def test_assistant_confirms_its_hold_when_the_booking_is_complete():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookingStore(os.path.join(tmp, "bookings.db"))
+        assistant = SimpleEnhancedAssistant(_engine(store))
+        for text in ("I'd like to book an appointment", "Monday", "10:30 AM", "A checkup", "Jane Doe"):
+            assistant.process_input(text)
+        assert store.bookings() == []  # only held so far
+
+        reply = assistant.process_input("407 555 0123")
+        assert "Perfect!" in reply
+        booking, = store.bookings()
+        assert (booking["doctor"], booking["date"], booking["minutes"]) == ("Smith", "2026-10-19", SLOT.minutes)
+        assert (booking["patient_name"], booking["phone"], booking["reason"]) == ("Jane Doe", "(407) 555-0123", "A checkup")
+
+
+def test_changing_the_time_mid_booking_gives_back_the_first_slot():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookingStore(os.path.join(tmp, "bookings.db"))
+        engine = _engine(store)
+        assistant = SimpleEnhancedAssistant(engine)
+        assistant.process_input("I need to book an appointment for Monday at 10 am")
+        assert assistant.appointment_time == "10:00 AM"
+        assert store.taken(MONDAY) == {("Smith", 600)}
+
+        assistant.process_input("actually 3:30 pm")
+        assert assistant.booked_slot == Slot("Smith", MONDAY, 930)
+        assert store.taken(MONDAY) == {("Smith", 930)}
+        assert engine.is_free(Slot("Smith", MONDAY, 600))
+
+        for text in ("a checkup", "My name is Jane Doe", "407 555 0123"):
+            assistant.process_input(text)
+        booking, = store.bookings()
+        assert (booking["minutes"], booking["patient_name"]) == (930, "Jane Doe")
+
+
+if __name__ == "__main__":
+    test_a_slot_has_one_owner_until_its_hold_lapses()
+    test_threads_racing_for_the_same_slots_never_double_book()
+    test_engines_sharing_a_store_book_each_slot_once()
+    test_a_lapsed_hold_is_renewed_unless_someone_took_the_slot()
+    test_assistant_confirms_its_hold_when_the_booking_is_complete()
+    test_changing_the_time_mid_booking_gives_back_the_first_slot()
+    print("✅ Booking store tests passed")
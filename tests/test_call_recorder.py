@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test that call recordings are streamed to disk as separate caller/assistant tracks
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from call_recorder import CallRecorder, CALLER, ASSISTANT, to_int16
+
+RATE = 16000
+
+
+def _record_call(recorder, directory):
+    recorder.start()
+    # Caller turns arrive as int16 (n, 1), TTS chunks as float32
+    recorder.write(np.full((RATE, 1), 8192, dtype=np.int16), CALLER)
+    recorder.write(np.full(RATE // 2, -0.25, dtype=np.float32), ASSISTANT)
+
+    # Already on disk before the call ends
+    assert any(name.endswith(".partial.wav") for name in os.listdir(directory))
+    assert recorder.frames_written == RATE + RATE // 2
+
+    path = recorder.stop()
+    assert not any(name.endswith(".partial.wav") for name in os.listdir(directory))
+    return path
+
+
+def test_stereo_layout_keeps_tracks_apart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _record_call(CallRecorder(RATE, directory=tmp, layout="stereo"), tmp)
+        assert path.endswith("s.wav")
+
+        audio, rate = sf.read(path, dtype="int16")
+        assert rate == RATE
+        assert audio.shape == (RATE + RATE // 2, 2)
+        # Caller on the left, assistant on the right, silence opposite each turn
+        assert np.all(audio[:RATE, 0] == 8192) and np.all(audio[:RATE, 1] == 0)
+        assert np.all(audio[RATE:, 0] == 0) and np.all(np.abs(audio[RATE:, 1] + 8192) <= 1)
+
+
+def test_split_layout_writes_aligned_mono_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        _record_call(CallRecorder(RATE, directory=tmp, layout="split"), tmp)
+
+        files = sorted(os.listdir(tmp))
+        assert len(files) == 2
+        assert files[0].endswith("_assistant.wav") and files[1].endswith("_caller.wav")
+
+        assistant, _ = sf.read(os.path.join(tmp, files[0]), dtype="int16")
+        caller, _ = sf.read(os.path.join(tmp, files[1]), dtype="int16")
+        assert len(assistant) == len(caller) == RATE + RATE // 2
+        assert np.all(caller[:RATE] == 8192) and np.all(caller[RATE:] == 0)
+        assert np.all(assistant[:RATE] == 0)
+
+
+def test_int16_audio_is_not_copied_or_upcast():
+    mic = np.arange(100, dtype=np.int16).reshape(-1, 1)
+    converted = to_int16(mic)
+    assert converted.dtype == np.int16
+    assert np.shares_memory(converted, mic)
+
+    stereo = np.array([[100, 300], [-100, -300]], dtype=np.int16)
+    assert to_int16(stereo).tolist() == [200, -200]
+    assert to_int16(np.array([2.0, -2.0, 0.5])).tolist() == [32767, -32767, 16383]
+
+
+def test_empty_call_leaves_no_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = CallRecorder(RATE, directory=tmp)
+        recorder.start()
+        recorder.write(np.zeros(0, dtype=np.float32))
+
+        assert recorder.stop() is None
+        assert os.listdir(tmp) == []
+        # Writes after the call has ended are ignored
+        recorder.write(np.zeros(100, dtype=np.float32))
+        assert not recorder.active
+
+
+if __name__ == "__main__":
+    test_stereo_layout_keeps_tracks_apart()
+    test_split_layout_writes_aligned_mono_files()
+    test_int16_audio_is_not_copied_or_upcast()
+    test_empty_call_leaves_no_file()
+    print("✅ Call recorder tests passed")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test the WebSocket call server: separate state per call, text and audio turns, the session cap and backpressure
+"""
+
+import asyncio
+import json
+import tempfile
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from availability import AvailabilityEngine
+from call_server import BUSY_CLOSE_CODE, CallEnded, WebSocketCaller, create_app
+from conversation_handler import ConversationHandler
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+from fake_llm import ScriptedChatModel
+from hybrid_router import HybridRouter
+from metrics import metrics
+from session_state import SessionStore
+from streaming_stt import ScriptedRecognizer
+
+RATE = 16000
+
+
+def _app(**kwargs):
+    llm = ScriptedChatModel()
+    availability = AvailabilityEngine()
+
+    def handler():
+        return HybridRouter(SimpleEnhancedAssistant(availability),
+                            llm_factory=lambda: ConversationHandler(llm=llm, availability=availability))
+
+    kwargs.setdefault("recognizer_factory", lambda: ScriptedRecognizer("Monday"))
+    kwargs.setdefault("sessions", SessionStore(tempfile.mkdtemp()))
+    return create_app(handler_factory=handler, listening_window=2, **kwargs)
+
+
+def _reply(ws):
+    """Sentences up to the end of one reply"""
+    sentences = []
+    while True:
+        message = json.loads(ws.receive_text())
+        if message["type"] == "turn_end":
+            return " ".join(sentences)
+        if message["type"] == "end":
+            return None
+        if message["type"] == "reply":
+            sentences.append(message["text"])
+
+
+def _say(ws, text):
+    ws.send_text(json.dumps({"type": "text", "text": text}))
+    return _reply(ws)
+
+
+def test_each_connection_holds_its_own_call():
+    with TestClient(_app()) as client:
+        with client.websocket_connect("/call") as first, client.websocket_connect("/call") as second:
+            assert "How can I help" in _reply(first)
+            assert "How can I help" in _reply(second)
+            assert client.get("/health").json()["active_sessions"] == 2
+
+            _say(first, "I'd like to book an appointment")
+            assert "Monday" in _say(first, "Monday")
+            assert "What day" in _say(second, "I'd like to book an appointment")
+            assert "10:30 AM" in _say(first, "10:30 AM")
+
+            assert _say(first, "Thank you, goodbye")
+            assert json.loads(first.receive_text())["type"] == "end"
+
+
+def test_audio_frames_are_transcribed_into_a_turn():
+    speech = (np.sin(np.arange(RATE) / 4.0) * 8000).astype(np.int16)
+    with TestClient(_app()) as client:
+        with client.websocket_connect(f"/call?sample_rate={RATE}") as ws:
+            _reply(ws)
+            ws.send_text(json.dumps({"type": "text", "text": "I'd like to book an appointment"}))
+            _reply(ws)
+            for chunk in np.array_split(speech, 10):
+                ws.send_bytes(chunk.tobytes())
+            ws.send_text(json.dumps({"type": "end_of_turn"}))
+            assert "For Monday" in _reply(ws)
+
+
+def test_a_dropped_call_resumes_from_its_checkpoint():
+    with TestClient(_app()) as client:
+        with client.websocket_connect("/call") as ws:
+            hello = json.loads(ws.receive_text())
+            assert hello["type"] == "session" and not hello["resumed"]
+            _reply(ws)
+            _say(ws, "I'd like to book an appointment")
+            _say(ws, "Monday")
+        # The connection drops; the caller reconnects and picks up where they left off
+        with client.websocket_connect(f"/call?session={hello['id']}") as ws:
+            assert json.loads(ws.receive_text()) == {"type": "session", "id": hello["id"], "resumed": True}
+            assert "10:30 AM" in _say(ws, "10:30 AM")
+            _say(ws, "Thank you, goodbye")
+            while json.loads(ws.receive_text())["type"] != "end":
+                pass
+
+        # A finished call leaves no checkpoint behind
+        with client.websocket_connect(f"/call?session={hello['id']}") as ws:
+            assert not json.loads(ws.receive_text())["resumed"]
+            assert "How can I help" in _reply(ws)
+
+
+def test_malformed_frames_are_ignored():
+    metrics.reset()
+    with TestClient(_app()) as client:
+        with client.websocket_connect(f"/call?sample_rate={RATE}") as ws:
+            _reply(ws)
+            ws.send_text("not json")
+            ws.send_text("[1, 2]")
+            ws.send_bytes(b"\x01\x02\x03")  # half a sample
+            assert "What day" in _say(ws, "I'd like to book an appointment")
+        assert metrics.snapshot()["counters"]["server.bad_frames"] == 3
+
+
+def test_an_unknown_session_id_is_not_adopted():
+    with TestClient(_app()) as client:
+        with client.websocket_connect("/call?session=chosen-by-the-client") as ws:
+            hello = json.loads(ws.receive_text())
+            assert not hello["resumed"] and hello["id"] != "chosen-by-the-client"
+
+
+def test_calls_over_the_session_cap_are_turned_away():
+    metrics.reset()
+    with TestClient(_app(max_sessions=1)) as client:
+        with client.websocket_connect("/call") as first:
+            _reply(first)
+            with client.websocket_connect("/call") as second:
+                assert json.loads(second.receive_text()) == {"type": "busy"}
+                message = second.receive()
+                assert message["type"] == "websocket.close" and message["code"] == BUSY_CLOSE_CODE
+        assert metrics.snapshot()["counters"]["server.rejected_sessions"] == 1
+
+        # The slot frees up once the first call hangs up
+        with client.websocket_connect("/call") as third:
+            assert "How can I help" in _reply(third)
+
+
+def test_a_client_that_stops_reading_is_dropped():
+    class _StalledSocket:
+        async def send_text(self, text):
+            await asyncio.Event().wait()  # the client never reads
+
+    async def speak():
+        caller = WebSocketCaller(_StalledSocket(), None, send_queue=2, send_timeout=0.1)
+        sender = asyncio.ensure_future(caller.send_loop())
+        try:
+            await caller.speak("One. Two. Three. Four.")
+        finally:
+            sender.cancel()
+
+    metrics.reset()
+    try:
+        asyncio.run(speak())
+        assert False, "kept speaking to a client that stopped reading"
+    except CallEnded:
+        pass
+    assert metrics.snapshot()["counters"]["server.slow_clients"] == 1
+
+
+if __name__ == "__main__":
+    test_each_connection_holds_its_own_call()
+    test_audio_frames_are_transcribed_into_a_turn()
+    test_a_dropped_call_resumes_from_its_checkpoint()
+    test_malformed_frames_are_ignored()
+    test_an_unknown_session_id_is_not_adopted()
+    test_calls_over_the_session_cap_are_turned_away()
+    test_a_client_that_stops_reading_is_dropped()
+    print("✅ Call server tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the async ConversationHandler and the asyncio turn loop
+"""
+
+import asyncio
+import time
+
+from availability import AvailabilityEngine
+from call_session import run_call
+from conversation_handler import ConversationHandler
+from fake_llm import ScriptedChatModel
+
+SCRIPT = [
+    "Hi, I'd like to book an appointment",
+    "",  # silence - nothing to process
+    "My name is Jane Doe",
+    "It's for a checkup on Monday at 10:00 AM",
+    "Thank you, goodbye",
+]
+
+
+class _ScriptedCaller:
+    def __init__(self, script):
+        self.lines = iter(script)
+        self.heard = []
+
+    async def listen(self, duration):
+        await asyncio.sleep(0)
+        return next(self.lines, "goodbye")
+
+    async def speak(self, text):
+        self.heard.append(text)
+
+
+def test_async_turns_match_sync_turns():
+    sync_handler = ConversationHandler(llm=ScriptedChatModel(), single_call=False, availability=AvailabilityEngine())
+    async_handler = ConversationHandler(llm=ScriptedChatModel(), single_call=False, availability=AvailabilityEngine())
+
+    async def run_async():
+        return [await async_handler.aprocess_user_input(text) for text in SCRIPT if text]
+
+    sync_replies = [sync_handler.process_user_input(text) for text in SCRIPT if text]
+    assert asyncio.run(run_async()) == sync_replies
+    assert async_handler.patient_info == sync_handler.patient_info
+
+
+def test_run_call_stops_on_goodbye():
+    handler = ConversationHandler(llm=ScriptedChatModel(), availability=AvailabilityEngine())
+    caller = _ScriptedCaller(SCRIPT)
+
+    turns = asyncio.run(run_call(handler, caller, pause=0))
+
+    assert turns == 4
+    assert caller.heard[0] == handler.get_greeting()
+    assert "confirmed for Monday, " in caller.heard[3]
+    assert handler.conversation_state == "closing"
+
+
+def test_run_call_streams_replies_when_the_endpoint_can():
+    class _StreamingCaller(_ScriptedCaller):
+        async def speak_stream(self, sentences):
+            self.heard.append([sentence async for sentence in sentences])
+
+    handler = ConversationHandler(llm=ScriptedChatModel(), availability=AvailabilityEngine())
+    caller = _StreamingCaller(SCRIPT)
+
+    assert asyncio.run(run_call(handler, caller, pause=0)) == 4
+    assert caller.heard[1] == ["Thanks.", "Could you tell me a little more?"]
+    assert caller.heard[3][-1].startswith("Your appointment has been confirmed for Monday, ")
+    assert caller.heard[3][-1].endswith(" at 10:00 AM with Dr. Smith.")
+
+
+def test_calls_overlap_on_one_event_loop():
+    llm = ScriptedChatModel(latency=0.05)
+    callers = 20
+
+    async def run_all():
+        await asyncio.gather(*(
+            run_call(ConversationHandler(llm=llm, availability=AvailabilityEngine()), _ScriptedCaller(SCRIPT), pause=0)
+            for _ in range(callers)
+        ))
+
+    started = time.perf_counter()
+    asyncio.run(run_all())
+    elapsed = time.perf_counter() - started
+
+    assert llm.calls == callers * 4
+    # Sequentially this would take callers * 4 * 50 ms = 4 s
+    assert elapsed < 1.0
+
+
+if __name__ == "__main__":
+    test_async_turns_match_sync_turns()
+    test_run_call_stops_on_goodbye()
+    test_run_call_streams_replies_when_the_endpoint_can()
+    test_calls_overlap_on_one_event_loop()
+    print("✅ Call session tests passed")
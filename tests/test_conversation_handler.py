@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test how ConversationHandler calls the LLM: one structured call per turn, fallback, prompt caching and streaming
+"""
+
+import time
+
+from availability import AvailabilityEngine
+from conversation_handler import ConversationHandler, parse_turn_result, SYSTEM_PROMPT, STRUCTURED_REPLY_PROMPT
+from fake_llm import ScriptedChatModel
+from metrics import metrics
+from tts_pipeline import split_sentences
+
+BOOKING = [
+    "Hi, I'd like to book an appointment",
+    "My name is Jane Doe",
+    "It's for a checkup on Monday at 10:00 AM",
+]
+
+
+def _run(handler):
+    return [handler.process_user_input(text) for text in BOOKING]
+
+
+def test_single_call_mode_uses_one_llm_call_per_turn():
+    llm = ScriptedChatModel()
+    handler = ConversationHandler(llm=llm, single_call=True, availability=AvailabilityEngine())
+    replies = _run(handler)
+
+    assert llm.calls == len(BOOKING)
+    assert handler.current_intent == "appointment"
+    assert handler.patient_info["name"] == "Jane Doe"
+    assert handler.patient_info["appointment_day"] == "Monday"
+    assert handler.patient_info["appointment_time"] == "10:00 AM"
+    assert handler.conversation_state == "confirming"
+    assert "confirmed for Monday, " in replies[-1]
+    assert "at 10:00 AM with Dr. " in replies[-1]
+
+
+def test_both_modes_reach_the_same_state():
+    single = ConversationHandler(llm=ScriptedChatModel(), single_call=True, availability=AvailabilityEngine())
+    sequential_llm = ScriptedChatModel()
+    sequential = ConversationHandler(llm=sequential_llm, single_call=False, availability=AvailabilityEngine())
+    _run(single)
+    _run(sequential)
+
+    assert sequential_llm.calls == 1 + 2 * len(BOOKING)  # intent once, extraction + reply every turn
+    assert single.patient_info == sequential.patient_info
+    assert single.conversation_state == sequential.conversation_state
+
+
+def test_unparseable_structured_reply_falls_back():
+    metrics.reset()
+    llm = ScriptedChatModel(structured_output=False)
+    handler = ConversationHandler(llm=llm, single_call=True, availability=AvailabilityEngine())
+    _run(handler)
+
+    assert metrics.snapshot()["counters"]["conversation.structured_fallbacks"] == len(BOOKING)
+    assert handler.patient_info["name"] == "Jane Doe"
+    assert handler.conversation_state == "confirming"
+
+
+def test_static_prompt_prefix_is_cached_across_turns_and_calls():
+    metrics.reset()
+    llm = ScriptedChatModel()
+    first = ConversationHandler(llm=llm, availability=AvailabilityEngine())
+    second = ConversationHandler(llm=llm, availability=AvailabilityEngine())
+    assert first.system_prompt is second.system_prompt is SYSTEM_PROMPT
+
+    first.process_user_input(BOOKING[0])
+    assert first.turn_usage["cached_tokens"] == 0
+
+    # Later turns and other calls reuse at least the static prompt
+    static_tokens = len(STRUCTURED_REPLY_PROMPT) // 4
+    first.process_user_input(BOOKING[1])
+    second.process_user_input(BOOKING[0])
+    for handler in (first, second):
+        assert handler.turn_usage["cached_tokens"] >= static_tokens - 128
+        assert handler.turn_usage["cached_tokens"] <= handler.turn_usage["input_tokens"]
+
+    hit_rate = metrics.snapshot()["timings"]["conversation.cache_hit_rate"]
+    assert hit_rate["count"] == 3
+    assert hit_rate["max"] > 0.8
+
+
+def test_streamed_reply_is_spoken_before_generation_ends():
+    for single_call in (True, False):
+        llm = ScriptedChatModel(token_delay=0.02)
+        handler = ConversationHandler(llm=llm, single_call=single_call, availability=AvailabilityEngine())
+        reference = ConversationHandler(llm=ScriptedChatModel(), single_call=single_call, availability=AvailabilityEngine())
+
+        for text in BOOKING:
+            started = time.perf_counter()
+            arrivals = [(sentence, time.perf_counter() - started) for sentence in handler.stream_user_input(text)]
+            sentences = [sentence for sentence, _ in arrivals]
+
+            assert " ".join(sentences) == " ".join(split_sentences(reference.process_user_input(text)))
+            assert not any("{" in sentence for sentence in sentences)  # the JSON header is never spoken
+            # "Thanks." arrives well before the rest of the reply has been generated
+            assert arrivals[0][1] < arrivals[1][1] - 0.05
+
+        assert handler.patient_info == reference.patient_info
+        assert "confirmed for Monday, " in sentences[-1]
+
+
+def test_parse_turn_result_accepts_fenced_json():
+    result = parse_turn_result('```json\n{"intent": "info", "reply": "We open at 8."}\n```')
+    assert result.intent == "info"
+    assert result.name is None
+
+
+if __name__ == "__main__":
+    test_single_call_mode_uses_one_llm_call_per_turn()
+    test_both_modes_reach_the_same_state()
+    test_unparseable_structured_reply_falls_back()
+    test_static_prompt_prefix_is_cached_across_turns_and_calls()
+    test_streamed_reply_is_spoken_before_generation_ends()
+    test_parse_turn_result_accepts_fenced_json()
+    print("✅ Conversation handler tests passed")
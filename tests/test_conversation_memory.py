@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the token-budgeted conversation memory
+"""
+
+from availability import AvailabilityEngine
+from conversation_handler import ConversationHandler
+from conversation_memory import ConversationMemory, estimate_tokens, summarize_patient_info
+from fake_llm import ScriptedChatModel
+
+
+def _recount(memory):
+    return sum(estimate_tokens(content) for _, content in memory)
+
+
+def test_memory_stays_within_token_budget():
+    memory = ConversationMemory(max_tokens=100, max_messages=50, trim_ratio=0.5)
+    for turn in range(40):
+        memory.add("human", f"message number {turn} " + "x" * (turn % 7) * 10)
+        assert memory.tokens <= 100
+        assert memory.tokens == _recount(memory)
+
+    # The newest message is always kept
+    assert list(memory)[-1][1].startswith("message number 39")
+
+
+def test_trimming_keeps_the_prefix_stable_between_trims():
+    memory = ConversationMemory(max_tokens=100, max_messages=50, trim_ratio=0.5)
+    oldest = []
+    for turn in range(30):
+        memory.add("human", f"{turn:02d}" + "y" * 38)  # 10 tokens each
+        oldest.append(next(iter(memory)))
+
+    # Dropping to half the budget means the oldest message only changes every few turns
+    changes = sum(1 for previous, current in zip(oldest, oldest[1:]) if previous != current)
+    assert changes <= 6
+
+
+def test_message_cap_keeps_token_count_in_sync():
+    memory = ConversationMemory(max_tokens=10_000, max_messages=4)
+    for turn in range(10):
+        memory.add("assistant", "z" * (turn + 1) * 4)
+    assert len(memory) == 4
+    assert memory.tokens == _recount(memory)
+
+
+def test_dropped_turns_survive_in_the_patient_summary():
+    handler = ConversationHandler(llm=ScriptedChatModel(), availability=AvailabilityEngine())
+    handler.memory = ConversationMemory(max_tokens=60)
+    handler.process_user_input("Hi, I'd like to book an appointment")
+    handler.process_user_input("My name is Jane Doe")
+    for _ in range(6):
+        handler.process_user_input("Sorry, could you repeat that please? " * 3)
+
+    assert not any("Jane Doe" in content for _, content in handler.memory)
+    assert "name=Jane Doe" in handler._state_info()
+    assert summarize_patient_info({"name": None}) == "nothing yet"
+
+
+if __name__ == "__main__":
+    test_memory_stays_within_token_budget()
+    test_trimming_keeps_the_prefix_stable_between_trims()
+    test_message_cap_keeps_token_count_in_sync()
+    test_dropped_turns_survive_in_the_patient_summary()
+    print("✅ Conversation memory tests passed")
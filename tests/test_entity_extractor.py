@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass entity extractor against a table of transcripts
+"""
+
+from entity_extractor import DAY, TIME, PHONE, NAME, extract_entities, normalize_times
+
+# (transcript, expected (kind, value) pairs in order)
+CORPUS = [
+    ("Monday at 10 am", [(DAY, "monday"), (TIME, "10:00 AM")]),
+    ("how about 9.15", [(TIME, "9:15 AM")]),
+    ("3:30 works", [(TIME, "3:30 PM")]),
+    ("14:00 please", [(TIME, "2:00 PM")]),
+    ("at 11 a.m. on Wed", [(TIME, "11:00 AM"), (DAY, "wednesday")]),
+    ("10 30 am", [(TIME, "10:30 AM")]),
+    ("115 pm", [(TIME, "1:15 PM")]),
+    ("1115 PM", [(TIME, "11:15 PM")]),
+    ("one fifteen pm", [(TIME, "1:15 PM")]),
+    ("nine forty-five", [(TIME, "9:45 AM")]),
+    ("ten am on thurs", [(TIME, "10:00 AM"), (DAY, "thursday")]),
+    ("turn AM", [(TIME, "10:00 AM")]),
+    ("Friday at 3 o'clock", [(DAY, "friday"), (TIME, "3:00 PM")]),
+    ("I need one appointment for ten people", []),
+    ("my number is 407-555-0123", [(PHONE, "(407) 555-0123")]),
+    ("it's 1 (407) 555 0123", [(PHONE, "(407) 555-0123")]),
+    ("four oh seven five five five zero one two three", [(PHONE, "(407) 555-0123")]),
+    ("My name is jane doe", [(NAME, "Jane Doe")]),
+    ("This is Bob Smith calling for Tuesday", [(NAME, "Bob Smith"), (DAY, "tuesday")]),
+    ("I'm calling to book", []),
+    ("I am feeling sick", []),
+    ("I'm Maria, 4075550123", [(NAME, "Maria"), (PHONE, "(407) 555-0123")]),
+    ("monthly checkup", []),
+]
+
+
+def test_corpus():
+    for text, expected in CORPUS:
+        found = [(entity.kind, entity.value) for entity in extract_entities(text)]
+        assert found == expected, (text, found)
+
+
+def test_spans_cover_the_original_text():
+    text = "This is Bob Smith, Monday at ten thirty AM, 407 555 0123"
+    spans = {entity.kind: text[entity.start:entity.end] for entity in extract_entities(text)}
+    assert spans == {NAME: "Bob Smith", DAY: "Monday", TIME: "ten thirty AM", PHONE: "407 555 0123"}
+
+
+def test_normalize_times_rewrites_only_times():
+    assert normalize_times("Can I come Monday at one fifteen pm?") == "Can I come Monday at 1:15 PM?"
+    assert normalize_times("nine.15 AM or 3 30 pm") == "nine.15 AM or 3:30 PM"
+    assert normalize_times("No times here") == "No times here"
+
+
+if __name__ == "__main__":
+    test_corpus()
+    test_spans_cover_the_original_text()
+    test_normalize_times_rewrites_only_times()
+    print("✅ Entity extractor tests passed")
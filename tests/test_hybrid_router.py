@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test the rules-first / LLM-fallback router
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+from availability import AvailabilityEngine
+from booking_store import BookingStore
+from call_session import run_call
+from conversation_handler import ConversationHandler
+from enhanced_ai_assistant import SimpleEnhancedAssistant, HOURS_RESPONSE, LOCATION_RESPONSE
+from fake_llm import ScriptedChatModel
+from hybrid_router import HybridRouter, RULES, LLM
+from metrics import metrics
+
+BOOKING = [
+    "What are your hours?",
+    "I'd like to book an appointment",
+    "Monday",
+    "10:30 AM",
+    "I have a sore throat",
+    "Jane Doe",
+    "555-123-4567",
+]
+
+
+def _router():
+    llm = ScriptedChatModel()
+    availability = AvailabilityEngine()
+    rules = SimpleEnhancedAssistant(availability)
+    return HybridRouter(rules, llm_factory=lambda: ConversationHandler(llm=llm, availability=availability)), llm
+
+
+def test_routine_booking_never_calls_the_llm():
+    metrics.reset()
+    router, llm = _router()
+    replies = [router.process_user_input(text) for text in BOOKING]
+
+    assert replies[0] == HOURS_RESPONSE
+    assert router._llm_handler is None
+    assert llm.calls == 0
+    assert router.rules.appointment_time == "10:30 AM"
+    assert router.rules.patient_name == "Jane Doe"
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["router.route.rules"] == len(BOOKING)
+    assert snapshot["timings"]["router.turn_time.rules"]["count"] == len(BOOKING)
+
+
+def test_ambiguous_turns_escalate():
+    router, _ = _router()
+    assert router.route("Where are you?") == (RULES, "location")
+    assert router.route("Do you take Aetna and when are you open?").route == LLM
+    assert router.route("Can you tell me more about Dr. Smith?").route == LLM
+    assert router.route("Tuesday").route == RULES
+    assert router.route("I'm not sure, something in between").route == LLM
+
+
+def test_llm_sees_what_the_rules_collected():
+    router, llm = _router()
+    for text in BOOKING[1:4]:
+        router.process_user_input(text)
+
+    router.process_user_input("Could you check which doctor I would see?")
+    handler = router.llm_handler
+    assert llm.calls == 1
+    assert handler.current_intent == "appointment"
+    assert handler.patient_info["appointment_day"] == "Monday"
+    assert handler.patient_info["appointment_time"] == "10:30 AM"
+    # The locally answered turns are part of the LLM's history, in its role names
+    assert len(handler.memory) == 2 * 4
+    assert {role for role, _ in handler.memory} == {"human", "assistant"}
+
+    assert router.process_user_input("Where is the clinic?") == LOCATION_RESPONSE
+    assert llm.calls == 1
+
+
+def test_a_slot_held_by_the_rules_is_confirmed_after_the_hand_off():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookingStore(os.path.join(tmp, "bookings.db"))
+        availability = AvailabilityEngine(clock=lambda: datetime(2026, 10, 16, 7, 30), store=store)
+        llm = ScriptedChatModel()
+        router = HybridRouter(SimpleEnhancedAssistant(availability),
+                              llm_factory=lambda: ConversationHandler(llm=llm, availability=availability))
+        for text in BOOKING[1:5]:
+            router.process_user_input(text)
+        held = router.rules.booked_slot
+        assert held is not None and store.bookings() == []  # held, not yet confirmed
+
+        reply = router.process_user_input("Could you check which doctor I would see? My name is Jane Doe")
+        assert llm.calls == 1
+        assert router.llm_handler.conversation_state == "confirming"
+        assert "confirmed for Monday" in reply
+        booking, = store.bookings()
+        assert (booking["doctor"], booking["minutes"], booking["patient_name"]) == (held.doctor, held.minutes, "Jane Doe")
+
+        # Confirming again on a later turn is a no-op
+        router.process_user_input("Could you repeat which doctor that was?")
+        assert len(store.bookings()) == 1
+
+
+def test_a_rebooked_slot_is_the_only_one_confirmed():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookingStore(os.path.join(tmp, "bookings.db"))
+        availability = AvailabilityEngine(clock=lambda: datetime(2026, 10, 16, 7, 30), store=store)
+        llm = ScriptedChatModel()
+        router = HybridRouter(SimpleEnhancedAssistant(availability),
+                              llm_factory=lambda: ConversationHandler(llm=llm, availability=availability))
+        for text in BOOKING[1:4]:
+            router.process_user_input(text)
+        first = router.rules.booked_slot
+        router.process_user_input("Could you check which doctor I would see?")
+        assert router.llm_handler.booked_slot == first
+
+        # The rules move the caller to another time; the LLM route follows
+        router.process_user_input("actually 3:30 pm")
+        moved = router.rules.booked_slot
+        assert moved.minutes == 15 * 60 + 30 and availability.is_free(first)
+        router.process_user_input(BOOKING[4])
+        reply = router.process_user_input("Could you check which doctor I would see? My name is Jane Doe")
+        assert router.llm_handler.booked_slot == moved
+        assert "3:30 PM" in reply and "10:30 AM" not in reply
+        router.process_user_input(BOOKING[6])
+
+        booking, = store.bookings()
+        assert (booking["minutes"], booking["patient_name"]) == (moved.minutes, "Jane Doe")
+        assert store.taken(moved.date) == {(moved.doctor, moved.minutes)}
+
+
+def test_router_drives_a_call():
+    router, llm = _router()
+    script = iter(BOOKING[1:] + ["Thanks, bye"])
+    heard = []
+
+    class Caller:
+        async def listen(self, duration):
+            return next(script)
+
+        async def speak_stream(self, sentences):
+            heard.extend([sentence async for sentence in sentences])
+
+        async def speak(self, text):
+            heard.append(text)
+
+    turns = asyncio.run(run_call(router, Caller(), pause=0))
+    assert turns == len(BOOKING)
+    assert router.conversation_state == "closing"
+    assert llm.calls == 0
+    assert heard[-1] == "Have a wonderful day!"
+
+
+if __name__ == "__main__":
+    test_routine_booking_never_calls_the_llm()
+    test_ambiguous_turns_escalate()
+    test_llm_sees_what_the_rules_collected()
+    test_a_slot_held_by_the_rules_is_confirmed_after_the_hand_off()
+    test_a_rebooked_slot_is_the_only_one_confirmed()
+    test_router_drives_a_call()
+    print("✅ Hybrid router tests passed")
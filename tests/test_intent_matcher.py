@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the compiled single-pass intent matcher
+"""
+
+from availability import AvailabilityEngine
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+from intent_matcher import _classify, classify, matched_intents
+
+CASES = [
+    ("I'd like to book an appointment", 'appointment'),
+    ("Do you take Blue Cross?", 'insurance'),
+    ("What time do you open?", 'hours'),
+    ("What's your address?", 'location'),
+    ("How much are the fees?", 'cost'),
+    ("Thanks, that's all", 'goodbye'),
+    ("I'd like to schedule a visit, thank you", 'goodbye'),
+    ("My name is Jane Doe", 'general'),
+]
+
+
+def test_intents_follow_priority_order():
+    for text, intent in CASES:
+        assert classify(text).intent == intent, text
+    assert matched_intents("When are you open and do you take Aetna?") == ['insurance', 'hours']
+
+
+def test_keywords_match_whole_words_only():
+    # Substring scanning used to read these as cost, hours and goodbye
+    assert classify("I feel dizzy").intent == 'general'
+    assert classify("Sometimes my knee hurts").intent == 'general'
+    assert classify("I was abandoned").intent == 'general'
+    # Plain inflections still match
+    assert classify("Are you booking this week?").intent == 'appointment'
+    assert classify("Which plans do you accept?").intent == 'insurance'
+
+
+def test_spans_point_into_the_text():
+    text = "  No that's all, THANKS  "
+    match = classify(text)
+    normalized = text.strip().lower()
+    assert [(span.keyword, normalized[span.start:span.end]) for span in match.spans] == [
+        ("no that's all", "no that's all"), ("thanks", "thanks"),
+    ]
+
+
+def test_each_turn_is_scanned_once():
+    _classify.cache_clear()
+    assistant = SimpleEnhancedAssistant(AvailabilityEngine())
+    text = "What are your hours?"
+
+    assert assistant.detect_intent(text) == 'hours'
+    assert assistant.detect_intent(text.upper()) == 'hours'
+    assert matched_intents(text) == ['hours']
+    info = _classify.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+if __name__ == "__main__":
+    test_intents_follow_priority_order()
+    test_keywords_match_whole_words_only()
+    test_spans_point_into_the_text()
+    test_each_turn_is_scanned_once()
+    print("✅ Intent matcher tests passed")
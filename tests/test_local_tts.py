@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test the resident local TTS worker with the file backend, and VoiceHandler speaking through it
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import voice_handler_simple
+from audio_playback import StreamingPlayer
+from enhanced_ai_assistant import STATIC_RESPONSES
+from local_tts import LocalTTSError, LocalTTSWorker
+from metrics import metrics
+from test_audio_playback import FakeOutputStream
+from tts_cache import PhraseCache
+from voice_handler_simple import VoiceHandler
+
+RATE = 16000
+SAMPLES_PER_WORD = int(RATE * 0.05)
+
+
+def _worker(cache_dir=None, log_path=None):
+    log_path = log_path or os.path.join(tempfile.mkdtemp(), "requests.log")
+    cache = PhraseCache(directory=cache_dir or tempfile.mkdtemp(), persistent=STATIC_RESPONSES)
+    return LocalTTSWorker("file", cache=cache, sample_rate=RATE, log_path=log_path), log_path
+
+
+def _requests(log_path):
+    """(pid, text) for every sentence the worker rendered"""
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path, encoding="utf-8") as f:
+        return [tuple(line.rstrip("\n").split("\t", 1)) for line in f]
+
+
+def test_one_resident_process_renders_every_sentence():
+    worker, log_path = _worker()
+    try:
+        assert not worker.running
+        sentences = ["Hello there.", "Your appointment is confirmed.", "Goodbye."]
+        for sentence in sentences:
+            audio = worker.render(sentence)
+            assert len(audio) == 2 * SAMPLES_PER_WORD * len(sentence.split())
+        assert worker.backend_name == "file"
+
+        requests = _requests(log_path)
+        assert [text for _, text in requests] == sentences
+        # Warmed once, then reused: one worker process, and not this one
+        pids = {pid for pid, _ in requests}
+        assert len(pids) == 1 and pids != {str(os.getpid())}
+    finally:
+        worker.close()
+    assert not worker.running
+
+
+def test_rendered_sentences_are_cached():
+    cache_dir = tempfile.mkdtemp()
+    greeting, booked = "Thank you for calling Harmony Family Clinic.", "See you Friday, Jane."
+    worker, log_path = _worker(cache_dir)
+    try:
+        first = worker.render(greeting)
+        assert worker.render(greeting) == first
+        worker.render(booked)
+        worker.render(booked)
+        assert len(_requests(log_path)) == 2
+    finally:
+        worker.close()
+
+    # A new worker finds the fixed reply on disk without starting, but renders the patient's sentence again
+    worker, log_path = _worker(cache_dir)
+    try:
+        assert worker.render(greeting) == first
+        assert not worker.running
+        worker.render(booked)
+        assert [text for _, text in _requests(log_path)] == [booked]
+    finally:
+        worker.close()
+
+
+def test_a_dead_worker_is_replaced():
+    metrics.reset()
+    worker, log_path = _worker()
+    try:
+        worker.render("One.")
+        worker._process.kill()
+        worker._process.join()
+        worker.render("Two.")
+        first, second = (pid for pid, _ in _requests(log_path))
+        assert first != second
+        assert metrics.snapshot()["counters"]["local_tts.starts"] == 2
+    finally:
+        worker.close()
+
+
+def test_render_errors_leave_the_worker_running():
+    worker, _ = _worker(log_path=os.path.join(tempfile.mkdtemp(), "missing", "requests.log"))
+    try:
+        try:
+            worker.render("Hello.")
+            assert False, "expected LocalTTSError"
+        except LocalTTSError:
+            pass
+        assert worker.running
+
+        try:
+            LocalTTSWorker("festival")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    finally:
+        worker.close()
+
+
+def _voice_handler(worker):
+    streams = []
+
+    def player(sample_rate, device=None):
+        def factory(**kwargs):
+            streams.append(FakeOutputStream(**kwargs))
+            return streams[-1]
+        return StreamingPlayer(sample_rate, device, stream_factory=factory)
+
+    handler = VoiceHandler(use_elevenlabs=False, local_tts=worker)
+    said = []
+    handler._simple_fallback_speech = lambda text: said.append(text) or True
+    return handler, player, streams, said
+
+
+def test_voice_handler_plays_local_speech_through_the_output_stream():
+    worker, log_path = _worker()
+    handler, player, streams, said = _voice_handler(worker)
+    original = voice_handler_simple.StreamingPlayer
+    voice_handler_simple.StreamingPlayer = player
+    try:
+        assert handler.text_to_speech("Hello there. Your appointment is confirmed.")
+        assert said == []
+        assert [text for _, text in _requests(log_path)] == ["Hello there.", "Your appointment is confirmed."]
+
+        # Both sentences through one stream at the worker's rate, back to back
+        (stream,) = streams
+        played = np.concatenate(stream.played)
+        assert np.count_nonzero(played) > 0.95 * SAMPLES_PER_WORD * 6
+    finally:
+        voice_handler_simple.StreamingPlayer = original
+        worker.close()
+
+
+def test_voice_handler_falls_back_to_say_when_local_speech_fails():
+    worker, _ = _worker(log_path=os.path.join(tempfile.mkdtemp(), "missing", "requests.log"))
+    handler, player, _, said = _voice_handler(worker)
+    original = voice_handler_simple.StreamingPlayer
+    voice_handler_simple.StreamingPlayer = player
+    try:
+        assert handler.text_to_speech("Hello there. Goodbye.")
+        # Nothing was heard, so the whole reply goes to `say`, once
+        assert said == ["Hello there. Goodbye."]
+    finally:
+        voice_handler_simple.StreamingPlayer = original
+        worker.close()
+
+
+if __name__ == "__main__":
+    test_one_resident_process_renders_every_sentence()
+    test_rendered_sentences_are_cached()
+    test_a_dead_worker_is_replaced()
+    test_render_errors_leave_the_worker_running()
+    test_voice_handler_plays_local_speech_through_the_output_stream()
+    test_voice_handler_falls_back_to_say_when_local_speech_fails()
+    print("✅ Local TTS tests passed")
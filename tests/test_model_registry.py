@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test that local models are loaded once and shared across turns
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from metrics import metrics
+from model_registry import ModelRegistry
+from streaming_stt import LocalWhisperRecognizer
+
+
+class _FakeModel:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def transcribe(self, audio):
+        self.calls += 1
+        return {"text": f" heard {len(audio)} samples "}
+
+
+def _slow_loader(loads):
+    def load(name):
+        loads.append(name)
+        time.sleep(0.05)
+        return _FakeModel(name)
+    return load
+
+
+def test_concurrent_turns_share_one_load():
+    metrics.reset()
+    loads = []
+    registry = ModelRegistry(loader=_slow_loader(loads), warmer=None)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("base"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["base"]
+    assert all(model is results[0] for model in results)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["model_registry.loads"] == 1
+    assert snapshot["counters"]["model_registry.hits"] == 7
+    assert snapshot["timings"]["model_registry.load_time.base"]["count"] == 1
+
+
+def test_background_warm_up():
+    loads = []
+    warmed = []
+    registry = ModelRegistry(loader=_slow_loader(loads), warmer=warmed.append)
+
+    thread = registry.warm_up(["base"])
+    assert thread is not None
+    thread.join()
+
+    assert registry.is_loaded("base")
+    assert warmed == [registry.get("base")]
+    assert loads == ["base"]
+
+
+def test_local_recognizer_reuses_registry_model():
+    loads = []
+    registry = ModelRegistry(loader=_slow_loader(loads), warmer=None)
+    audio = np.zeros(16000, dtype=np.int16)
+
+    for _ in range(3):
+        text = LocalWhisperRecognizer("base", registry=registry).transcribe(audio, 16000)
+        assert text == "heard 16000 samples"
+
+    assert loads == ["base"]
+    assert registry.get("base").calls == 3
+
+
+if __name__ == "__main__":
+    test_concurrent_turns_share_one_load()
+    test_background_warm_up()
+    test_local_recognizer_reuses_registry_model()
+    metrics.print_summary()
+    print("✅ Model registry tests passed")
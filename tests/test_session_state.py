@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test session snapshots: a call moves to another worker mid-booking and carries on where it left off
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+from availability import AvailabilityEngine
+from booking_store import BookingStore
+from conversation_handler import ConversationHandler
+from enhanced_ai_assistant import SimpleEnhancedAssistant
+from fake_llm import ScriptedChatModel
+from hybrid_router import HybridRouter
+from session_state import SNAPSHOT_VERSION, SessionStore, SnapshotError, restore, snapshot
+
+
+def _worker(path):
+    """One worker process: its own calendar cache over the shared booking store"""
+    availability = AvailabilityEngine(clock=lambda: datetime(2026, 10, 16, 7, 30), store=BookingStore(path))
+    llm = ScriptedChatModel()
+    return lambda: HybridRouter(SimpleEnhancedAssistant(availability),
+                                llm_factory=lambda: ConversationHandler(llm=llm, availability=availability))
+
+
+def test_a_call_moves_to_another_worker_mid_booking():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db")
+        first, second = _worker(path), _worker(path)
+
+        call = first()
+        for text in ("I'd like to book an appointment", "Monday", "10:30 AM", "Do you have parking and a lift?"):
+            call.process_user_input(text)
+        assert call._llm_handler is not None  # the last turn went to the LLM
+        data = snapshot(call)
+
+        resumed = restore(data, second())
+        assert resumed.rules.booked_slot == call.rules.booked_slot
+        assert resumed.rules.conversation_history == call.rules.conversation_history
+        assert resumed.llm_handler.patient_info == call.llm_handler.patient_info
+        assert list(resumed.llm_handler.memory) == list(call.llm_handler.memory)
+        assert snapshot(resumed) == data
+
+        # The hold made on the first worker is confirmed on the second
+        for text in ("A checkup", "Jane Doe", "407 555 0123"):
+            resumed.process_user_input(text)
+        booking, = BookingStore(path).bookings()
+        assert (booking["patient_name"], booking["minutes"]) == ("Jane Doe", 10 * 60 + 30)
+
+
+def test_restored_handler_answers_like_the_original():
+    llm = ScriptedChatModel()
+    original = ConversationHandler(llm=llm, availability=AvailabilityEngine())
+    original.process_user_input("Hi, I'd like to book an appointment")
+    original.process_user_input("My name is Jane Doe")
+
+    copy = restore(snapshot(original), ConversationHandler(llm=llm, availability=AvailabilityEngine()))
+    assert copy.patient_info == original.patient_info
+    assert (copy.current_intent, copy.conversation_state) == (original.current_intent, original.conversation_state)
+    assert copy.process_user_input("It's for a checkup on Monday at 10:00 AM") == \
+        original.process_user_input("It's for a checkup on Monday at 10:00 AM")
+
+
+def test_snapshots_are_small_and_refuse_what_they_cannot_read():
+    assistant = SimpleEnhancedAssistant(AvailabilityEngine())
+    for text in ("I'd like to book an appointment", "Monday", "10:30 AM"):
+        assistant.process_input(text)
+    data = snapshot(assistant)
+    assert len(data) < 600
+
+    newer = data[:2] + bytes((SNAPSHOT_VERSION + 1,)) + data[3:]
+    for bad, target in ((newer, SimpleEnhancedAssistant(AvailabilityEngine())),
+                        (data, ConversationHandler(llm=ScriptedChatModel(), availability=AvailabilityEngine())),
+                        (data[:20], SimpleEnhancedAssistant(AvailabilityEngine())),
+                        (b"{}", SimpleEnhancedAssistant(AvailabilityEngine()))):
+        try:
+            restore(bad, target)
+            assert False, "restored an unreadable snapshot"
+        except SnapshotError:
+            pass
+
+
+def test_session_store_keeps_the_latest_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(os.path.join(tmp, "sessions"))
+        assistant = SimpleEnhancedAssistant(AvailabilityEngine())
+        assert not store.resume("call-1", assistant)
+
+        assistant.process_input("I'd like to book an appointment")
+        store.save("call-1", assistant)
+        assistant.process_input("Tuesday")
+        store.save("call-1", assistant)
+
+        resumed = SimpleEnhancedAssistant(AvailabilityEngine())
+        assert store.resume("call-1", resumed)
+        assert resumed.appointment_date == "tuesday"
+        assert len(resumed.conversation_history) == 4
+
+        store.delete("call-1")
+        assert not store.resume("call-1", SimpleEnhancedAssistant(AvailabilityEngine()))
+        try:
+            store.save("../escape", assistant)
+            assert False, "wrote outside the store"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_a_call_moves_to_another_worker_mid_booking()
+    test_restored_handler_answers_like_the_original()
+    test_snapshots_are_small_and_refuse_what_they_cannot_read()
+    test_session_store_keeps_the_latest_checkpoint()
+    print("✅ Session state tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the startup path: entry points import no provider SDKs, and the import-time report
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from startup_report import DEFERRED_PROVIDERS, ENTRY_POINTS, main, measure, parse_importtime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _abc
+import time:       300 |        420 | abc
+import time:      1500 |       1500 |     numpy._core
+import time:       800 |       2300 |   numpy
+import time:       900 |       3620 | voice_activity
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(SAMPLE)
+    assert [record.module for record in records] == ["_abc", "abc", "numpy._core", "numpy", "voice_activity"]
+    assert [record.depth for record in records] == [1, 0, 2, 1, 0]
+    assert records[-1].self_us == 900 and records[-1].cumulative_us == 3620
+
+
+def test_entry_points_defer_every_provider():
+    for entry_point in ENTRY_POINTS:
+        report = measure(entry_point)
+        assert report.providers == [], f"{entry_point} imports {report.providers} at startup"
+        assert report.import_us > 0
+        assert report.imports
+
+
+def test_voice_handler_loads_audio_and_speech_on_first_use():
+    script = (
+        "import sys\n"
+        "from voice_handler_simple import VoiceHandler\n"
+        "handler = VoiceHandler(use_elevenlabs=False)\n"
+        f"print(sorted(name for name in {DEFERRED_PROVIDERS!r} if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_budget_fails_the_report():
+    assert main(["enhanced_ai_assistant", "--json", "--budget-ms", "100000"]) == 0
+    assert main(["enhanced_ai_assistant", "--json", "--budget-ms", "0"]) == 1
+
+
+def test_json_report_for_ci():
+    result = subprocess.run([sys.executable, "startup_report.py", "--json", "--top", "3", "enhanced_ai_assistant"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout)
+    (entry,) = report["entry_points"]
+    assert entry["entry_point"] == "enhanced_ai_assistant"
+    assert entry["providers"] == []
+    assert len(entry["slowest"]) == 3
+
+
+if __name__ == "__main__":
+    test_parse_importtime()
+    test_entry_points_defer_every_provider()
+    test_voice_handler_loads_audio_and_speech_on_first_use()
+    test_budget_fails_the_report()
+    test_json_report_for_ci()
+    print("✅ Startup tests passed")
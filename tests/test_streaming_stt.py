@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test the streaming speech-to-text pipeline offline
+"""
+
+import io
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from streaming_stt import StreamingTranscriber, ScriptedRecognizer, WhisperAPIRecognizer
+
+SAMPLE_RATE = 16000
+CHUNK = 1600  # 100ms blocks, like the InputStream callback
+
+
+def _feed_in_chunks(transcriber, seconds):
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+    for start in range(0, len(audio), CHUNK):
+        transcriber.feed(audio[start:start + CHUNK].reshape(-1, 1))
+
+
+def test_partial_and_final_hypotheses():
+    partials = []
+    transcriber = StreamingTranscriber(
+        ScriptedRecognizer("I would like Monday at ten thirty", words_per_second=2.0),
+        SAMPLE_RATE,
+        on_partial=partials.append
+    ).start()
+
+    _feed_in_chunks(transcriber, 2.0)
+    final = transcriber.finish()
+
+    assert final == "I would like Monday at ten thirty"
+    assert partials[0] == "I"
+    assert partials[-1] == "I would like Monday"
+    # Each partial extends the previous one
+    for earlier, later in zip(partials, partials[1:]):
+        assert later.startswith(earlier)
+
+
+def test_cancel_discards_audio():
+    transcriber = StreamingTranscriber(ScriptedRecognizer("hello"), SAMPLE_RATE).start()
+    _feed_in_chunks(transcriber, 0.5)
+    transcriber.cancel()
+    # Feeding after cancel is ignored rather than raising from the audio callback
+    _feed_in_chunks(transcriber, 0.5)
+
+
+class _FakeTranscriptions:
+    def __init__(self):
+        self.uploads = []
+
+    def create(self, model, file):
+        name, data = file
+        self.uploads.append((model, name, data, threading.current_thread().name))
+        return type("Transcript", (), {"text": "  Monday please  "})()
+
+
+class _FakeOpenAI:
+    def __init__(self):
+        self.audio = type("Audio", (), {})()
+        self.audio.transcriptions = _FakeTranscriptions()
+
+
+def test_whisper_api_recognizer_uploads_in_memory_wav():
+    client = _FakeOpenAI()
+    transcriber = StreamingTranscriber(WhisperAPIRecognizer(client), SAMPLE_RATE).start()
+
+    tone = (3000 * np.sin(2 * np.pi * 220 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)).astype(np.int16)
+    for start in range(0, len(tone), CHUNK):
+        transcriber.feed(tone[start:start + CHUNK].reshape(-1, 1))
+
+    assert transcriber.finish() == "Monday please"
+
+    model, name, data, _ = client.audio.transcriptions.uploads[0]
+    assert model == "whisper-1"
+    assert name.endswith(".wav")
+
+    decoded, rate = sf.read(io.BytesIO(data), dtype='int16')
+    assert rate == SAMPLE_RATE
+    assert np.array_equal(decoded, tone)
+
+
+def test_recognizer_errors_surface_on_finish():
+    class Broken(ScriptedRecognizer):
+        def accept_audio(self, chunk):
+            raise RuntimeError("network down")
+
+    transcriber = StreamingTranscriber(Broken("x"), SAMPLE_RATE).start()
+    _feed_in_chunks(transcriber, 0.3)
+
+    try:
+        transcriber.finish()
+    except RuntimeError as e:
+        assert "network down" in str(e)
+    else:
+        raise AssertionError("expected the recognizer error to be raised")
+
+
+class _IdleLocalTTS:
+    def warm_up(self):
+        pass
+
+
+class _NoKeyRegistry:
+    def openai(self):
+        raise RuntimeError("The api_key client option must be set")
+
+
+class _FakeWhisper:
+    def __init__(self):
+        self.heard = []
+
+    def transcribe(self, audio):
+        self.heard.append(audio)
+        return {"text": " Monday at one fifteen pm "}
+
+
+def _no_key_voice_handler(whisper):
+    """VoiceHandler without an OpenAI key, local Whisper from `whisper`, and a scripted recording"""
+    import model_registry
+    import voice_handler_simple
+    from model_registry import ModelRegistry
+
+    voice_handler_simple.get_client_registry = _NoKeyRegistry
+    model_registry._registry = ModelRegistry(loader=lambda name: whisper, warmer=None)
+    handler = voice_handler_simple.VoiceHandler(use_elevenlabs=False, local_tts=_IdleLocalTTS())
+    handler.use_vad = False
+    tone = (3000 * np.sin(2 * np.pi * 220 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)).astype(np.int16)
+
+    def record(duration, endpointer=None, transcriber=None):
+        for start in range(0, len(tone), CHUNK):
+            transcriber.feed(tone[start:start + CHUNK].reshape(-1, 1))
+        return tone.reshape(-1, 1)
+
+    handler._record_with_countdown = record
+    return handler
+
+
+def test_voice_handler_records_and_transcribes_locally_without_an_api_key():
+    import model_registry
+    import voice_handler_simple
+
+    whisper = _FakeWhisper()
+    originals = voice_handler_simple.get_client_registry, model_registry._registry
+    try:
+        handler = _no_key_voice_handler(whisper)
+        assert handler.speech_to_text() == "Monday at 1:15 PM"
+        # The recording was streamed into local Whisper, once
+        (audio,) = whisper.heard
+        assert audio.dtype == np.float32 and audio.size > 0
+    finally:
+        voice_handler_simple.get_client_registry, model_registry._registry = originals
+
+
+def test_a_local_whisper_failure_goes_straight_to_typed_input():
+    import builtins
+
+    import model_registry
+    import voice_handler_simple
+
+    class Broken(_FakeWhisper):
+        def transcribe(self, audio):
+            super().transcribe(audio)
+            raise RuntimeError("out of memory")
+
+    whisper = Broken()
+    originals = voice_handler_simple.get_client_registry, model_registry._registry, builtins.input
+    try:
+        handler = _no_key_voice_handler(whisper)
+        builtins.input = lambda prompt="": "Monday at one fifteen pm"
+        assert handler.speech_to_text() == "Monday at 1:15 PM"
+        assert len(whisper.heard) == 1  # not run a second time on the same audio
+    finally:
+        voice_handler_simple.get_client_registry, model_registry._registry, builtins.input = originals
+
+
+if __name__ == "__main__":
+    test_partial_and_final_hypotheses()
+    test_cancel_discards_audio()
+    test_whisper_api_recognizer_uploads_in_memory_wav()
+    test_recognizer_errors_surface_on_finish()
+    test_voice_handler_records_and_transcribes_locally_without_an_api_key()
+    test_a_local_whisper_failure_goes_straight_to_typed_input()
+    print("✅ Streaming STT tests passed")
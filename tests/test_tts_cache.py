@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the TTS phrase cache and the deploy-time pre-render
+"""
+
+import os
+import tempfile
+
+from config import ELEVENLABS_OUTPUT_FORMAT
+from enhanced_ai_assistant import STATIC_RESPONSES, HOURS_RESPONSE
+from prerender_tts import prerender
+from tts_cache import PhraseCache, phrase_key
+from tts_pipeline import split_sentences
+
+VOICE = "21m00Tcm4TlvDq8ikWAM"
+MODEL = "eleven_multilingual_v2"
+
+
+class _FakeTTS:
+    def __init__(self):
+        self.requests = []
+
+    def convert(self, voice_id, text, model_id, output_format=None):
+        self.requests.append(text)
+        # ElevenLabs yields the audio in several chunks
+        yield b"audio:"
+        yield text.encode("utf-8")
+
+
+class _FakeElevenLabs:
+    def __init__(self):
+        self.text_to_speech = _FakeTTS()
+
+
+def test_key_depends_on_voice_model_and_text():
+    base = phrase_key(VOICE, MODEL, "Hello")
+    assert base == phrase_key(VOICE, MODEL, "  Hello ")
+    assert base != phrase_key("other-voice", MODEL, "Hello")
+    assert base != phrase_key(VOICE, "other-model", "Hello")
+    assert base != phrase_key(VOICE, MODEL, "Hello!")
+
+
+def test_memory_lru_is_backed_by_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PhraseCache(directory=tmp, max_items=2, persistent=["one", "two", "three"])
+        cache.put(VOICE, MODEL, "one", b"1")
+        cache.put(VOICE, MODEL, "two", b"2")
+        cache.put(VOICE, MODEL, "three", b"3")
+
+        assert len(cache._memory) == 2
+        # Evicted from memory but still on disk
+        assert cache.get(VOICE, MODEL, "one") == b"1"
+
+        # A fresh process sees the same entries
+        assert PhraseCache(directory=tmp, persistent=["three"]).get(VOICE, MODEL, "three") == b"3"
+        assert cache.get(VOICE, MODEL, "four") is None
+
+
+def test_only_the_fixed_replies_are_written_to_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "tts")
+        cache = PhraseCache(directory=directory, persistent=STATIC_RESPONSES)
+        booked = "Your appointment is confirmed for Friday at 9 AM, Jane Doe."
+        cache.put(VOICE, MODEL, booked, b"dynamic")
+        assert cache.get(VOICE, MODEL, booked) == b"dynamic"
+        assert not os.path.exists(directory)
+
+        (hours, *_) = split_sentences(HOURS_RESPONSE)
+        cache.put(VOICE, MODEL, hours, b"static")
+        assert os.listdir(directory) == [f"{phrase_key(VOICE, MODEL, hours)}.bin"]
+
+        # A cache that was not told about the fixed replies keeps nothing on disk
+        PhraseCache(directory=directory).put(VOICE, MODEL, "Thank you for calling.", b"static")
+        assert len(os.listdir(directory)) == 1
+
+        # The next process only finds the fixed reply
+        fresh = PhraseCache(directory=directory, persistent=STATIC_RESPONSES)
+        assert fresh.get(VOICE, MODEL, hours) == b"static"
+        assert fresh.get(VOICE, MODEL, booked) is None
+        assert not fresh.contains(VOICE, MODEL, booked)
+
+
+def test_get_or_render_only_pays_once():
+    client = _FakeElevenLabs()
+    cache = PhraseCache(directory=None)
+
+    for _ in range(3):
+        audio = cache.get_or_render(
+            VOICE, MODEL, HOURS_RESPONSE,
+            lambda: client.text_to_speech.convert(voice_id=VOICE, text=HOURS_RESPONSE, model_id=MODEL)
+        )
+        assert audio == b"audio:" + HOURS_RESPONSE.encode("utf-8")
+
+    assert client.text_to_speech.requests == [HOURS_RESPONSE]
+
+
+def test_prerender_warms_every_static_response():
+    sentences = {sentence for text in STATIC_RESPONSES for sentence in split_sentences(text)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = _FakeElevenLabs()
+        cache = PhraseCache(directory=tmp)
+
+        rendered, skipped = prerender(client, cache, VOICE, MODEL)
+        assert rendered == len(sentences)
+        assert skipped == 0
+
+        # Second deploy is a no-op
+        assert prerender(client, cache, VOICE, MODEL) == (0, len(sentences))
+        assert len(client.text_to_speech.requests) == len(sentences)
+
+        fresh = PhraseCache(directory=tmp, persistent=STATIC_RESPONSES)
+        for text in sentences:
+            assert fresh.get(VOICE, MODEL, text, ELEVENLABS_OUTPUT_FORMAT) is not None
+
+
+if __name__ == "__main__":
+    test_key_depends_on_voice_model_and_text()
+    test_memory_lru_is_backed_by_disk()
+    test_only_the_fixed_replies_are_written_to_disk()
+    test_get_or_render_only_pays_once()
+    test_prerender_warms_every_static_response()
+    print("✅ TTS cache tests passed")
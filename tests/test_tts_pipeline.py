@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test sentence-level pipelined TTS with a fake synthesizer
+"""
+
+import time
+
+import numpy as np
+
+from audio_playback import StreamingPlayer
+from tts_pipeline import SentenceChunker, SentencePipeline, split_sentences
+from test_audio_playback import FakeOutputStream
+
+SAMPLE_RATE = 16000
+
+
+def test_split_sentences():
+    summary = ("Perfect! I'll send a confirmation to (407) 555-1234. Your appointment summary:\n\n"
+               "Patient: Sam\nDate: Monday\nTime: 10:30 AM\nReason: back pain\n\n"
+               "Please arrive 15 minutes early. Is there anything else I can help you with?")
+    assert split_sentences(summary) == [
+        "Perfect!",
+        "I'll send a confirmation to (407) 555-1234.",
+        "Your appointment summary:",
+        "Patient: Sam",
+        "Date: Monday",
+        "Time: 10:30 AM",
+        "Reason: back pain",
+        "Please arrive 15 minutes early.",
+        "Is there anything else I can help you with?",
+    ]
+    assert split_sentences("You'll see Dr. Smith on Monday. Anything else?") == [
+        "You'll see Dr. Smith on Monday.",
+        "Anything else?",
+    ]
+    assert split_sentences("   ") == []
+
+
+def test_chunker_cuts_streamed_tokens_like_split_sentences():
+    text = "Sure. You'll see Dr. Smith on Monday at 10.30 AM!  Anything else?\nBye"
+    for size in (1, 3, 7):
+        chunker = SentenceChunker()
+        sentences = []
+        for start in range(0, len(text), size):
+            sentences += chunker.feed(text[start:start + size])
+        assert sentences + chunker.flush() == split_sentences(text)
+
+    # A sentence is released as soon as the break after it arrives
+    chunker = SentenceChunker()
+    assert chunker.feed("Sure. You'll") == ["Sure."]
+    assert chunker.feed(" see Dr. Smith") == []
+    assert chunker.flush() == ["You'll see Dr. Smith"]
+
+
+def test_audio_starts_after_first_sentence_and_has_no_gaps():
+    synth_seconds = 0.1
+    sentence_audio = 0.4  # seconds of speech per sentence
+    synthesized = []
+
+    def synthesize(sentence):
+        time.sleep(synth_seconds)
+        synthesized.append((sentence, time.perf_counter()))
+        # Non-zero tone so gaps would show up as zeros in the output
+        yield np.full(int(sentence_audio * SAMPLE_RATE), 0.25, dtype=np.float32)
+
+    streams = []
+
+    def factory(**kwargs):
+        streams.append(FakeOutputStream(**kwargs))
+        return streams[-1]
+
+    player = StreamingPlayer(SAMPLE_RATE, buffer_seconds=0.2, stream_factory=factory)
+    sentences = ["One.", "Two.", "Three.", "Four."]
+
+    started = time.perf_counter()
+    spoken = SentencePipeline(synthesize, player).speak(sentences)
+
+    assert spoken == 4
+    assert [sentence for sentence, _ in synthesized] == sentences
+
+    # Audio starts after one sentence's synthesis, not all four
+    time_to_first_audio = player.first_audio_at - started
+    assert time_to_first_audio < 2 * synth_seconds
+
+    # Later sentences were synthesized while earlier ones were playing
+    assert synthesized[1][1] < player.first_audio_at + 2 * synth_seconds
+
+    played = np.concatenate(streams[0].played)
+    voiced = np.flatnonzero(played)
+    assert len(voiced) == int(sentence_audio * SAMPLE_RATE) * len(sentences)
+    # Contiguous: no silence between sentences
+    assert voiced[-1] - voiced[0] + 1 == len(voiced)
+
+
+def test_synthesis_error_stops_playback():
+    def synthesize(sentence):
+        if sentence == "Bad.":
+            raise RuntimeError("quota exceeded")
+        yield np.full(1600, 0.1, dtype=np.float32)
+
+    player = StreamingPlayer(SAMPLE_RATE, stream_factory=lambda **kwargs: FakeOutputStream(**kwargs))
+    pipeline = SentencePipeline(synthesize, player)
+
+    try:
+        pipeline.speak(["Good.", "Bad.", "Never."])
+    except RuntimeError as e:
+        assert "quota" in str(e)
+    else:
+        raise AssertionError("expected the synthesis error to propagate")
+    assert pipeline.spoken == 1
+
+
+class _IdleLocalTTS:
+    def warm_up(self):
+        pass
+
+
+def test_voice_handler_hands_every_unplayed_sentence_to_the_fallback():
+    import voice_handler_simple
+
+    def synthesize(sentence):
+        if sentence == "Two.":
+            raise RuntimeError("quota exceeded")
+        yield np.full(1600, 0.1, dtype=np.float32)
+
+    handler = voice_handler_simple.VoiceHandler(use_elevenlabs=False, local_tts=_IdleLocalTTS())
+    fallback = []
+    original = voice_handler_simple.StreamingPlayer
+    voice_handler_simple.StreamingPlayer = lambda rate, device=None: original(
+        rate, device, stream_factory=lambda **kwargs: FakeOutputStream(**kwargs))
+    try:
+        # "One." plays, then "Two." fails with "Three." possibly pulled ahead of it
+        handler._speak_or_fall_back(synthesize, SAMPLE_RATE, iter(["One.", "Two.", "Three."]),
+                                    "test", lambda unheard: fallback.append(unheard) or True)
+    finally:
+        voice_handler_simple.StreamingPlayer = original
+    assert fallback == [["Two.", "Three."]]
+
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_chunker_cuts_streamed_tokens_like_split_sentences()
+    test_audio_starts_after_first_sentence_and_has_no_gaps()
+    test_synthesis_error_stops_playback()
+    test_voice_handler_hands_every_unplayed_sentence_to_the_fallback()
+    print("✅ TTS pipeline tests passed")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Offline harness for the energy-based endpointer.
+
+Writes WAV fixtures (speech-like bursts over background noise) and replays
+them through the same chunked path the microphone callback uses.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from voice_activity import EnergyEndpointer, endpoint_wav
+
+SAMPLE_RATE = 16000
+
+
+def _noise(seconds, level=60.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, level, int(seconds * SAMPLE_RATE))
+
+
+def _speech(seconds, level=4000.0):
+    """Voiced-sounding burst: a few harmonics with a syllable-rate envelope"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate([140, 280, 420, 700]))
+    envelope = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 4 * t))
+    return level * voice * envelope / 2
+
+
+def _write_fixture(directory, name, *parts):
+    audio = np.concatenate(parts)
+    audio = audio + _noise(len(audio) / SAMPLE_RATE, seed=len(name))
+    path = os.path.join(directory, name)
+    sf.write(path, np.clip(audio, -32768, 32767).astype(np.int16), SAMPLE_RATE, subtype='PCM_16')
+    return path
+
+
+def test_short_answer_ends_turn_early():
+    with tempfile.TemporaryDirectory() as tmp:
+        # "Monday" - under a second of speech inside a 5 second window
+        path = _write_fixture(tmp, "monday.wav", _noise(0.4), _speech(0.7), _noise(3.9))
+        report = endpoint_wav(path, trailing_silence=0.8)
+
+    assert report["speech_detected"]
+    assert report["stopped_early"]
+    # 0.4s lead-in + 0.7s speech + 0.8s trailing silence, plus a chunk of slack
+    assert 1.8 <= report["stopped_at"] <= 2.1, report
+
+
+def test_silence_only_is_not_speech():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_fixture(tmp, "silence.wav", _noise(5.0))
+        report = endpoint_wav(path)
+
+    assert not report["speech_detected"]
+    assert not report["stopped_early"]
+
+
+def test_pause_shorter_than_trailing_silence_keeps_listening():
+    with tempfile.TemporaryDirectory() as tmp:
+        # "Monday ... at ten thirty" with a 0.5s hesitation in the middle
+        path = _write_fixture(tmp, "pause.wav", _speech(0.6), _noise(0.5), _speech(0.8), _noise(2.0))
+        report = endpoint_wav(path, trailing_silence=0.8)
+
+    assert report["stopped_early"]
+    assert report["stopped_at"] > 0.6 + 0.5 + 0.8
+
+
+def test_speech_from_first_frame_is_detected():
+    endpointer = EnergyEndpointer(sample_rate=SAMPLE_RATE, trailing_silence=0.3)
+    audio = np.concatenate((_speech(0.5), np.zeros(int(0.5 * SAMPLE_RATE)))).astype(np.int16)
+
+    # Odd chunk sizes exercise the frame remainder handling
+    ended = False
+    for start in range(0, len(audio), 777):
+        ended = endpointer.process(audio[start:start + 777])
+        if ended:
+            break
+
+    assert endpointer.speech_detected
+    assert ended
+
+
+def replay_fixture_directory(directory=None):
+    """Replay every WAV in `directory` (or a generated set) and print the result"""
+    with tempfile.TemporaryDirectory() as tmp:
+        if directory is None:
+            _write_fixture(tmp, "monday.wav", _noise(0.4), _speech(0.7), _noise(3.9))
+            _write_fixture(tmp, "silence.wav", _noise(5.0))
+            directory = tmp
+
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(".wav"):
+                report = endpoint_wav(os.path.join(directory, name))
+                print(f"{name}: {report}")
+
+
+if __name__ == "__main__":
+    replay_fixture_directory(sys.argv[1] if len(sys.argv) > 1 else None)
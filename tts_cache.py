@@ -0,0 +1,147 @@
+"""
+Content-addressed cache for synthesized speech
+
+Most replies are fixed strings (hours, location, goodbye, ...), so the
+audio for a given (voice_id, model, text) only needs to be bought from
+ElevenLabs once. Recent phrases live in an in-memory LRU. The fixed replies,
+which the voice handler and `prerender_tts.py` pass to `persist`, are also
+kept on disk, where the pre-render puts them at deploy time. Every other sentence (confirmations, LLM answers) can carry a
+patient's name, phone number or appointment, so it is never written to disk
+and only lives in memory for the length of the process.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional
+
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_ITEMS
+from metrics import metrics
+from tts_pipeline import split_sentences
+
+
+def phrase_key(voice_id: str, model_id: str, text: str, output_format: Optional[str] = None) -> str:
+    """Stable cache key for a phrase rendered with a given voice, model and audio format"""
+    material = "\x00".join((voice_id or "", model_id or "", output_format or "", text.strip()))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """Only the sentences of `persistent` replies, or of replies passed to `persist`, are written to `directory`"""
+
+    def __init__(self, directory: Optional[str] = TTS_CACHE_DIR, max_items: int = TTS_CACHE_MAX_ITEMS,
+                 persistent: Iterable[str] = ()):
+        self.directory = directory
+        self.max_items = max_items
+        self.persistent = frozenset()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.persist(persistent)
+
+    def persist(self, replies: Iterable[str]):
+        """Keep these fixed replies on disk too, one sentence at a time as they are synthesized"""
+        sentences = {sentence.strip() for reply in replies for sentence in split_sentences(reply)}
+        with self._lock:
+            self.persistent = self.persistent | sentences
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _on_disk(self, text: str) -> bool:
+        return bool(self.directory) and text.strip() in self.persistent
+
+    def _remember(self, key: str, audio: bytes):
+        with self._lock:
+            self._memory[key] = audio
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, voice_id: str, model_id: str, text: str, output_format: Optional[str] = None) -> Optional[bytes]:
+        """Return cached audio bytes or None"""
+        key = phrase_key(voice_id, model_id, text, output_format)
+
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+        if audio is not None:
+            metrics.increment("tts_cache.memory_hits")
+            return audio
+
+        if self._on_disk(text):
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+            except FileNotFoundError:
+                audio = None
+            if audio:
+                self._remember(key, audio)
+                metrics.increment("tts_cache.disk_hits")
+                return audio
+
+        metrics.increment("tts_cache.misses")
+        return None
+
+    def put(self, voice_id: str, model_id: str, text: str, audio: bytes, output_format: Optional[str] = None):
+        """Store audio bytes in memory, and on disk if `text` is one of the persistent sentences"""
+        key = phrase_key(voice_id, model_id, text, output_format)
+        self._remember(key, audio)
+
+        if self._on_disk(text):
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a crash never leaves a truncated entry behind
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, self._path(key))
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def contains(self, voice_id: str, model_id: str, text: str, output_format: Optional[str] = None) -> bool:
+        key = phrase_key(voice_id, model_id, text, output_format)
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._on_disk(text) and os.path.exists(self._path(key))
+
+    def stream_or_render(self, voice_id: str, model_id: str, text: str,
+                         render: Callable[[], Iterable[bytes]],
+                         output_format: Optional[str] = None) -> Iterator[bytes]:
+        """Yield cached audio, or pass rendered chunks through as they arrive and cache them"""
+        audio = self.get(voice_id, model_id, text, output_format)
+        if audio is not None:
+            yield audio
+            return
+
+        parts = []
+        for chunk in render():
+            parts.append(chunk)
+            yield chunk
+        self.put(voice_id, model_id, text, b"".join(parts), output_format)
+
+    def get_or_render(self, voice_id: str, model_id: str, text: str,
+                      render: Callable[[], Iterable[bytes]],
+                      output_format: Optional[str] = None) -> bytes:
+        """Return cached audio, calling `render` and caching the result on a miss"""
+        with metrics.timer("tts_cache.get_or_render_time"):
+            return b"".join(self.stream_or_render(voice_id, model_id, text, render, output_format))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_phrase_cache() -> PhraseCache:
+    """Return the cache shared by every voice handler in the process"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PhraseCache()
+    return _cache
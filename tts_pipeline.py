@@ -0,0 +1,153 @@
+"""
+Sentence-level pipelined text-to-speech
+
+A reply is split into sentences. A worker thread synthesizes sentence N+1
+while sentence N is playing, and every sentence is written into the same
+output stream so they play back to back without gaps. The caller hears
+audio after roughly one sentence's synthesis time instead of the whole
+reply's.
+"""
+
+import queue
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from audio_playback import StreamingPlayer
+
+# Abbreviations that end in a period without ending the sentence
+_ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "st", "jr", "sr", "vs", "etc", "e.g", "i.e"}
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+class SentenceChunker:
+    """Cuts text that arrives a few tokens at a time into sentences.
+
+    `feed` returns the sentences completed by the new text; `flush` returns
+    whatever is left once the text has ended. Fed all at once, the result
+    is the same as `split_sentences`.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pending = ""
+
+    def _add_piece(self, piece: str) -> Optional[str]:
+        piece = piece.strip()
+        if not piece:
+            return None
+
+        self._pending = f"{self._pending} {piece}" if self._pending else piece
+        last_word = self._pending.rsplit(None, 1)[-1].rstrip('.').lower()
+        if self._pending.endswith('.') and last_word in _ABBREVIATIONS:
+            return None  # "Dr. Smith" - keep going
+
+        sentence, self._pending = self._pending, ""
+        return sentence
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        while True:
+            match = _SENTENCE_BREAK.search(self._buffer)
+            if match is None:
+                return sentences
+            sentence = self._add_piece(self._buffer[:match.start()])
+            self._buffer = self._buffer[match.end():]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> List[str]:
+        sentences = []
+        sentence = self._add_piece(self._buffer)
+        self._buffer = ""
+        if sentence:
+            sentences.append(sentence)
+        if self._pending:
+            sentences.append(self._pending)
+            self._pending = ""
+        return sentences
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a reply into sentences suitable for synthesizing one at a time"""
+    chunker = SentenceChunker()
+    return chunker.feed(text) + chunker.flush()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+_END_OF_SENTENCE = object()
+_DONE = object()
+
+
+class SentencePipeline:
+    """Overlaps synthesis of the next sentence with playback of the current one.
+
+    `synthesize(sentence)` must return an iterable of float32 sample arrays
+    at the player's sample rate; chunks are played as soon as they arrive.
+    """
+
+    def __init__(self, synthesize: Callable[[str], Iterable["np.ndarray"]],
+                 player: "StreamingPlayer", lookahead: int = 1):
+        self.synthesize = synthesize
+        self.player = player
+        self.lookahead = lookahead
+        self.spoken = 0  # sentences written to the player so far; still valid if `speak` raises
+
+    def speak(self, sentences: Iterable[str],
+              on_audio: Optional[Callable[["np.ndarray"], None]] = None) -> int:
+        """Synthesize and play sentences in order; returns how many were spoken"""
+        chunks = queue.Queue()
+        # The worker may run at most `lookahead` sentences ahead of playback
+        slots = threading.Semaphore(self.lookahead + 1)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for sentence in sentences:
+                    slots.acquire()
+                    if stop.is_set():
+                        break
+                    for samples in self.synthesize(sentence):
+                        if stop.is_set():
+                            break
+                        chunks.put(samples)
+                    chunks.put(_END_OF_SENTENCE)
+            except Exception as e:
+                chunks.put(_Failure(e))
+            finally:
+                chunks.put(_DONE)
+
+        worker = threading.Thread(target=produce, name="tts-pipeline", daemon=True)
+        self.spoken = 0
+
+        try:
+            with self.player:
+                worker.start()
+                while True:
+                    item = chunks.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, _Failure):
+                        raise item.error
+                    if item is _END_OF_SENTENCE:
+                        self.spoken += 1
+                        slots.release()
+                        continue
+
+                    self.player.write(item)
+                    if on_audio is not None:
+                        on_audio(item)
+        finally:
+            # Unblock the worker if playback stopped early
+            stop.set()
+            slots.release()
+
+        return self.spoken
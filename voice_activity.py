@@ -0,0 +1,165 @@
+"""
+Energy-based voice activity detection for ending a listening turn early
+"""
+
+from typing import Optional
+import numpy as np
+
+from config import (
+    SAMPLE_RATE,
+    VAD_FRAME_MS,
+    VAD_ENERGY_THRESHOLD,
+    VAD_NOISE_MULTIPLIER,
+    VAD_MIN_SPEECH_MS,
+    VAD_TRAILING_SILENCE,
+)
+
+
+class EnergyEndpointer:
+    """Tracks speech/silence over int16 audio chunks and decides when a turn is over.
+
+    Chunks are split into fixed-size frames and each frame is classified as
+    speech when its RMS energy is above both a fixed floor and a multiple of
+    the running noise estimate. Once enough speech has been heard, the turn
+    ends after `trailing_silence` seconds without speech.
+    """
+
+    def __init__(self,
+                 sample_rate: int = SAMPLE_RATE,
+                 frame_ms: int = VAD_FRAME_MS,
+                 energy_threshold: float = VAD_ENERGY_THRESHOLD,
+                 noise_multiplier: float = VAD_NOISE_MULTIPLIER,
+                 min_speech_ms: int = VAD_MIN_SPEECH_MS,
+                 trailing_silence: float = VAD_TRAILING_SILENCE):
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.energy_threshold = energy_threshold
+        self.noise_multiplier = noise_multiplier
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.trailing_silence_frames = max(1, int(trailing_silence * 1000 / frame_ms))
+        self.reset()
+
+    def reset(self):
+        """Clear all state so the endpointer can be reused for a new turn"""
+        self.noise_floor = None
+        self.speech_frames = 0
+        self.silence_run = 0
+        self.frames_seen = 0
+        self.speech_started_at = None
+        self.done = False
+        # Samples left over from the previous chunk that did not fill a frame
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    @property
+    def speech_detected(self) -> bool:
+        """True once enough voiced frames have been seen to count as speech"""
+        return self.speech_frames >= self.min_speech_frames
+
+    def process(self, chunk: np.ndarray) -> bool:
+        """Feed one chunk of int16 audio; returns True when the turn should end"""
+        if self.done:
+            return True
+
+        samples = np.asarray(chunk)
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        samples = samples.astype(np.float32)
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+
+        n_frames = samples.size // self.frame_size
+        self._remainder = samples[n_frames * self.frame_size:]
+        if n_frames == 0:
+            return False
+
+        frames = samples[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        energies = np.sqrt(np.mean(frames * frames, axis=1))
+
+        for energy in energies:
+            self._process_frame(float(energy))
+            if self.done:
+                break
+
+        return self.done
+
+    def _process_frame(self, energy: float):
+        """Classify one frame and update the endpointing state"""
+        self.frames_seen += 1
+
+        if self.noise_floor is None:
+            # Don't let a caller who starts talking immediately poison the estimate
+            self.noise_floor = min(energy, self.energy_threshold / self.noise_multiplier)
+
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_multiplier)
+        if energy >= threshold:
+            self.speech_frames += 1
+            self.silence_run = 0
+            if self.speech_started_at is None:
+                self.speech_started_at = self.frames_seen
+        else:
+            self.silence_run += 1
+            # Only adapt the noise estimate on non-speech frames
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+
+        if self.speech_detected and self.silence_run >= self.trailing_silence_frames:
+            self.done = True
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds of audio processed so far"""
+        return self.frames_seen * self.frame_size / self.sample_rate
+
+
+def endpoint_audio(audio: np.ndarray, sample_rate: int, chunk_size: int = 1024,
+                   endpointer: Optional[EnergyEndpointer] = None) -> dict:
+    """Run the endpointer over a full clip in callback-sized chunks.
+
+    Mirrors how `sd.InputStream` hands blocks to the recording callback, so
+    recorded fixtures can be replayed offline.
+    """
+    if endpointer is None:
+        endpointer = EnergyEndpointer(sample_rate=sample_rate)
+
+    if audio.dtype != np.int16:
+        # soundfile gives float in [-1, 1]; scale to match the microphone stream
+        audio = np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+
+    stopped_at = None
+    for start in range(0, len(audio), chunk_size):
+        if endpointer.process(audio[start:start + chunk_size]):
+            stopped_at = min(start + chunk_size, len(audio)) / sample_rate
+            break
+
+    return {
+        "speech_detected": endpointer.speech_detected,
+        "stopped_early": stopped_at is not None,
+        "stopped_at": stopped_at,
+        "duration": len(audio) / sample_rate,
+    }
+
+
+def endpoint_wav(path: str, chunk_size: int = 1024, **vad_kwargs) -> dict:
+    """Replay a recorded WAV file through the endpointer"""
+    import soundfile as sf
+
+    audio, sample_rate = sf.read(path, dtype='int16')
+    endpointer = EnergyEndpointer(sample_rate=sample_rate, **vad_kwargs)
+    result = endpoint_audio(audio, sample_rate, chunk_size, endpointer)
+    result["path"] = path
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python voice_activity.py <file.wav> [more.wav ...]")
+        sys.exit(1)
+
+    for wav_path in sys.argv[1:]:
+        report = endpoint_wav(wav_path)
+        status = "speech" if report["speech_detected"] else "no speech"
+        if report["stopped_early"]:
+            print(f"{wav_path}: {status}, turn ended at {report['stopped_at']:.2f}s of {report['duration']:.2f}s")
+        else:
+            print(f"{wav_path}: {status}, ran full {report['duration']:.2f}s")
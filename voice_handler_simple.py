@@ -1,19 +1,26 @@
-import os
 import time
-import tempfile
-import sounddevice as sd
-import soundfile as sf
 import numpy as np
-import openai
 import threading
-from elevenlabs import ElevenLabs
 import queue
-import pyttsx3
 from typing import Optional
+from api_clients import get_client_registry
+from config import VAD_ENABLED, LOCAL_WHISPER_MODEL, ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, ELEVENLABS_OUTPUT_FORMAT
+from voice_activity import EnergyEndpointer
+from streaming_stt import StreamingTranscriber, WhisperAPIRecognizer, LocalWhisperRecognizer
+from tts_cache import get_phrase_cache
+from enhanced_ai_assistant import STATIC_RESPONSES
+from audio_playback import StreamingPlayer, PCM16Decoder
+from tts_pipeline import SentencePipeline, split_sentences
+from resampler import PolyphaseResampler
+from call_recorder import CallRecorder, CALLER, ASSISTANT
+from entity_extractor import normalize_times
+from local_tts import LocalTTSError, get_local_tts
+from metrics import metrics
 
 def get_mac_audio_devices():
     """Get Mac mic and speakers device IDs"""
     try:
+        import sounddevice as sd
         devices = sd.query_devices()
         mac_mic = None
         mac_speakers = None
@@ -31,13 +38,10 @@ def get_mac_audio_devices():
         return None, None
 
 class VoiceHandler:
-    def __init__(self, use_elevenlabs=True):
+    def __init__(self, use_elevenlabs=True, local_tts=None):
         """Initialize voice handler with option to use ElevenLabs or fallback"""
         self.use_elevenlabs = use_elevenlabs
         
-        # Get available audio devices
-        devices = get_mac_audio_devices()
-        
         # Set up Mac microphone and speakers
         self.input_device = 2  # MacBook Pro Microphone
         self.output_device = 3  # MacBook Pro Speakers
@@ -48,61 +52,51 @@ class VoiceHandler:
         # Initialize ElevenLabs client if enabled
         if self.use_elevenlabs:
             try:
-                self.elevenlabs_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
-                self.voice_id = "21m00Tcm4TlvDq8ikWAM"  # Jessica voice
+                self.elevenlabs_client = get_client_registry().elevenlabs()
+                self.voice_id = ELEVENLABS_VOICE_ID  # Jessica voice
+                self.tts_model_id = ELEVENLABS_MODEL_ID
+                self.tts_output_format = ELEVENLABS_OUTPUT_FORMAT
+                self.tts_sample_rate = int(ELEVENLABS_OUTPUT_FORMAT.split("_")[1])
+                self.phrase_cache = get_phrase_cache()
                 print("ElevenLabs client initialized successfully")
             except Exception as e:
                 print(f"Failed to initialize ElevenLabs: {e}")
-                print("Falling back to macOS speech synthesis")
+                print("Falling back to local speech synthesis")
                 self.use_elevenlabs = False
         else:
-            print("Using macOS speech synthesis (ElevenLabs disabled)")
+            print("Using local speech synthesis (ElevenLabs disabled)")
+        
+        # Fixed replies are kept on disk by the phrase cache; nothing else is
+        get_phrase_cache().persist(STATIC_RESPONSES)
+        
+        # Resident local TTS worker; warmed now when it speaks every reply, on first use otherwise
+        self.local_tts = local_tts or get_local_tts()
+        if not self.use_elevenlabs:
+            self.local_tts.warm_up()
         
         # Recording state
         self.recording_active = False
         self.stop_recording = threading.Event()
+        self.use_vad = VAD_ENABLED
         
-        # Call recording
-        self.call_recording_active = False
-        self.call_audio_segments = []
-        self.call_start_time = None
+        # Call recording (created on start, once the final sample rate is known)
+        self.call_recorder = None
         
-        # Create recordings directory if it doesn't exist
-        os.makedirs("recordings", exist_ok=True)
+        # Set up audio device parameters
+        self.sample_rate = 44100
+        self.channels = 1
         
-        try:
-            # Initialize text-to-speech engine
-            self.engine = pyttsx3.init()
-            
-            # Configure voice settings
-            voices = self.engine.getProperty('voices')
-            
-            # Try to find female voice on macOS (usually Samantha)
-            for voice in voices:
-                if "samantha" in voice.name.lower():
-                    self.engine.setProperty('voice', voice.id)
-                    print(f"Using voice: {voice.name}")
-                    break
-            
-            # Configure speech properties
-            self.engine.setProperty('rate', 150)    # Speed - not too fast
-            self.engine.setProperty('volume', 1.0)  # Full volume
-            
-            # Set up audio device parameters
-            self.sample_rate = 44100
-            self.channels = 1
-            
-            print("Voice handler initialized successfully with pyttsx3")
-            
-        except Exception as e:
-            print(f"Error initializing voice handler: {e}")
-            raise
+        print("Voice handler initialized")
+
+    @property
+    def call_recording_active(self):
+        return self.call_recorder is not None and self.call_recorder.active
 
     def start_call_recording(self):
         """Start recording the entire call"""
-        self.call_recording_active = True
-        self.call_audio_segments = []
-        self.call_start_time = time.time()
+        if self.call_recorder is None:
+            self.call_recorder = CallRecorder(self.sample_rate)
+        self.call_recorder.start()
         print("🎙️ Call recording started...")
 
     def stop_call_recording(self):
@@ -110,134 +104,137 @@ class VoiceHandler:
         if not self.call_recording_active:
             return
         
-        self.call_recording_active = False
-        
-        if not self.call_audio_segments:
-            print("No call audio to save.")
-            return
-        
         try:
-            # Combine all audio segments
-            combined_audio = np.concatenate(self.call_audio_segments)
-            
-            # Generate timestamp for filename
-            timestamp = int(self.call_start_time)
-            call_duration = int(time.time() - self.call_start_time)
+            # Audio is already on disk; this only closes and renames the file
+            call_filename = self.call_recorder.stop()
             
-            # Save the complete call recording
-            call_filename = f"recordings/complete_call_{timestamp}_{call_duration}s.wav"
-            sf.write(call_filename, combined_audio, self.sample_rate)
+            if call_filename is None:
+                print("No call audio to save.")
+                return
             
             print(f"🎙️ Complete call saved: {call_filename}")
-            print(f"📊 Call duration: {call_duration} seconds")
-            
-            # Clear the segments to free memory
-            self.call_audio_segments = []
+            print(f"📊 Call duration: {int(time.time() - self.call_recorder.started_at)} seconds")
             
         except Exception as e:
             print(f"Error saving call recording: {e}")
 
-    def add_to_call_recording(self, audio_data):
-        """Add audio segment to the call recording"""
+    def add_to_call_recording(self, audio_data, track=CALLER):
+        """Add audio segment to the caller or assistant track of the call recording"""
         if self.call_recording_active and audio_data is not None:
-            # Ensure audio data is 1D
-            if len(audio_data.shape) > 1:
-                audio_data = np.mean(audio_data, axis=1)
-            self.call_audio_segments.append(audio_data)
+            self.call_recorder.write(audio_data, track)
 
     def text_to_speech(self, text):
-        """Convert text to speech using ElevenLabs with Jessica voice, with fallback to macOS speech"""
+        """Convert text to speech using ElevenLabs with Jessica voice, with fallback to local speech"""
+        return self.speak_sentences(split_sentences(text))
+
+    def speak_sentences(self, sentences):
+        """Speak sentences as they arrive, e.g. straight from a streaming LLM reply"""
+        sentences = iter(sentences)
         if not self.use_elevenlabs:
-            return self._fallback_text_to_speech(text)
+            return self._fallback_text_to_speech(sentences)
+        
+        print("Converting text to speech using ElevenLabs Jessica...")
+        return self._speak_or_fall_back(
+            self._synthesize_sentence, self.tts_sample_rate, sentences,
+            "ElevenLabs", self._fallback_text_to_speech
+        )
+
+    def _speak_or_fall_back(self, synthesize, tts_sample_rate, sentences, engine, fallback):
+        """Play sentences through one output stream; if synthesis fails, hand what is left to `fallback`"""
+        # Sentences are pulled from the synthesis thread; the lock lets the
+        # fallback below take over the rest of them safely
+        pulled = []
+        pull_lock = threading.Lock()
+        
+        def pull():
+            while True:
+                with pull_lock:
+                    sentence = next(sentences, None)
+                    if sentence is None:
+                        return
+                    pulled.append(sentence)
+                yield sentence
         
+        player = StreamingPlayer(tts_sample_rate, device=self.output_device)
+        # Synthesize the next sentence while the current one plays, all
+        # through one output stream so there are no gaps between sentences
+        pipeline = SentencePipeline(synthesize, player)
         try:
-            print("Converting text to speech using ElevenLabs Jessica...")
-            
-            # Generate audio from text using ElevenLabs
-            audio_generator = self.elevenlabs_client.text_to_speech.convert(
-                voice_id=self.voice_id,
-                text=text
-            )
-            audio_bytes = b"".join(audio_generator)
+            started = time.perf_counter()
             
-            # Save audio to a temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            temp_file_path = temp_file.name
-            temp_file.write(audio_bytes)
-            temp_file.close()
-            
-            # Load the audio data
-            data, samplerate = sf.read(temp_file_path)
-            if len(data.shape) > 1:
-                data = np.mean(data, axis=1)
-            
-            # ElevenLabs generates at 44.1kHz, ensure we play at the correct rate
-            print(f"ElevenLabs audio: {samplerate} Hz, {len(data)} samples")
-            
-            # Ensure data is float32 for proper playback
-            if data.dtype != np.float32:
-                data = data.astype(np.float32)
-            
-            # Add to call recording if active (resample to 16kHz for consistency)
+            # Resample to the call recording rate as each chunk is played
+            call_resampler = None
+            record_chunk = None
             if self.call_recording_active:
-                try:
-                    from scipy import signal
-                    # Resample to 16kHz for call recording
-                    resampled_data = signal.resample(data, int(len(data) * self.sample_rate / samplerate))
-                    self.add_to_call_recording(resampled_data)
-                except ImportError:
-                    print("Note: scipy not available, using original audio for call recording")
-                    self.add_to_call_recording(data)
+                call_resampler = PolyphaseResampler(tts_sample_rate, self.sample_rate)
+                
+                def record_chunk(samples):
+                    self.add_to_call_recording(call_resampler.process(samples), ASSISTANT)
             
-            # Play the audio at the original ElevenLabs sample rate (44.1kHz)
-            print(f"Playing audio at {samplerate} Hz sample rate...")
-            sd.play(data, samplerate, device=self.output_device)
-            sd.wait()
+            pipeline.speak(
+                pull(),
+                on_audio=record_chunk
+            )
             
-            # Clean up the temporary file
-            os.unlink(temp_file_path)
+            if call_resampler is not None:
+                self.add_to_call_recording(call_resampler.flush(), ASSISTANT)
+            
+            if player.first_audio_at is not None:
+                time_to_first_audio = player.first_audio_at - started
+                metrics.observe("tts.time_to_first_audio", time_to_first_audio)
+                print(f"Time to first audio: {time_to_first_audio * 1000:.0f} ms")
             
             print("Audio playback complete")
             return True
             
         except Exception as e:
-            print(f"Error in ElevenLabs text-to-speech: {e}")
-            print("Falling back to macOS speech synthesis...")
-            return self._fallback_text_to_speech(text)
+            print(f"Error in {engine} text-to-speech: {e}")
+            with pull_lock:
+                # The failed sentence and any synthesized ahead of it were never played in full
+                unheard = pulled[pipeline.spoken:] + list(sentences)
+            if not unheard:
+                return False
+            return fallback(unheard)
+
+    def _synthesize_sentence(self, sentence):
+        """Yield float32 samples for one sentence as they are decoded"""
+        decoder = PCM16Decoder()
+        for chunk in self._elevenlabs_audio_chunks(sentence):
+            samples = decoder.decode(chunk)
+            if samples.size:
+                yield samples
 
-    def _fallback_text_to_speech(self, text):
-        """Fallback text-to-speech using macOS built-in speech synthesis"""
+    def _elevenlabs_audio_chunks(self, text):
+        """Yield raw PCM chunks for `text`, from the phrase cache or streamed from ElevenLabs"""
+        return self.phrase_cache.stream_or_render(
+            self.voice_id, self.tts_model_id, text,
+            lambda: self.elevenlabs_client.text_to_speech.stream(
+                voice_id=self.voice_id,
+                text=text,
+                model_id=self.tts_model_id,
+                output_format=self.tts_output_format
+            ),
+            self.tts_output_format
+        )
+
+    def _fallback_text_to_speech(self, sentences):
+        """Speak through the resident local TTS worker, or the `say` command if no local engine starts"""
+        if isinstance(sentences, str):
+            sentences = split_sentences(sentences)
         try:
-            print("Using macOS speech synthesis...")
-            
-            # Use macOS say command for text-to-speech (simpler approach)
-            import subprocess
-            
-            # Use a simpler command that should work better
-            cmd = [
-                'say',
-                '-v', 'Samantha',  # Use a female voice similar to Jessica
-                '-r', '150',  # Slightly slower rate for clarity
-                text
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print("macOS speech playback complete")
-                return True
-            else:
-                print(f"macOS speech synthesis failed: {result.stderr}")
-                # Try an even simpler approach
-                return self._simple_fallback_speech(text)
-                
-        except Exception as e:
-            print(f"Error in macOS speech synthesis: {e}")
-            print("Trying simple fallback...")
-            return self._simple_fallback_speech(text)
+            self.local_tts.start()
+        except LocalTTSError as e:
+            print(f"Local speech synthesis unavailable: {e}")
+            return self._simple_fallback_speech(" ".join(sentences))
+        
+        print(f"Using local speech synthesis ({self.local_tts.backend_name})...")
+        return self._speak_or_fall_back(
+            self.local_tts.synthesize, self.local_tts.sample_rate, iter(sentences),
+            "local", lambda unheard: self._simple_fallback_speech(" ".join(unheard))
+        )
 
     def _simple_fallback_speech(self, text):
-        """Ultra-simple fallback using basic say command"""
+        """Last resort when no local engine can start: the macOS say command"""
         try:
             print("Using simple fallback speech...")
             import subprocess
@@ -254,74 +251,71 @@ class VoiceHandler:
 
     def speech_to_text(self, duration=8):
         """Enhanced speech to text with real speech recognition"""
-        # Initialize temp_filepath at the beginning
-        temp_filepath = None
+        transcriber = None
         
         try:
             print("Recording... Speak now.")
             self.recording_active = True
             self.stop_recording.clear()
             
+            # End the turn as soon as the caller stops talking
+            endpointer = EnergyEndpointer(sample_rate=self.sample_rate) if self.use_vad else None
+            
+            # Transcribe while the caller is still talking
+            recognizer = self._create_recognizer()
+            transcriber = StreamingTranscriber(
+                recognizer,
+                self.sample_rate,
+                on_partial=lambda text: print(f"Hearing: {text}")
+            ).start()
+            
             # Record audio with countdown
-            audio_data = self._record_with_countdown(duration)
+            audio_data = self._record_with_countdown(duration, endpointer, transcriber)
             
             if audio_data is None:  # Recording was interrupted
                 print("Recording was interrupted.")
+                transcriber.cancel()
                 return ""
             
             # Add to call recording if active
             self.add_to_call_recording(audio_data)
             
-            print("Recording complete. Processing...")
-            
-            # Save to temporary file for processing
-            try:
-                # Create a temporary file with a unique name
-                import uuid
-                temp_filename = f"temp_recording_{uuid.uuid4()}.wav"
-                temp_filepath = os.path.join(tempfile.gettempdir(), temp_filename)
-                sf.write(temp_filepath, audio_data, self.sample_rate)
-            except Exception as e:
-                print(f"Error saving recording: {e}")
+            # Nothing but silence - don't pay for a transcription
+            if endpointer is not None and not endpointer.speech_detected:
+                print("No speech detected. Please try again.")
+                transcriber.cancel()
                 return ""
             
-            # Process the audio file with OpenAI Whisper API
+            print("Recording complete. Processing...")
+            
+            # Collect the final hypothesis from the Whisper API, or from local Whisper without a client
             try:
-                # Initialize OpenAI client if not already done
-                if not hasattr(self, 'openai_client'):
-                    self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                
-                # Convert audio to text using OpenAI's Whisper
-                with open(temp_filepath, "rb") as audio_file:
-                    transcript = self.openai_client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file
-                    )
-                
-                transcription = transcript.text.strip()
+                transcription = transcriber.finish()
                 
                 if transcription:
-                    # Enhanced time format handling
-                    transcription = self._improve_time_recognition(transcription)
+                    # Spoken times ("one fifteen pm") become "1:15 PM"
+                    transcription = normalize_times(transcription)
                     return transcription
                 else:
                     print("No speech detected. Please try again.")
                     return ""
                     
             except Exception as e:
+                if isinstance(recognizer, LocalWhisperRecognizer):
+                    # Local Whisper already had this audio; running it again would fail the same way
+                    print(f"Error with local Whisper transcription: {e}")
+                    return self._typed_input()
+                
                 print(f"Error with OpenAI Whisper transcription: {e}")
                 print("Falling back to local Whisper...")
                 
-                # Fallback to local Whisper
+                # Fallback to local Whisper on the audio we already have in memory
                 try:
-                    import whisper
-                    model = whisper.load_model("base")
-                    result = model.transcribe(temp_filepath)
-                    transcription = result["text"].strip()
+                    transcription = LocalWhisperRecognizer(LOCAL_WHISPER_MODEL).transcribe(audio_data, self.sample_rate)
                     
                     if transcription:
-                        # Enhanced time format handling
-                        transcription = self._improve_time_recognition(transcription)
+                        # Spoken times ("one fifteen pm") become "1:15 PM"
+                        transcription = normalize_times(transcription)
                         return transcription
                     else:
                         print("No speech detected. Please try again.")
@@ -329,92 +323,69 @@ class VoiceHandler:
                         
                 except Exception as e2:
                     print(f"Error with local Whisper transcription: {e2}")
-                    print("Speech recognition failed. Falling back to manual input...")
-                    
-                    # Final fallback to manual input
-                    try:
-                        print("Please type what you want to say:")
-                        manual_input = input("> ").strip()
-                        if manual_input:
-                            return self._improve_time_recognition(manual_input)
-                        return ""
-                    except KeyboardInterrupt:
-                        print("\nInput cancelled.")
-                        return ""
+                    return self._typed_input()
             
         except KeyboardInterrupt:
             print("\nRecording interrupted by user.")
             self.recording_active = False
+            if transcriber is not None:
+                transcriber.cancel()
             return ""
         except Exception as e:
             print(f"Error during recording: {e}")
+            if transcriber is not None:
+                transcriber.cancel()
             return ""
         finally:
             self.recording_active = False
-            # Make sure we always try to clean up the temp file
-            if temp_filepath and os.path.exists(temp_filepath):
-                try:
-                    os.remove(temp_filepath)
-                except:
-                    pass  # Ignore errors during cleanup
 
-    def _improve_time_recognition(self, text):
-        """Improve time format recognition for better appointment scheduling"""
-        import re
-        
-        # Convert various time formats to standard format
-        text = text.lower().strip()
-        
-        # Normalize all possible delimiters to colon
-        text = re.sub(r'(\d{1,2})[\s\.-](\d{2})(:00)?\s*(am|pm)', r'\1:\2 \4', text, flags=re.IGNORECASE)
-        
-        # Remove any redundant :00 after a valid time (including multiple :00)
-        text = re.sub(r'(\d{1,2}:\d{2})(:00)+', r'\1', text)
-        
-        # Handle "11 a.m." -> "11:00 AM"
-        text = re.sub(r'(\d{1,2})\s*(a\.m\.|am|a\.m|p\.m\.|pm|p\.m)', r'\1:00 \2', text, flags=re.IGNORECASE)
-        
-        # Handle "115 pm" -> "1:15 PM" (single digit hour)
-        text = re.sub(r'^(\d{1})(\d{2})\s*(am|pm)', r'\1:\2 \3', text, flags=re.IGNORECASE)
-        # Handle "1115 pm" -> "11:15 PM" (double digit hour)
-        text = re.sub(r'^(\d{2})(\d{2})\s*(am|pm)', r'\1:\2 \3', text, flags=re.IGNORECASE)
-        
-        # Handle "one fifteen pm" -> "1:15 PM"
-        number_words = {
-            'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
-            'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
-            'eleven': '11', 'twelve': '12'
-        }
-        for word, num in number_words.items():
-            text = text.replace(f'{word} fifteen', f'{num}:15')
-            text = text.replace(f'{word} thirty', f'{num}:30')
-            text = text.replace(f'{word} forty five', f'{num}:45')
-            text = text.replace(f'{word} forty-five', f'{num}:45')
-        
-        # Remove any double colons (edge case)
-        text = re.sub(r':+', ':', text)
-        # Remove any trailing or leading colons or spaces
-        text = text.strip(' :')
-        
-        # Final cleanup: if still has ':00' at the end, remove it
-        text = re.sub(r'(\d{1,2}:\d{2}):00', r'\1', text)
-        
-        # Capitalize AM/PM
-        text = re.sub(r'\b(am|pm)\b', lambda m: m.group(1).upper(), text, flags=re.IGNORECASE)
-        
-        print(f"Processed text: '{text}'")
-        return text
+    def _typed_input(self):
+        """Final fallback when speech recognition fails: the caller types the turn"""
+        print("Speech recognition failed. Falling back to manual input...")
+        try:
+            print("Please type what you want to say:")
+            manual_input = input("> ").strip()
+            if manual_input:
+                return normalize_times(manual_input)
+            return ""
+        except KeyboardInterrupt:
+            print("\nInput cancelled.")
+            return ""
 
-    def _record_with_countdown(self, duration: int) -> Optional[np.ndarray]:
-        """Record audio with interruptible countdown"""
+    def _create_recognizer(self):
+        """Create the recognizer used for streaming transcription"""
+        # The process-wide client, so every turn reuses its pooled connections
+        if getattr(self, 'openai_client', None) is None:
+            try:
+                self.openai_client = get_client_registry().openai()
+            except Exception as e:
+                # No API key or SDK: still record the caller, and transcribe locally
+                print(f"OpenAI Whisper unavailable: {e}")
+                print("Using local Whisper for this turn")
+                return LocalWhisperRecognizer(LOCAL_WHISPER_MODEL)
+        return WhisperAPIRecognizer(self.openai_client, model="whisper-1")
+
+    def _record_with_countdown(self, duration: int,
+                               endpointer: Optional[EnergyEndpointer] = None,
+                               transcriber: Optional[StreamingTranscriber] = None) -> Optional[np.ndarray]:
+        """Record audio with interruptible countdown, stopping early on trailing silence"""
         try:
+            import sounddevice as sd
+            
             # Start recording in a separate thread
             audio_data = []
+            turn_ended = threading.Event()
             
             def audio_callback(indata, frames, time, status):
                 if status:
                     print(f"Audio status: {status}")
+                if turn_ended.is_set():
+                    return
                 audio_data.append(indata.copy())
+                if transcriber is not None:
+                    transcriber.feed(indata)
+                if endpointer is not None and endpointer.process(indata):
+                    turn_ended.set()
             
             # Start recording
             with sd.InputStream(callback=audio_callback, 
@@ -433,7 +404,12 @@ class VoiceHandler:
                     for _ in range(10):  # 100ms intervals
                         if self.stop_recording.is_set():
                             return None
-                        time.sleep(0.1)
+                        if turn_ended.wait(0.1):
+                            break
+                    
+                    if turn_ended.is_set():
+                        print(f"End of speech detected after {endpointer.elapsed:.1f} seconds.")
+                        break
             
             return np.concatenate(audio_data) if audio_data else None
             
@@ -452,6 +428,7 @@ class VoiceHandler:
     
     def record_audio(self, duration: float) -> Optional[np.ndarray]:
         try:
+            import sounddevice as sd
             recording = sd.rec(
                 int(duration * self.sample_rate),
                 samplerate=self.sample_rate,
@@ -466,8 +443,7 @@ class VoiceHandler:
     def speak(self, text: str) -> None:
         """Convert text to speech and play it"""
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
+            self.text_to_speech(text)
         except Exception as e:
             print(f"Speech output error: {str(e)}")
 